@@ -0,0 +1,263 @@
+# batch_design.py
+#
+# DISEÑO POR LOTES DESDE LÍNEA DE COMANDOS
+# ----------------------------------------
+# Lee una lista de frentes (JSON o CSV), diseña cada uno con DesignEngine en
+# un pool de procesos y escribe los resultados a medida que terminan (NDJSON,
+# una línea por frente). Al final reporta el rendimiento y los tiempos por
+# frente.
+#
+# Uso:
+#   python batch_design.py frentes.json -o diseños.ndjson -j 8
+#   python batch_design.py frentes.csv  -o diseños.ndjson --quiet
+#   python batch_design.py frentes.json -o diseños.ndjson --rig-dir jumbo/
+#     (además escribe jumbo/<id>.csv y jumbo/<id>.dxf por frente)
+#   python batch_design.py frentes.json -o diseños.ndjson --plugin mis_cueles
+#     (importa mis_cueles en cada proceso para que registre sus cueles)
+#
+# JSON: lista de specs (ver design_engine) o {"faces": [...]}; cada spec puede
+# traer un "id" y una sección "charge" con los parámetros de charge_plan.plan
+# (hole_length, hole_diam, ...). CSV: una fila por frente con las columnas de
+# CSV_COLUMNS (las vacías se omiten).
+#
+# Cada registro lleva los totales del plan de carga ("charge") y el resumen
+# final suma los kg de la campaña.
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from charge_plan import kind_charges, plan as charge_plan
+from cut_registry import load_plugins
+from design_engine import design_from_spec
+from rig_export import write_csv, write_dxf
+
+# columna CSV -> (sección del spec, llave, tipo)
+CSV_COLUMNS = {
+    "type":       ("geometry", "type", str),
+    "cx":         ("geometry", "cx", float),
+    "cy":         ("geometry", "cy", float),
+    "width":      ("geometry", "width", float),
+    "height":     ("geometry", "height", float),
+    "radius":     ("geometry", "radius", float),
+    "curve":      ("geometry", "curve", float),
+    "zapateras":  ("zapateras", "n", int),
+    "cajas":      ("cajas", "n_per_side", int),
+    "corona":     ("corona", "n", int),
+    "cuele":      ("cueles", "type", str),
+    "cuele_x":    ("cueles", "cx", float),
+    "cuele_y":    ("cueles", "cy", float),
+    "d":          ("cueles", "d", float),
+    "rot_deg":    ("cueles", "rot_deg", float),
+    "scale_x":    ("cueles", "scale_x", float),
+    "scale_y":    ("cueles", "scale_y", float),
+    "cc":         ("contracuele", "type", str),
+    "cc_x":       ("contracuele", "cx", float),
+    "cc_y":       ("contracuele", "cy", float),
+    "cc_r":       ("contracuele", "r", float),
+    "cc_w":       ("contracuele", "w", float),
+    "cc_h":       ("contracuele", "h", float),
+    "cc_n":       ("contracuele", "n_per_side", int),
+    "cc_snap":    ("contracuele", "snap", lambda v: v.strip().lower() in ("1", "true", "si", "sí")),
+    "cc_rot":     ("contracuele", "rot_deg", float),
+    "aux_nx":     ("aux", "nx", int),
+    "aux_ny":     ("aux", "ny", int),
+    "face_rot":   ("transform", "rotate", float),
+    "hole_length": ("charge", "hole_length", float),
+    "hole_diam":  ("charge", "hole_diam", float),
+}
+# parámetros de la sección "charge" que definen la carga de cada familia
+_KIND_CHARGE_KEYS = ("hole_length", "hole_diam", "density")
+_LIST_SECTIONS = ("cueles", "contracuele")
+
+
+def spec_from_row(row):
+    """
+    Convierte una fila CSV (dict) en un spec de DesignEngine.
+
+    Los centros de cuele/contracuele que falten se toman del centro de la
+    galería.
+    """
+    sec = {}
+    for col, (name, key, conv) in CSV_COLUMNS.items():
+        v = row.get(col)
+        if v is None or str(v).strip() == "":
+            continue
+        sec.setdefault(name, {})[key] = conv(v)
+    spec = {"id": row.get("id") or None}
+    g = sec.get("geometry")
+    base = (0.0, 0.0)
+    if g is not None:
+        base = (g.pop("cx", 0.0), g.pop("cy", 0.0))
+        g["center"] = list(base)
+        spec["geometry"] = g
+    for name, part in sec.items():
+        if name == "geometry":
+            continue
+        if name in _LIST_SECTIONS:
+            if "type" not in part:
+                continue
+            part["center"] = [part.pop("cx", base[0]), part.pop("cy", base[1])]
+            spec[name] = [part]
+        else:
+            spec[name] = part
+    return spec
+
+
+def load_faces(path):
+    """Lista de specs de frente desde un archivo JSON o CSV (asigna ids faltantes)."""
+    if path.lower().endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            faces = [spec_from_row(r) for r in csv.DictReader(f)]
+    else:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        faces = data["faces"] if isinstance(data, dict) else data
+    for i, face in enumerate(faces):
+        if face.get("id") is None:
+            face["id"] = i
+    return faces
+
+
+def design_face(face):
+    """
+    Diseña un frente (se ejecuta en un proceso del pool).
+
+    Retorna:
+        dict: {"id", "holes", "tunnels", "n_holes", "charge", "seconds"} o
+              {"id", "error", "seconds"} si el spec es inválido.
+    """
+    t0 = time.perf_counter()
+    spec = {k: v for k, v in face.items() if k != "id"}
+    try:
+        scene = design_from_spec(spec).scene
+        charge = charge_plan(scene, **spec.get("charge", {})).totals()
+    except (ValueError, KeyError, TypeError) as e:
+        return {"id": face["id"], "error": f"{type(e).__name__}: {e}",
+                "seconds": time.perf_counter() - t0}
+    holes = scene.holes.to_dicts()
+    return {"id": face["id"], "n_holes": len(holes), "holes": holes,
+            "tunnels": scene.tunnels, "charge": charge, "seconds": time.perf_counter() - t0}
+
+
+def _results(faces, jobs, plugins=()):
+    """Genera los resultados a medida que terminan (en orden de término)."""
+    if jobs <= 1:
+        load_plugins(plugins)
+        for face in faces:
+            yield design_face(face)
+        return
+    with ProcessPoolExecutor(max_workers=jobs, initializer=load_plugins,
+                             initargs=(tuple(plugins),)) as pool:
+        futures = [pool.submit(design_face, face) for face in faces]
+        for fut in as_completed(futures):
+            yield fut.result()
+
+
+def _percentile(sorted_vals, q):
+    if not sorted_vals:
+        return 0.0
+    k = min(int(round(q*(len(sorted_vals) - 1))), len(sorted_vals) - 1)
+    return sorted_vals[k]
+
+
+def write_rig_files(res, rig_dir, charge=None):
+    """
+    Escribe <rig_dir>/<id>.csv y <id>.dxf para un resultado sin error.
+
+    'charge' es la sección "charge" del frente (parámetros del plan de carga).
+    """
+    charges = kind_charges(**{k: v for k, v in (charge or {}).items() if k in _KIND_CHARGE_KEYS})
+    base = os.path.join(rig_dir, str(res["id"]))
+    with open(base + ".csv", "w", newline="", encoding="utf-8") as f:
+        write_csv(res["holes"], f, charges)
+    with open(base + ".dxf", "w", encoding="ascii", errors="replace", newline="\r\n") as f:
+        write_dxf(res["holes"], res["tunnels"], f, charges=charges)
+
+
+def run_batch(faces, out, jobs=None, log=None, rig_dir=None, plugins=()):
+    """
+    Diseña todos los frentes y escribe un registro NDJSON por frente en 'out'.
+
+    Parámetros:
+        faces (list[dict]): specs (con "id").
+        out (file): archivo de texto abierto para escritura.
+        jobs (int|None): procesos del pool (None = nº de CPUs; 1 = sin pool).
+        log (file|None): si se da, una línea de tiempo por frente.
+        rig_dir (str|None): si se da, CSV y DXF de cada frente en ese directorio.
+        plugins (list[str]): módulos de cueles a importar en cada proceso.
+
+    Retorna:
+        dict: resumen con frentes, errores, perforaciones, kg totales, tiempo
+              total, frentes/s y tiempos por frente (media, p50, p95, máx).
+    """
+    jobs = jobs or os.cpu_count() or 1
+    if rig_dir:
+        os.makedirs(rig_dir, exist_ok=True)
+    charge_params = {face["id"]: face.get("charge") for face in faces}
+    t0 = time.perf_counter()
+    times, n_holes, errors, kg = [], 0, 0, 0.0
+    for res in _results(faces, jobs, plugins):
+        out.write(json.dumps(res, ensure_ascii=False, separators=(",", ":")))
+        out.write("\n")
+        out.flush()
+        times.append(res["seconds"])
+        if "error" in res:
+            errors += 1
+        else:
+            n_holes += res["n_holes"]
+            kg += res["charge"]["kg"]
+            if rig_dir:
+                write_rig_files(res, rig_dir, charge_params.get(res["id"]))
+        if log is not None:
+            status = res.get("error") or f"{res['n_holes']} perforaciones, {res['charge']['kg']:.1f} kg"
+            print(f"[{len(times)}/{len(faces)}] frente {res['id']}: "
+                  f"{res['seconds']*1000:.1f} ms, {status}", file=log)
+    wall = time.perf_counter() - t0
+    times.sort()
+    return {
+        "faces": len(times), "errors": errors, "holes": n_holes, "kg": kg, "jobs": jobs,
+        "wall_s": wall,
+        "faces_per_s": len(times)/wall if wall > 0 else float("inf"),
+        "holes_per_s": n_holes/wall if wall > 0 else float("inf"),
+        "face_mean_ms": 1000*sum(times)/len(times) if times else 0.0,
+        "face_p50_ms": 1000*_percentile(times, 0.50),
+        "face_p95_ms": 1000*_percentile(times, 0.95),
+        "face_max_ms": 1000*(times[-1] if times else 0.0),
+    }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Diseño de galerías por lotes desde un archivo de frentes.")
+    ap.add_argument("faces", help="archivo JSON o CSV con los frentes")
+    ap.add_argument("-o", "--output", default="-", help="salida NDJSON (por defecto stdout)")
+    ap.add_argument("-j", "--jobs", type=int, default=None, help="procesos (por defecto nº de CPUs)")
+    ap.add_argument("--rig-dir", default=None, help="directorio para CSV/DXF de cada frente")
+    ap.add_argument("--plugin", action="append", default=[], metavar="MODULO",
+                    help="módulo que registra cueles adicionales (repetible)")
+    ap.add_argument("-q", "--quiet", action="store_true", help="no mostrar el tiempo de cada frente")
+    args = ap.parse_args(argv)
+
+    faces = load_faces(args.faces)
+    log = None if args.quiet else sys.stderr
+    if args.output == "-":
+        summary = run_batch(faces, sys.stdout, args.jobs, log, args.rig_dir, args.plugin)
+    else:
+        with open(args.output, "w", encoding="utf-8") as out:
+            summary = run_batch(faces, out, args.jobs, log, args.rig_dir, args.plugin)
+
+    print(f"{summary['faces']} frentes ({summary['errors']} con error), "
+          f"{summary['holes']} perforaciones ({summary['kg']:.1f} kg) en {summary['wall_s']:.2f} s "
+          f"con {summary['jobs']} procesos: {summary['faces_per_s']:.1f} frentes/s, "
+          f"{summary['holes_per_s']:.0f} perforaciones/s", file=sys.stderr)
+    print(f"por frente: media {summary['face_mean_ms']:.1f} ms, p50 {summary['face_p50_ms']:.1f} ms, "
+          f"p95 {summary['face_p95_ms']:.1f} ms, máx {summary['face_max_ms']:.1f} ms", file=sys.stderr)
+    return 1 if summary["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
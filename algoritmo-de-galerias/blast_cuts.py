@@ -1,16 +1,11 @@
-from math import cos, sin, radians, sqrt
+# Los patrones de cuele se definen como plantillas en cut_registry; estas
+# funciones conservan la interfaz original (center/escala/rotación/offsets) y
+# devuelven perforaciones con serie/delay ya asignadas. Las plantillas salen
+# de la caché TEMPLATE_CACHE: repetir un cuele con los mismos parámetros solo
+# cuesta trasladarlo.
+from cut_registry import TEMPLATE_CACHE
+from transform import transform_holes, translation
 
-# --- núcleo geométrico (sin series/delays) ---
-def _pt_geom(x, y, *, is_void=False, note=""):
-    return {"x": x, "y": y, "is_void": bool(is_void), "note": note}
-
-def _xform(x, y, *, center=(0,0), scale_x=1.0, scale_y=1.0, rot_deg=0.0):
-    cx, cy = center
-    x, y = x*scale_x, y*scale_y
-    if rot_deg:
-        a = radians(rot_deg); ca, sa = cos(a), sin(a)
-        x, y = x*ca - y*sa, x*sa + y*ca
-    return cx + x, cy + y
 
 # SARROIS
 def cuele_sarrois_geom(center=(0,0), d=0.15,
@@ -18,81 +13,28 @@ def cuele_sarrois_geom(center=(0,0), d=0.15,
                        offset_rows=None, offset_cols=None, offset_xy=None):
     """
     Geometría: 3×3 con vacío central.
+    Series: fila sup [2,1,2], fila med 0, fila inf [1,2,1].
     Offsets:
       - offset_rows: [Δy_fila_sup, Δy_fila_med, Δy_fila_inf]
       - offset_cols: [Δx_izq, Δx_centro, Δx_der]
       - offset_xy: {(f,c): (dx,dy)} con f∈{0..2} (sup..inf), c∈{0..2} (izq..der)
     """
-    if offset_rows is None: offset_rows = [0.0, 0.0, 0.0]
-    if offset_cols is None: offset_cols = [0.0, 0.0, 0.0]
-    if offset_xy   is None: offset_xy   = {}
-
-    xs = [-d, 0.0, +d]
-    ys = [+d, 0.0, -d]
-    mask = [
-        [(False,"sarrios"), (False,"sarrios"), (False,"sarrios")],   # fila sup
-        [(False,"sarrios"), (True,"alivio"),  (False,"sarrios")],    # fila med
-        [(False,"sarrios"), (False,"sarrios"),(False,"sarrios")],    # fila inf
-    ]
-
-    holes=[]
-    for f,yb in enumerate(ys):
-        for c,xb in enumerate(xs):
-            is_void = mask[f][c][0]
-            note    = mask[f][c][1]
-            dx,dy   = offset_xy.get((f,c),(0.0,0.0))
-            x = xb + offset_cols[c] + dx
-            y = yb + offset_rows[f] + dy
-            X,Y = _xform(x, y, center=center, scale_x=scale_x, scale_y=scale_y, rot_deg=rot_deg)
-            holes.append(_pt_geom(X, Y, is_void=is_void, note=note))
-    return holes
+    t = TEMPLATE_CACHE.get("Sarrois", scale_x, scale_y, rot_deg, d=d, offset_rows=offset_rows,
+                           offset_cols=offset_cols, offset_xy=offset_xy)
+    return t.holes(center)
 
 
 def cuele_cuatro_secciones_geom(center=(0.0, 0.0), D=0.20, D2=0.20,
                                 k2=1.5, k3=1.5, k4=1.5, add_mids_S4=True,
                                 scale_x=1.0, scale_y=1.0, rot_deg=0.0):
     """
-    Geometría únicamente; aplica regla R1 ≤ 1.7·D2.
+    Aplica regla R1 ≤ 1.7·D2. Series: S1→0, S2→1, S3→2, S4→3 (vacío sin serie).
     """
-    # burdens
-    B1 = 1.5*D; B2 = k2*B1; B3 = k3*B2; B4 = k4*B3
-    # apotemas acumuladas
-    A1 = B1; A2 = B1+B2; A3 = B1+B2+B3; A4 = B1+B2+B3+B4
-    # restricción
-    R1 = A1*sqrt(2)
-    if R1 > 1.7*D2:
-        s = (1.7*D2)/R1
-        A1*=s; A2*=s; A3*=s; A4*=s; R1 = A1*sqrt(2)
-
-    holes=[]
-    # vacío central
-    X,Y = _xform(0.0, 0.0, center=center, scale_x=scale_x, scale_y=scale_y, rot_deg=rot_deg)
-    holes.append(_pt_geom(X,Y,is_void=True, note="alivio"))
-
-    # S1 ejes @R1
-    for (x,y) in [( R1,0),(0,R1),(-R1,0),(0,-R1)]:
-        X,Y = _xform(x,y, center=center, scale_x=scale_x, scale_y=scale_y, rot_deg=rot_deg)
-        holes.append(_pt_geom(X,Y, note="S1"))
-    # S2 diagonales @A2
-    for (x,y) in [( A2, A2),( A2,-A2),(-A2,-A2),(-A2, A2)]:
-        X,Y = _xform(x,y, center=center, scale_x=scale_x, scale_y=scale_y, rot_deg=rot_deg)
-        holes.append(_pt_geom(X,Y, note="S2"))
-    # S3 ejes @R3
-    R3 = A3*sqrt(2)
-    for (x,y) in [( R3,0),(0,R3),(-R3,0),(0,-R3)]:
-        X,Y = _xform(x,y, center=center, scale_x=scale_x, scale_y=scale_y, rot_deg=rot_deg)
-        holes.append(_pt_geom(X,Y, note="S3"))
-    # S4 diagonales (+ medias)
-    s4 = [( A4, A4),( A4,-A4),(-A4,-A4),(-A4, A4)]
-    if add_mids_S4:
-        s4 += [(A4,0),(0,A4),(-A4,0),(0,-A4)]
-    for (x,y) in s4:
-        X,Y = _xform(x,y, center=center, scale_x=scale_x, scale_y=scale_y, rot_deg=rot_deg)
-        holes.append(_pt_geom(X,Y, note="S4"))
-    return holes
+    t = TEMPLATE_CACHE.get("Cuatro secciones", scale_x, scale_y, rot_deg, d=D, D2=D2,
+                           k2=k2, k3=k3, k4=k4, add_mids_S4=add_mids_S4)
+    return t.holes(center)
 
 
-  
 #  SUECO
 def cuele_sueco_geom(center=(0.0, 0.0), d=0.12,
                      scale_x=1.0, scale_y=1.0, rot_deg=0.0,
@@ -104,37 +46,11 @@ def cuele_sueco_geom(center=(0.0, 0.0), d=0.12,
       f2: [●, V, ●]
       f3: [ , ●,  ]
       f4: [●, V, ●]
+    Series: filas pares 1 (vacíos 0), filas impares 0.
     """
-    if offset_rows is None: offset_rows = [0.0]*5
-    if offset_cols is None: offset_cols = [0.0]*3
-    if offset_xy   is None: offset_xy   = {}
-
-    xs = [-d, 0.0, +d]
-    ys = [+2*d, +1*d, 0.0, -1*d, -2*d]
-    # (is_void, place)
-    mask = [
-        [(False,"sueco"), (True,"alivio"), (False,"sueco")],
-        [(None,""),       (False,"sueco"), (None,"")      ],
-        [(False,"sueco"), (True,"alivio"), (False,"sueco")],
-        [(None,""),       (False,"sueco"), (None,"")      ],
-        [(False,"sueco"), (True,"alivio"), (False,"sueco")],
-    ]
-
-    holes=[]
-    for f,yb in enumerate(ys):
-        for c,xb in enumerate(xs):
-            cell = mask[f][c]
-            if cell[0] is None:
-                continue  # no hay perforación en este slot
-            is_void = cell[0]; note = cell[1]
-            dx,dy   = offset_xy.get((f,c),(0.0,0.0))
-            x = xb + offset_cols[c] + dx
-            y = yb + offset_rows[f] + dy
-            X,Y = _xform(x, y, center=center, scale_x=scale_x, scale_y=scale_y, rot_deg=rot_deg)
-            holes.append(_pt_geom(X, Y, is_void=is_void, note=note))
-    return holes
-
-
+    t = TEMPLATE_CACHE.get("Sueco", scale_x, scale_y, rot_deg, d=d, offset_rows=offset_rows,
+                           offset_cols=offset_cols, offset_xy=offset_xy)
+    return t.holes(center)
 
 
 #  COROMANT 
@@ -144,37 +60,16 @@ def cuele_coromant_geom(center=(0.0, 0.0),
                         scale_x=1.0, scale_y=1.0, rot_deg=0.0,
                         offset_xy=None):
     """
-    Vacíos pegados: (0, ±v).
+    Vacíos pegados: (0, ±v) (serie 0).
     Col IZQ (x≈-ax): y=+ay (3), y=0 (1 más abierto), y=-ay (4).
     Col DER (x≈+ax): y=+ay+skew (5), y=0 (0 más abierto), y=-ay-skew (2).
     """
-    if offset_xy is None: offset_xy = {}
-
-    pts = [
-        # vacíos
-        ((0.0, +v), True,  "alivio"),
-        ((0.0, -v), True,  "alivio"),
-        # izquierda
-        ((-ax,       +ay), False, "coro L"),
-        ((-spread*ax, 0.0), False, "coro 1 abierto"),
-        ((-ax,       -ay), False, "coro L"),
-        # derecha
-        ((+ax, +ay+skew),  False, "coro R"),
-        ((+spread*ax, 0.0),False, "coro 0 abierto"),
-        ((+ax, -ay-skew),  False, "coro R"),
-    ]
-    holes=[]
-    for i,(p,isv,note) in enumerate(pts):
-        dx,dy = offset_xy.get(i,(0.0,0.0))
-        x,y   = p[0]+dx, p[1]+dy
-        X,Y   = _xform(x, y, center=center, scale_x=scale_x, scale_y=scale_y, rot_deg=rot_deg)
-        holes.append(_pt_geom(X, Y, is_void=isv, note=note))
-    return holes
-
+    t = TEMPLATE_CACHE.get("Coromant", scale_x, scale_y, rot_deg, v=v, ax=ax, ay=ay,
+                           skew=skew, spread=spread, offset_xy=offset_xy)
+    return t.holes(center)
 
 
 # CUELE CUÑA 
-
 def cuele_cuna_geom(center=(0.0, 0.0), d=0.20,
                     variante="2x3", sep_cols_factor=2.0,
                     scale_x=1.0, scale_y=1.0, rot_deg=0.0,
@@ -182,50 +77,14 @@ def cuele_cuna_geom(center=(0.0, 0.0), d=0.20,
     """
     '2x3': 2 columnas × 3 filas (pasos: ≈2d y d).
     'zigzag': 4 columnas × 5 filas en patrón alternante.
+    Series por fila (arriba → abajo): 0..2 / 0..4.
     """
-    if variante=="2x3":
-        if offset_rows is None: offset_rows=[0.0]*3
-        if offset_cols is None: offset_cols=[0.0]*2
-        if offset_xy   is None: offset_xy  ={}
-        dx = sep_cols_factor * d / 2.0
-        xs = [-dx, +dx]; ys = [+d, 0.0, -d]
-        holes=[]
-        for f,yb in enumerate(ys):
-            for c,xb in enumerate(xs):
-                dxp,dyp = offset_xy.get((f,c),(0.0,0.0))
-                x = xb + offset_cols[c] + dxp
-                y = yb + offset_rows[f] + dyp
-                X,Y = _xform(x,y, center=center, scale_x=scale_x, scale_y=scale_y, rot_deg=rot_deg)
-                holes.append(_pt_geom(X,Y, note="cuña 2x3"))
-        return holes
-
-    elif variante=="zigzag":
-        if offset_rows is None: offset_rows=[0.0]*5
-        if offset_cols is None: offset_cols=[0.0]*4
-        if offset_xy   is None: offset_xy  ={}
-        xs = [-1.5*d, -0.5*d, +0.5*d, +1.5*d]
-        ys = [+2*d, +1*d, 0.0, -1*d, -2*d]
-        mask = [
-            [1,0,0,1],
-            [0,1,1,0],
-            [1,0,0,1],
-            [0,1,1,0],
-            [1,0,0,1],
-        ]
-        holes=[]
-        for f,yb in enumerate(ys):
-            for c,xb in enumerate(xs):
-                if not mask[f][c]: continue
-                dxp,dyp = offset_xy.get((f,c),(0.0,0.0))
-                x = xb + offset_cols[c] + dxp
-                y = yb + offset_rows[f] + dyp
-                X,Y = _xform(x,y, center=center, scale_x=scale_x, scale_y=scale_y, rot_deg=rot_deg)
-                holes.append(_pt_geom(X,Y, note="cuña zigzag"))
-        return holes
-    else:
+    if variante not in ("2x3", "zigzag"):
         raise ValueError("variante debe ser '2x3' o 'zigzag'")
-
-
+    t = TEMPLATE_CACHE.get("Cuña " + variante, scale_x, scale_y, rot_deg, d=d,
+                           sep_cols_factor=sep_cols_factor, offset_rows=offset_rows,
+                           offset_cols=offset_cols, offset_xy=offset_xy)
+    return t.holes(center)
 
 
 # CUELE ABANICO (manual)
@@ -233,32 +92,11 @@ def cuele_abanico_geom(center=(0.0, 0.0), d=0.20,
                        dx_factor=0.5, gap12=0.5, gap23=1.0, gap34=1.0,
                        scale_x=1.0, scale_y=1.0, rot_deg=0.0,
                        offset_rows=None, offset_cols=None, offset_xy=None):
-    if offset_rows is None: offset_rows=[0.0]*4
-    if offset_cols is None: offset_cols=[0.0]*5
-    if offset_xy   is None: offset_xy  ={}
-    dx = dx_factor * d
-    xs = [-2*dx, -dx, 0.0, +dx, +2*dx]
-    y1 = 0.0
-    y2 = y1 - gap12*d
-    y3 = y2 - gap23*d
-    y4 = y3 - gap34*d
-    rows = [y1,y2,y3,y4]
-    layout = {
-        0: [1,3],     # F1: col 2,4
-        1: [0,2,4],   # F2: col 1,3,5
-        2: [0,2,4],   # F3: col 1,3,5
-        3: [1,3],     # F4: col 2,4
-    }
-    holes=[]
-    for f,cols in layout.items():
-        yb = rows[f] + offset_rows[f]
-        for c in cols:
-            xb = xs[c] + offset_cols[c]
-            dxp,dyp = offset_xy.get((f,c),(0.0,0.0))
-            X,Y = _xform(xb+dxp, yb+dyp, center=center, scale_x=scale_x, scale_y=scale_y, rot_deg=rot_deg)
-            holes.append(_pt_geom(X,Y, note="abanico"))
-    return holes
-
+    """Filas F1..F4 (serie = fila, 0..3)."""
+    t = TEMPLATE_CACHE.get("Abanico", scale_x, scale_y, rot_deg, d=d, dx_factor=dx_factor,
+                           gap12=gap12, gap23=gap23, gap34=gap34, offset_rows=offset_rows,
+                           offset_cols=offset_cols, offset_xy=offset_xy)
+    return t.holes(center)
 
 
 #Cuele Bethune
@@ -268,27 +106,16 @@ def cuele_bethune_geom(center=(0.0, 0.0), d=0.20,
                        invert_y=True, vy_factor=3.5,
                        scale_x=1.0, scale_y=1.0, rot_deg=0.0,
                        offset_rows=None, offset_cols=None, offset_xy=None):
-    if offset_rows is None: offset_rows=[0.0]*5
-    if offset_cols is None: offset_cols=[0.0]*7
-    if offset_xy   is None: offset_xy  ={}
-
-    dx   = dx_factor * d
-    cols = [-3*dx,-2*dx,-dx,0.0,+dx,+2*dx,+3*dx]
-    sgn  = -1.0 if invert_y else +1.0
-    base = [sgn*vy_factor*m*d for m in y_levels]  # 5 filas
-    layout = { 0:[3], 1:[1,5], 2:[3], 3:[0,6], 4:[2,4] }
-
-    holes=[]
-    for f, cs in layout.items():
-        yb = base[f] + offset_rows[f]
-        for c in cs:
-            xb = cols[c] + offset_cols[c]
-            dxp,dyp = offset_xy.get((f,c),(0.0,0.0))
-            X,Y = _xform(xb+dxp, yb+dyp, center=center, scale_x=scale_x, scale_y=scale_y, rot_deg=rot_deg)
-            holes.append(_pt_geom(X,Y, note="bethune"))
-    return holes
-
-# ========= Helpers comunes de rotulado =========
+    """Filas F1..F5 según y_levels (serie = fila, 0..4)."""
+    t = TEMPLATE_CACHE.get("Bethune", scale_x, scale_y, rot_deg, d=d, dx_factor=dx_factor,
+                           y_levels=y_levels, invert_y=invert_y, vy_factor=vy_factor,
+                           offset_rows=offset_rows, offset_cols=offset_cols, offset_xy=offset_xy)
+    return t.holes(center)
+
+# ========= Rotulado por tolerancia (legado) =========
+# Los generadores cuele_*_geom ya asignan serie/delay; estas funciones solo
+# sirven para perforaciones sin serie (p.ej. importadas) y comparan contra
+# coordenadas del patrón sin transformar (center=(0,0), sin rotación).
 def _near(a, b, tol=1e-6):
     return abs(a - b) <= tol
 
@@ -460,12 +287,6 @@ def apply_series_coromant(holes, v, ax, ay, skew=0.0, tol=1e-6):
 
 
 def transform(holes, dx=0.0, dy=0.0):
-    """Aplica un desplazamiento plano a todos los collares."""
-    out = []
-    for h in holes:
-        h2 = dict(h)
-        h2["x"] += dx
-        h2["y"] += dy
-        out.append(h2)
-    return out
+    """Aplica un desplazamiento plano a todos los collares (ver transform.py para rotar/escalar)."""
+    return transform_holes(holes, translation(dx, dy))
 
@@ -0,0 +1,233 @@
+# charge_plan.py
+#
+# PLAN DE CARGA POR FAMILIA DE PERFORACIONES
+# ------------------------------------------
+# Para cada perforación, según su familia (_kind: zapatera, caja, corona,
+# cuele, contracuele, aux), calcula:
+#   - taco (m): stem_d diámetros de perforación;
+#   - columna cargada (m): largo de perforación menos el taco;
+#   - carga (kg): columna × concentración lineal del explosivo, con el
+#     diámetro de carga = coupling × diámetro de perforación (la corona y
+#     las cajas usan carga desacoplada de recorte);
+# y para el frente: carga total y por familia, área (contornos de galería),
+# avance (advance_ratio × largo de perforación), volumen arrancado y factor
+# de carga (kg/m³ y kg/t). Los vacíos no se cargan.
+#
+# Todo es por familia: la tabla de cargas se arma una vez (kind_charges) y se
+# reparte sobre la tabla de perforaciones con un solo indexado, de modo que
+# sirve igual para una Scene, para un archivo recorrido en streaming
+# (rig_export) o para cientos de frentes (plan_campaign, batch_design).
+#
+# Uso por línea de comandos:
+#   python charge_plan.py frente1.npz frente2.npz --length 3.5 --diam 0.045
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from math import pi
+
+import numpy as np
+
+from cut_optimizer import CHARGE_DIAM_M, EXPL_DENSITY
+from timing import face_arrays
+
+HOLE_LENGTH_M = 3.5     # largo de perforación
+ADVANCE_RATIO = 0.90    # avance / largo de perforación
+ROCK_DENSITY  = 2.7     # densidad de la roca (t/m³)
+# familia -> (taco en diámetros de perforación, acoplamiento φcarga/φperf)
+KIND_PLAN = {
+    "cuele":       (10.0, 1.0),
+    "contracuele": (10.0, 1.0),
+    "aux":         (15.0, 1.0),
+    "zapatera":    (10.0, 1.0),
+    "caja":        (15.0, 0.6),
+    "corona":      (15.0, 0.5),
+}
+DEFAULT_KIND = "aux"    # familia cuyo plan usan los tipos que no están en la tabla
+
+
+def kind_charges(hole_length=HOLE_LENGTH_M, hole_diam=CHARGE_DIAM_M, density=EXPL_DENSITY,
+                 table=KIND_PLAN):
+    """
+    Taco, columna y carga de una perforación de cada familia.
+
+    Parámetros:
+        hole_length (float): largo de perforación (m).
+        hole_diam (float): diámetro de perforación (m).
+        density (float): densidad del explosivo (kg/m³).
+        table (dict): familia -> (taco en diámetros, acoplamiento).
+
+    Retorna:
+        dict: familia -> (taco m, columna m, kg).
+    """
+    out = {}
+    for kind, (stem_d, coupling) in table.items():
+        stem = min(stem_d*hole_diam, hole_length)
+        column = hole_length - stem
+        q = density*pi*(coupling*hole_diam)**2/4.0
+        out[kind] = (stem, column, column*q)
+    return out
+
+
+def charge_of(charges, kind):
+    """(taco, columna, kg) de la familia 'kind' (o de DEFAULT_KIND si no está)."""
+    c = charges.get(kind)
+    return c if c is not None else charges[DEFAULT_KIND]
+
+
+def face_area(tunnels):
+    """Área (m²) encerrada por los contornos de galería (suma de polígonos)."""
+    total = 0.0
+    for poly in tunnels:
+        if len(poly) < 3:
+            continue
+        p = np.asarray(poly, dtype=np.float64).reshape(-1, 2)
+        x, y = p[:, 0], p[:, 1]
+        total += abs(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1)))/2.0
+    return total
+
+
+class ChargePlan:
+    """
+    Plan de carga de un frente.
+
+    Atributos:
+        kinds (list[str]): familia de cada perforación.
+        stemming_m, column_m, kg (np.ndarray): por perforación (0 en vacíos).
+        face_m2 (float): área del frente (0 si no hay contorno).
+        advance_m (float): avance esperado.
+        volume_m3 (float): volumen arrancado (face_m2 × advance_m).
+        total_kg (float): carga total.
+        powder_factor (float|None): kg/m³ (None sin contorno).
+        specific_charge (float|None): kg/t.
+    """
+
+    def __init__(self, kinds, stemming, column, kg, face_m2, advance_m, rock_density):
+        self.kinds = kinds
+        self.stemming_m = stemming
+        self.column_m = column
+        self.kg = kg
+        self.face_m2 = face_m2
+        self.advance_m = advance_m
+        self.volume_m3 = face_m2*advance_m
+        self.total_kg = float(kg.sum())
+        self.powder_factor = self.total_kg/self.volume_m3 if self.volume_m3 > 0 else None
+        self.specific_charge = (self.powder_factor/rock_density
+                                if self.powder_factor is not None else None)
+
+    def by_kind(self):
+        """familia -> {"holes": perforaciones cargadas, "kg": carga}."""
+        kinds = np.asarray(self.kinds, dtype=object)
+        charged = self.kg > 0
+        names, inv = np.unique(kinds[charged], return_inverse=True)
+        kg = np.bincount(inv, weights=self.kg[charged], minlength=len(names))
+        holes = np.bincount(inv, minlength=len(names))
+        return {str(k): {"holes": int(n), "kg": float(q)} for k, n, q in zip(names, holes, kg)}
+
+    def totals(self):
+        """Resumen serializable (JSON) para las exportaciones."""
+        return {"holes": int((self.kg > 0).sum()), "kg": self.total_kg,
+                "face_m2": self.face_m2, "advance_m": self.advance_m,
+                "volume_m3": self.volume_m3, "powder_factor": self.powder_factor,
+                "specific_charge": self.specific_charge, "by_kind": self.by_kind()}
+
+    def report(self):
+        """Texto legible: una línea por familia y los totales."""
+        lines = [f"{k:12s} {v['holes']:4d} perf. {v['kg']:9.2f} kg"
+                 for k, v in self.by_kind().items()]
+        lines.append(f"{'total':12s} {int((self.kg > 0).sum()):4d} perf. {self.total_kg:9.2f} kg")
+        if self.powder_factor is not None:
+            lines.append(f"frente {self.face_m2:.2f} m², avance {self.advance_m:.2f} m, "
+                         f"{self.volume_m3:.2f} m³: {self.powder_factor:.2f} kg/m³ "
+                         f"({self.specific_charge:.3f} kg/t)")
+        return "\n".join(lines)
+
+
+def plan(source, tunnels=None, hole_length=HOLE_LENGTH_M, hole_diam=CHARGE_DIAM_M,
+         density=EXPL_DENSITY, rock_density=ROCK_DENSITY, advance_ratio=ADVANCE_RATIO,
+         table=KIND_PLAN):
+    """
+    Plan de carga de un frente.
+
+    Parámetros:
+        source (Scene|iterable[dict]): perforaciones del frente.
+        tunnels (list|None): contornos para el área (por defecto los de la Scene).
+        hole_length, hole_diam, density, table: ver kind_charges.
+        rock_density (float): densidad de la roca (t/m³) para kg/t.
+        advance_ratio (float): avance / largo de perforación.
+
+    Retorna:
+        ChargePlan
+    """
+    if tunnels is None:
+        tunnels = getattr(source, "tunnels", [])
+    a = face_arrays(source)
+    charges = kind_charges(hole_length, hole_diam, density, table)
+    names, inv = np.unique(np.asarray(a["kind"], dtype=object).astype(str), return_inverse=True)
+    per_kind = np.array([charge_of(charges, k) for k in names.tolist()],
+                        dtype=np.float64).reshape(-1, 3)
+    cols = per_kind[inv.reshape(-1)]
+    cols[a["is_void"]] = 0.0
+    return ChargePlan(a["kind"], cols[:, 0], cols[:, 1], cols[:, 2],
+                      face_area(tunnels), advance_ratio*hole_length, rock_density)
+
+
+def _plan_layout(args):
+    """Trabajo de plan_campaign(): totales de un archivo de diseño (corre en el pool)."""
+    from layout_io import iter_layout
+
+    path, kwargs = args
+    tunnels, holes = iter_layout(path)
+    out = plan(list(holes), tunnels, **kwargs).totals()
+    out["layout"] = path
+    return out
+
+
+def plan_campaign(layouts, jobs=None, **kwargs):
+    """
+    Totales de carga de muchos frentes exportados.
+
+    Parámetros:
+        layouts (list[str]): archivos de diseño (.json, .ndjson, .npz).
+        jobs (int|None): procesos (None = nº de CPUs; 1 = sin pool).
+        **kwargs: parámetros de plan.
+
+    Retorna:
+        list[dict]: totals() de cada frente con su "layout", en orden.
+    """
+    work = [(p, kwargs) for p in layouts]
+    jobs = jobs or os.cpu_count() or 1
+    if jobs <= 1 or len(work) <= 1:
+        return [_plan_layout(w) for w in work]
+    with ProcessPoolExecutor(max_workers=min(jobs, len(work))) as pool:
+        return list(pool.map(_plan_layout, work, chunksize=max(1, len(work)//(4*jobs))))
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Plan de carga por familia de perforaciones.")
+    ap.add_argument("layouts", nargs="+", help="diseños exportados (.json, .ndjson o .npz)")
+    ap.add_argument("--length", type=float, default=HOLE_LENGTH_M, help="largo de perforación (m)")
+    ap.add_argument("--diam", type=float, default=CHARGE_DIAM_M, help="diámetro de perforación (m)")
+    ap.add_argument("--density", type=float, default=EXPL_DENSITY, help="densidad del explosivo (kg/m³)")
+    ap.add_argument("--rock-density", type=float, default=ROCK_DENSITY, help="densidad de la roca (t/m³)")
+    ap.add_argument("--advance", type=float, default=ADVANCE_RATIO, help="avance / largo de perforación")
+    ap.add_argument("-j", "--jobs", type=int, default=None)
+    ap.add_argument("--json", action="store_true", help="salida JSON (una línea por frente)")
+    args = ap.parse_args(argv)
+
+    results = plan_campaign(args.layouts, args.jobs, hole_length=args.length, hole_diam=args.diam,
+                            density=args.density, rock_density=args.rock_density,
+                            advance_ratio=args.advance)
+    for res in results:
+        if args.json:
+            print(json.dumps(res, ensure_ascii=False))
+            continue
+        pf = f", {res['powder_factor']:.2f} kg/m³" if res["powder_factor"] is not None else ""
+        print(f"{res['layout']}: {res['holes']} perf., {res['kg']:.2f} kg{pf}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,287 @@
+# cut_optimizer.py
+#
+# OPTIMIZADOR DEL CUELE DE CUATRO SECCIONES
+# -----------------------------------------
+# Busca parámetros (d, k2, k3, k4, medias en S4) de cut_registry
+# "Cuatro secciones" para un diámetro de alivio (D2) y una roca dados.
+# Evalúa la grilla de candidatos por bloques vectorizados (numpy) en un pool
+# de procesos y retorna el conjunto de Pareto según:
+#   - nº de perforaciones (menor),
+#   - abertura final W4 (mayor),
+#   - holgura de burden: min(1 - Bi/Bmax_i) en S2..S4 (mayor).
+#
+# Restricciones de cada candidato:
+#   - S1 no toca el vacío (R1 ≥ (D2 + diámetro de carga)/2); R1 ≤ 1.7·D2 lo
+#     garantiza la propia plantilla al reescalar;
+#   - en S2..S4 (y en las medias de lado de S4, a (A4, 0) frente a los
+#     vértices de S3 en (R3, 0)) el burden hacia la abertura anterior es al
+#     menos medio diámetro de carga más MIN_CLEARANCE_M y no supera ni esa
+#     abertura ni el burden máximo de Holmberg para ella:
+#       Bmax = 0.088·sqrt(W·q·s_anfo / (φ·c))
+#     (W abertura previa, q carga lineal kg/m, φ diámetro de carga, c
+#     constante de roca);
+#   - espaciamiento en el lado de S4 ≤ spacing_ratio·Bmax(W3);
+#   - si se da un contorno, el cuadrado final (más 'margin') cabe en la
+#     galería con el cuele ubicado en 'center' y rotado rot_deg.
+#
+# Uso por línea de comandos:
+#   python cut_optimizer.py --relief 0.102 --drift D-shaped --width 3 --height 3 --cy 1.2
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from math import pi, sqrt
+
+import numpy as np
+
+from cut_registry import cuatro_secciones_apothems
+from drift_layout import prepare_contour, points_in_polygon
+from transform import rotation, apply_xy
+
+CHARGE_DIAM_M   = 0.045   # diámetro de perforación cargada
+ROCK_C          = 0.4     # constante de roca (kg/m³)
+EXPL_DENSITY    = 850.0   # densidad del explosivo (kg/m³, ANFO)
+S_ANFO          = 1.0     # potencia relativa en peso respecto de ANFO
+SPACING_RATIO   = 1.25    # espaciamiento máximo en S4 / Bmax
+FIT_MARGIN_M    = 0.30    # holgura entre el cuadrado final y el contorno
+MIN_CLEARANCE_M = 0.05    # burden mínimo en S2..S4 sobre medio diámetro de carga
+FIT_SAMPLES     = 8       # puntos por lado para verificar que el cuadrado cabe
+CHUNK           = 2048    # candidatos por bloque
+
+
+def holmberg_burden(opening, charge_diam=CHARGE_DIAM_M, rock_c=ROCK_C,
+                    density=EXPL_DENSITY, s_anfo=S_ANFO):
+    """Burden máximo (m) hacia una abertura de lado 'opening' (escalar o arreglo)."""
+    q = density*pi*charge_diam**2/4.0
+    return 0.088*np.sqrt(np.asarray(opening)*q*s_anfo/(charge_diam*rock_c))
+
+
+def section_metrics(d, D2, k2, k3, k4, mids):
+    """
+    Aberturas, burdens y nº de perforaciones de muchos candidatos a la vez.
+
+    Parámetros:
+        d, D2, k2, k3, k4 (np.ndarray): parámetros de la plantilla (n,).
+        mids (np.ndarray[bool]): medias de lado en S4 (n,).
+
+    Retorna:
+        dict: "openings" (n,4) lados W1..W4, "burdens" (n,5) B1..B4 y Bm
+              (B1 centro a centro con el vacío; Bm de las medias de lado de S4
+              a los vértices de S3, nan sin medias), "spacing_s4" (n,),
+              "n_holes" (n,).
+    """
+    A1, A2, A3, A4 = cuatro_secciones_apothems(d, D2, k2, k3, k4)
+    R1 = A1*sqrt(2)
+    R3 = A3*sqrt(2)
+    # S1 y S3 son cuadrados girados 45° (vértices en los ejes); S2 y S4 no
+    openings = np.stack([2*A1, 2*A2, 2*A3, 2*A4], axis=1)
+    burdens = np.stack([R1, (2*A2 - R1)/sqrt(2), R3 - A2, (2*A4 - R3)/sqrt(2),
+                        np.where(mids, A4 - R3, np.nan)], axis=1)
+    return {
+        "openings": openings,
+        "burdens": burdens,
+        "spacing_s4": np.where(mids, A4, 2*A4),
+        "n_holes": np.where(mids, 21, 17),
+    }
+
+
+def _square_fits(edges, half, center, rot_deg):
+    """Máscara (n,): el cuadrado de semilado half[i] centrado y rotado cabe en el contorno."""
+    t = np.linspace(-1.0, 1.0, FIT_SAMPLES, endpoint=False)
+    one = np.ones_like(t)
+    # perímetro del cuadrado unitario, recorrido lado a lado
+    ux = np.concatenate([t, one, -t, -one])
+    uy = np.concatenate([-one, t, one, -t])
+    rx, ry = apply_xy(rotation(rot_deg), ux, uy)
+    X = center[0] + half[:, None]*rx[None, :]
+    Y = center[1] + half[:, None]*ry[None, :]
+    return points_in_polygon(edges, X, Y).all(axis=1)
+
+
+def evaluate(params, cfg):
+    """
+    Evalúa un bloque de candidatos (se ejecuta en un proceso del pool).
+
+    Parámetros:
+        params (np.ndarray): (n,6) con d, D2, k2, k3, k4, mids.
+        cfg (dict): ver optimize_cuatro_secciones.
+
+    Retorna:
+        tuple: (params, métricas) solo de los candidatos factibles; métricas
+               (m,12) = n_holes, W1..W4, B1..B4, Bm (nan sin medias),
+               espaciamiento S4, holgura.
+    """
+    d, D2, k2, k3, k4, mids = params.T
+    m = section_metrics(d, D2, k2, k3, k4, mids > 0.5)
+    W, B = m["openings"], m["burdens"]
+    bmax = holmberg_burden(W[:, :3], cfg["charge_diam"], cfg["rock_c"],
+                           cfg["density"], cfg["s_anfo"])
+    # S2..S4 y las medias (Bm, hacia la abertura W3); sin medias no restringe
+    Bs = np.column_stack([B[:, 1:4], B[:, 4]])
+    Ws = np.column_stack([W[:, :3], W[:, 2]])
+    Bmax = np.column_stack([bmax, bmax[:, 2]])
+    has = ~np.isnan(Bs)
+    Bs = np.where(has, Bs, 0.0)
+    b_min = cfg["charge_diam"]/2 + MIN_CLEARANCE_M
+    ok = B[:, 0] >= (D2 + cfg["charge_diam"])/2
+    ok &= (~has | ((Bs >= b_min) & (Bs <= Bmax) & (Bs <= Ws))).all(axis=1)
+    ok &= m["spacing_s4"] <= cfg["spacing_ratio"]*bmax[:, 2]
+    if cfg["edges"] is not None and ok.any():
+        idx = np.nonzero(ok)[0]
+        ok[idx] = _square_fits(cfg["edges"], W[idx, 3]/2 + cfg["margin"],
+                               cfg["center"], cfg["rot_deg"])
+    slack = np.where(has, 1.0 - Bs/Bmax, np.inf).min(axis=1)
+    metrics = np.column_stack([m["n_holes"], W, B, m["spacing_s4"], slack])
+    return params[ok], metrics[ok]
+
+
+def pareto_mask(costs):
+    """
+    Máscara del frente de Pareto (minimización en todas las columnas).
+
+    De los candidatos con costos idénticos se conserva solo el primero.
+    """
+    costs = np.asarray(costs, dtype=np.float64)
+    n = len(costs)
+    keep = np.zeros(n, dtype=bool)
+    idx = np.arange(n)
+    rest = costs
+    while len(rest):
+        # el de menor suma no está dominado por ninguno de los que quedan
+        i = int(np.argmin(rest.sum(axis=1)))
+        c = rest[i]
+        keep[idx[i]] = True
+        dominated = (rest >= c).all(axis=1)
+        idx, rest = idx[~dominated], rest[~dominated]
+    return keep
+
+
+def candidate_grid(relief_diam, d_range=None, k_range=(1.0, 2.5), n_d=10, n_k=9):
+    """
+    Grilla cartesiana de candidatos (n,6) = d, D2, k2, k3, k4, mids.
+
+    Por defecto d recorre [0.3·D2, 0.85·D2]: sobre ~0.8·D2 la regla
+    R1 ≤ 1.7·D2 reescala y los diseños se repiten.
+    """
+    if d_range is None:
+        d_range = (0.3*relief_diam, 0.85*relief_diam)
+    ds = np.linspace(d_range[0], d_range[1], n_d)
+    ks = np.linspace(k_range[0], k_range[1], n_k)
+    g = np.meshgrid(ds, [relief_diam], ks, ks, ks, [0.0, 1.0], indexing="ij")
+    return np.stack([a.ravel() for a in g], axis=1)
+
+
+def optimize_cuatro_secciones(relief_diam, charge_diam=CHARGE_DIAM_M, rock_c=ROCK_C,
+                              density=EXPL_DENSITY, s_anfo=S_ANFO,
+                              contour=None, center=(0.0, 0.0), rot_deg=0.0,
+                              margin=FIT_MARGIN_M, spacing_ratio=SPACING_RATIO,
+                              d_range=None, k_range=(1.0, 2.5), n_d=10, n_k=9,
+                              jobs=None, chunk=CHUNK):
+    """
+    Conjunto de Pareto de diseños del cuele de cuatro secciones.
+
+    Parámetros:
+        relief_diam (float): diámetro del vacío central (D2, m).
+        charge_diam (float): diámetro de las perforaciones cargadas (m).
+        rock_c (float): constante de roca c (kg/m³).
+        density (float): densidad del explosivo (kg/m³).
+        s_anfo (float): potencia relativa en peso respecto de ANFO.
+        contour (list|Contour|PreparedContour|None): galería en la que debe
+            caber el cuadrado final; None no lo verifica.
+        center (tuple): centro del cuele en la galería.
+        rot_deg (float): rotación del cuele.
+        margin (float): holgura entre el cuadrado final y el contorno (m).
+        spacing_ratio (float): espaciamiento máximo en S4 / Bmax(W3).
+        d_range, k_range (tuple): rangos de búsqueda de d y de k2..k4.
+        n_d, n_k (int): puntos de la grilla en cada rango.
+        jobs (int|None): procesos (None = nº de CPUs; 1 = sin pool).
+        chunk (int): candidatos por bloque.
+
+    Retorna:
+        list[dict]: diseños del frente, de mayor a menor abertura, con
+            "params" (kwargs para cut_registry / spec de cueles), "n_holes",
+            "opening_m", "openings", "burdens" (B1..B4 y, con medias de
+            lado, Bm), "spacing_s4", "slack".
+    """
+    grid = candidate_grid(relief_diam, d_range, k_range, n_d, n_k)
+    cfg = {"charge_diam": charge_diam, "rock_c": rock_c, "density": density,
+           "s_anfo": s_anfo, "spacing_ratio": spacing_ratio, "margin": margin,
+           "center": tuple(center), "rot_deg": rot_deg,
+           "edges": None if contour is None else prepare_contour(contour).edges}
+    blocks = [grid[a:a+chunk] for a in range(0, len(grid), chunk)]
+    jobs = jobs or os.cpu_count() or 1
+    if jobs <= 1 or len(blocks) == 1:
+        results = [evaluate(b, cfg) for b in blocks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(blocks))) as pool:
+            results = list(pool.map(evaluate, blocks, [cfg]*len(blocks)))
+    params = np.concatenate([r[0] for r in results])
+    metrics = np.concatenate([r[1] for r in results])
+    if not len(params):
+        return []
+
+    # costos: nº de perforaciones, -abertura final, -holgura (redondeados a mm / 0.1 %)
+    costs = np.column_stack([metrics[:, 0], -np.round(metrics[:, 4], 3), -np.round(metrics[:, 11], 3)])
+    front = np.nonzero(pareto_mask(costs))[0]
+    front = front[np.argsort(-metrics[front, 4], kind="stable")]
+    out = []
+    for i in front:
+        d, D2, k2, k3, k4, mids = params[i].tolist()
+        m = metrics[i].tolist()
+        out.append({
+            "params": {"d": d, "D2": D2, "k2": k2, "k3": k3, "k4": k4, "add_mids_S4": mids > 0.5},
+            "n_holes": int(m[0]),
+            "opening_m": m[4],
+            "openings": m[1:5],
+            "burdens": m[5:9] + ([m[9]] if mids > 0.5 else []),
+            "spacing_s4": m[10],
+            "slack": m[11],
+        })
+    return out
+
+
+def main(argv=None):
+    from design_engine import GEOMETRY_TYPES, build_contour
+
+    ap = argparse.ArgumentParser(description="Frente de Pareto del cuele de cuatro secciones.")
+    ap.add_argument("--relief", type=float, required=True, help="diámetro del vacío central (m)")
+    ap.add_argument("--charge", type=float, default=CHARGE_DIAM_M, help="diámetro de carga (m)")
+    ap.add_argument("--rock-c", type=float, default=ROCK_C, help="constante de roca c (kg/m³)")
+    ap.add_argument("--density", type=float, default=EXPL_DENSITY, help="densidad del explosivo (kg/m³)")
+    ap.add_argument("--s-anfo", type=float, default=S_ANFO, help="potencia relativa a ANFO")
+    ap.add_argument("--drift", choices=GEOMETRY_TYPES, default=None, help="galería donde debe caber")
+    ap.add_argument("--width", type=float, default=3.0)
+    ap.add_argument("--height", type=float, default=3.0)
+    ap.add_argument("--cx", type=float, default=0.0, help="x del cuele")
+    ap.add_argument("--cy", type=float, default=1.2, help="y del cuele")
+    ap.add_argument("--rot", type=float, default=0.0, help="rotación del cuele (°)")
+    ap.add_argument("--margin", type=float, default=FIT_MARGIN_M)
+    ap.add_argument("-j", "--jobs", type=int, default=None)
+    ap.add_argument("--json", action="store_true", help="salida JSON")
+    args = ap.parse_args(argv)
+
+    contour = None
+    if args.drift:
+        contour = build_contour(args.drift, (0.0, 0.0), width=args.width,
+                                height=args.height, radius=args.width/2)
+    front = optimize_cuatro_secciones(
+        args.relief, args.charge, args.rock_c, args.density, args.s_anfo,
+        contour=contour, center=(args.cx, args.cy), rot_deg=args.rot,
+        margin=args.margin, jobs=args.jobs)
+    if args.json:
+        json.dump(front, sys.stdout, indent=1)
+        print()
+        return 0
+    print(f"{len(front)} diseños en el frente de Pareto")
+    print("  n   W4(m)  holgura    d      k2    k3    k4   medias")
+    for f in front:
+        p = f["params"]
+        print(f"{f['n_holes']:3d}  {f['opening_m']:6.3f}  {f['slack']:6.1%}  "
+              f"{p['d']:.4f}  {p['k2']:.2f}  {p['k3']:.2f}  {p['k4']:.2f}  {'sí' if p['add_mids_S4'] else 'no'}")
+    return 0 if front else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,465 @@
+# cut_registry.py
+#
+# REGISTRO DECLARATIVO DE CUELES
+# ------------------------------
+# Cada cuele es una plantilla (CutTemplate) en coordenadas locales: centro en
+# el origen, sin escala ni rotación, con vacíos, notas y series ya asignadas.
+# Instanciar un cuele aplica una sola transformación afín 2×3 (escala,
+# rotación, traslación) a todo el arreglo de coordenadas de la plantilla.
+#
+# Los cueles se buscan por nombre (el mismo que muestra la GUI y que usan los
+# specs de design_engine / batch_design). Un plug-in agrega cueles propios
+# registrando un constructor de plantillas al importarse:
+#
+#   from cut_registry import register_cut, grid_template, row_mask
+#
+#   @register_cut("Mi cuele")
+#   def mi_cuele(d=0.15):
+#       return grid_template([-d, 0.0, d], [d, -d], row_mask(["X.X", ".X."], "mi cuele"))
+#
+# y luego se carga con load_plugins(["mi_modulo"]) (o batch_design --plugin).
+#
+# Las plantillas ya escaladas y rotadas se guardan en una caché LRU
+# (TEMPLATE_CACHE) indexada por nombre y parámetros de forma; al insertar un
+# cuele solo se traslada la plantilla al centro. Redefinir o quitar un cuele
+# del registro invalida sus entradas.
+
+import importlib
+import inspect
+from collections import OrderedDict
+from math import sqrt
+
+import numpy as np
+
+from transform import place
+
+
+# PLANTILLAS
+class CutTemplate:
+    """
+    Plantilla de cuele en coordenadas locales.
+
+    Atributos:
+        xy (np.ndarray): coordenadas (n, 2) relativas al centro del cuele.
+        is_void (np.ndarray): bool (n,), perforaciones de alivio.
+        serie (np.ndarray): int (n,), serie de cada perforación (-1 = sin serie).
+        notes (list[str]): nota de cada perforación.
+    """
+    __slots__ = ("xy", "is_void", "serie", "notes")
+
+    def __init__(self, xy, is_void, serie, notes):
+        self.xy = np.asarray(xy, dtype=np.float64).reshape(-1, 2)
+        self.is_void = np.asarray(is_void, dtype=bool)
+        self.serie = np.asarray(serie, dtype=np.int32)
+        self.notes = list(notes)
+
+    @classmethod
+    def from_points(cls, pts):
+        """Plantilla desde tuplas (x, y, is_void, note, serie); serie None = sin serie."""
+        pts = list(pts)
+        return cls([(p[0], p[1]) for p in pts],
+                   [p[2] for p in pts],
+                   [-1 if p[4] is None else p[4] for p in pts],
+                   [p[3] for p in pts])
+
+    def __len__(self):
+        return len(self.notes)
+
+    def instance_xy(self, m):
+        """Coordenadas (n, 2) tras aplicar la afín 'm' (2×3 o 3×3)."""
+        return self.xy @ m[:2, :2].T + m[:2, 2]
+
+    def transformed(self, m):
+        """Nueva plantilla con la afín 'm' aplicada (comparte vacíos, series y notas)."""
+        t = CutTemplate.__new__(CutTemplate)
+        t.xy, t.is_void, t.serie, t.notes = self.instance_xy(m), self.is_void, self.serie, self.notes
+        return t
+
+    def holes(self, center=(0.0, 0.0), scale_x=1.0, scale_y=1.0, rot_deg=0.0):
+        """
+        Perforaciones (dicts con serie/delay) del cuele ubicado en 'center'.
+
+        Retorna:
+            list[dict]
+        """
+        if scale_x == 1.0 and scale_y == 1.0 and not rot_deg:
+            xy = self.xy + (center[0], center[1])
+        else:
+            xy = self.instance_xy(affine(center, scale_x, scale_y, rot_deg))
+        out = []
+        for (x, y), v, note, s in zip(xy.tolist(), self.is_void.tolist(), self.notes, self.serie.tolist()):
+            h = {"x": x, "y": y, "is_void": v, "note": note}
+            if s >= 0:
+                h["serie"] = s
+                h["delay"] = s
+            out.append(h)
+        return out
+
+
+def affine(center=(0.0, 0.0), scale_x=1.0, scale_y=1.0, rot_deg=0.0):
+    """Matriz afín 2×3: escala, luego rotación, luego traslación a 'center' (ver transform.place)."""
+    return place(center, scale_x, scale_y, rot_deg)[:2]
+
+
+def grid_template(xs, ys, mask, offset_rows=None, offset_cols=None, offset_xy=None):
+    """
+    Plantilla desde una máscara fila × columna.
+
+    Parámetros:
+        xs (list[float]): x de cada columna (izq → der).
+        ys (list[float]): y de cada fila (arriba → abajo).
+        mask (list[list]): mask[f][c] = (is_void, note, serie) o None (sin perforación).
+        offset_rows (list|None): Δy por fila.
+        offset_cols (list|None): Δx por columna.
+        offset_xy (dict|None): {(f, c): (dx, dy)} por perforación.
+
+    Retorna:
+        CutTemplate
+    """
+    if offset_rows is None: offset_rows = [0.0]*len(ys)
+    if offset_cols is None: offset_cols = [0.0]*len(xs)
+    if offset_xy   is None: offset_xy   = {}
+    pts = []
+    for f, yb in enumerate(ys):
+        for c, xb in enumerate(xs):
+            cell = mask[f][c]
+            if cell is None:
+                continue
+            dx, dy = offset_xy.get((f, c), (0.0, 0.0))
+            pts.append((xb + offset_cols[c] + dx, yb + offset_rows[f] + dy) + tuple(cell))
+    return CutTemplate.from_points(pts)
+
+
+def row_mask(pattern, note):
+    """Máscara desde filas de texto ('X' = perforación); la serie es el índice de fila."""
+    return [[(False, note, f) if ch == "X" else None for ch in row]
+            for f, row in enumerate(pattern)]
+
+
+# DEFINICIONES
+# celdas (is_void, note, serie); filas arriba → abajo, columnas izq → der
+SARROIS_MASK = (
+    ((False, "sarrios", 2), (False, "sarrios", 1), (False, "sarrios", 2)),
+    ((False, "sarrios", 0), (True,  "alivio",  0), (False, "sarrios", 0)),
+    ((False, "sarrios", 1), (False, "sarrios", 2), (False, "sarrios", 1)),
+)
+SUECO_MASK = (
+    ((False, "sueco", 1), (True,  "alivio", 0), (False, "sueco", 1)),
+    (None,                (False, "sueco",  0), None               ),
+    ((False, "sueco", 1), (True,  "alivio", 0), (False, "sueco", 1)),
+    (None,                (False, "sueco",  0), None               ),
+    ((False, "sueco", 1), (True,  "alivio", 0), (False, "sueco", 1)),
+)
+CUNA_2X3     = ("XX", "XX", "XX")
+CUNA_ZIGZAG  = ("X..X", ".XX.", "X..X", ".XX.", "X..X")
+ABANICO      = (".X.X.", "X.X.X", "X.X.X", ".X.X.")
+BETHUNE      = ("...X...", ".X...X.", "...X...", "X.....X", "..X.X..")
+
+
+def sarrois_template(d=0.15, offset_rows=None, offset_cols=None, offset_xy=None):
+    """Sarrois: 3×3 con vacío central."""
+    return grid_template([-d, 0.0, +d], [+d, 0.0, -d], SARROIS_MASK,
+                         offset_rows, offset_cols, offset_xy)
+
+
+def sueco_template(d=0.12, offset_rows=None, offset_cols=None, offset_xy=None):
+    """Sueco: 5 filas × 3 columnas con vacíos en la columna central."""
+    return grid_template([-d, 0.0, +d], [+2*d, +d, 0.0, -d, -2*d], SUECO_MASK,
+                         offset_rows, offset_cols, offset_xy)
+
+
+def coromant_template(d=0.15, v=None, ax=None, ay=None, skew=None, spread=1.4, offset_xy=None):
+    """
+    Coromant: vacíos en (0, ±v) y dos columnas asimétricas.
+
+    v, ax, ay y skew se derivan de d si no se dan (0.5·d, 1.2·d, 1.2·d, 0.4·d).
+    offset_xy se indexa por número de punto (0..7).
+    """
+    v    = 0.5*d if v    is None else v
+    ax   = 1.2*d if ax   is None else ax
+    ay   = 1.2*d if ay   is None else ay
+    skew = 0.4*d if skew is None else skew
+    if offset_xy is None: offset_xy = {}
+    pts = [
+        # vacíos
+        (0.0, +v, True, "alivio", 0),
+        (0.0, -v, True, "alivio", 0),
+        # izquierda
+        (-ax,        +ay, False, "coro L", 3),
+        (-spread*ax, 0.0, False, "coro 1 abierto", 1),
+        (-ax,        -ay, False, "coro L", 4),
+        # derecha
+        (+ax,        +ay+skew, False, "coro R", 5),
+        (+spread*ax, 0.0,      False, "coro 0 abierto", 0),
+        (+ax,        -ay-skew, False, "coro R", 2),
+    ]
+    for i, (dx, dy) in offset_xy.items():
+        x, y, *rest = pts[i]
+        pts[i] = (x + dx, y + dy, *rest)
+    return CutTemplate.from_points(pts)
+
+
+def cuna_template(d=0.20, variante="2x3", sep_cols_factor=2.0,
+                  offset_rows=None, offset_cols=None, offset_xy=None):
+    """Cuña '2x3' (2 columnas × 3 filas) o 'zigzag' (4 × 5 alternante); serie = fila."""
+    if variante == "2x3":
+        dx = sep_cols_factor*d/2.0
+        return grid_template([-dx, +dx], [+d, 0.0, -d], row_mask(CUNA_2X3, "cuña 2x3"),
+                             offset_rows, offset_cols, offset_xy)
+    if variante == "zigzag":
+        return grid_template([-1.5*d, -0.5*d, +0.5*d, +1.5*d], [+2*d, +d, 0.0, -d, -2*d],
+                             row_mask(CUNA_ZIGZAG, "cuña zigzag"),
+                             offset_rows, offset_cols, offset_xy)
+    raise ValueError("variante debe ser '2x3' o 'zigzag'")
+
+
+def abanico_template(d=0.20, dx_factor=0.5, gap12=0.5, gap23=1.0, gap34=1.0,
+                     offset_rows=None, offset_cols=None, offset_xy=None):
+    """Abanico: 4 filas hacia abajo desde el centro; serie = fila."""
+    dx = dx_factor*d
+    y2 = -gap12*d
+    y3 = y2 - gap23*d
+    y4 = y3 - gap34*d
+    return grid_template([-2*dx, -dx, 0.0, +dx, +2*dx], [0.0, y2, y3, y4],
+                         row_mask(ABANICO, "abanico"), offset_rows, offset_cols, offset_xy)
+
+
+def bethune_template(d=0.20, dx_factor=1.2, y_levels=(1.6, 1.4, 1.2, 1.0, 0.9),
+                     invert_y=True, vy_factor=3.5,
+                     offset_rows=None, offset_cols=None, offset_xy=None):
+    """Bethune: 5 filas en y = ±vy_factor·m·d (m en y_levels); serie = fila."""
+    dx = dx_factor*d
+    sgn = -1.0 if invert_y else +1.0
+    return grid_template([-3*dx, -2*dx, -dx, 0.0, +dx, +2*dx, +3*dx],
+                         [sgn*vy_factor*m*d for m in y_levels],
+                         row_mask(BETHUNE, "bethune"), offset_rows, offset_cols, offset_xy)
+
+
+def cuatro_secciones_apothems(d, D2, k2=1.5, k3=1.5, k4=1.5):
+    """
+    Apotemas acumuladas A1..A4 del cuele de cuatro secciones.
+
+    B1 = 1.5·d, Bi = ki·B(i-1) y Ai = B1 + … + Bi; si R1 = A1·√2 supera
+    1.7·D2 se reescalan todas para cumplir la regla. Acepta escalares o
+    arreglos (se evalúan elemento a elemento).
+
+    Retorna:
+        tuple: (A1, A2, A3, A4)
+    """
+    d, D2, k2, k3, k4 = (np.asarray(v, dtype=np.float64) for v in (d, D2, k2, k3, k4))
+    # burdens
+    B1 = 1.5*d; B2 = k2*B1; B3 = k3*B2; B4 = k4*B3
+    # apotemas acumuladas
+    A1 = B1; A2 = B1+B2; A3 = A2+B3; A4 = A3+B4
+    # restricción R1 ≤ 1.7·D2
+    R1 = A1*sqrt(2)
+    s = np.where(R1 > 1.7*D2, (1.7*D2)/np.where(R1 > 0, R1, 1.0), 1.0)
+    return A1*s, A2*s, A3*s, A4*s
+
+
+def cuatro_secciones_template(d=0.20, D2=None, k2=1.5, k3=1.5, k4=1.5, add_mids_S4=True):
+    """
+    Cuatro secciones alrededor de un vacío central (d = diámetro de carga D).
+
+    Aplica la regla R1 ≤ 1.7·D2 (D2 = d si no se da). Series: S1→0, S2→1,
+    S3→2, S4→3; el vacío queda sin serie.
+    """
+    D2 = d if D2 is None else D2
+    A1, A2, A3, A4 = (float(a) for a in cuatro_secciones_apothems(d, D2, k2, k3, k4))
+    R1 = A1*sqrt(2)
+    R3 = A3*sqrt(2)
+
+    pts = [(0.0, 0.0, True, "alivio", None)]
+    pts += [(x, y, False, "S1", 0) for x, y in [(R1, 0), (0, R1), (-R1, 0), (0, -R1)]]
+    pts += [(x, y, False, "S2", 1) for x, y in [(A2, A2), (A2, -A2), (-A2, -A2), (-A2, A2)]]
+    pts += [(x, y, False, "S3", 2) for x, y in [(R3, 0), (0, R3), (-R3, 0), (0, -R3)]]
+    s4 = [(A4, A4), (A4, -A4), (-A4, -A4), (-A4, A4)]
+    if add_mids_S4:
+        s4 += [(A4, 0), (0, A4), (-A4, 0), (0, -A4)]
+    pts += [(x, y, False, "S4", 3) for x, y in s4]
+    return CutTemplate.from_points(pts)
+
+
+# CACHÉ DE PLANTILLAS
+def _freeze(v):
+    """Versión hashable de un parámetro (dicts y listas anidados -> tuplas)."""
+    if isinstance(v, dict):
+        return tuple(sorted((k, _freeze(x)) for k, x in v.items()))
+    if isinstance(v, (list, tuple)):
+        return tuple(_freeze(x) for x in v)
+    return v
+
+
+class TemplateCache:
+    """
+    Caché LRU de plantillas normalizadas (escaladas y rotadas, centradas en el origen).
+
+    La llave es (nombre, escala, rotación, parámetros de forma que el cuele
+    acepta); el centro no forma parte de ella. maxsize=0 desactiva la caché.
+    Los parámetros no hashables (p.ej. objetos) evitan la caché.
+    """
+    def __init__(self, maxsize=256):
+        self.maxsize = int(maxsize)
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, name, scale_x=1.0, scale_y=1.0, rot_deg=0.0, **params):
+        """Plantilla de 'name' con escala/rotación aplicadas (solo falta trasladarla)."""
+        builder, fixed, accepted = _entry(name)
+        if accepted is not None:
+            params = {k: v for k, v in params.items() if k in accepted}
+        try:
+            key = (name, scale_x, scale_y, rot_deg, _freeze(params))
+            hash(key)
+        except TypeError:
+            key = None
+        if key is not None:
+            t = self._data.get(key)
+            if t is not None:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return t
+        self.misses += 1
+        t = builder(**fixed, **params).transformed(affine((0.0, 0.0), scale_x, scale_y, rot_deg))
+        t.xy.setflags(write=False)
+        if key is not None and self.maxsize > 0:
+            self._data[key] = t
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return t
+
+    def resize(self, maxsize):
+        """Cambia el tamaño máximo, descartando las entradas menos usadas que sobren."""
+        self.maxsize = int(maxsize)
+        while len(self._data) > max(self.maxsize, 0):
+            self._data.popitem(last=False)
+
+    def invalidate(self, name=None):
+        """Descarta las plantillas de 'name' (o todas). Retorna cuántas se descartaron."""
+        if name is None:
+            n = len(self._data)
+            self._data.clear()
+            return n
+        keys = [k for k in self._data if k[0] == name]
+        for k in keys:
+            del self._data[k]
+        return len(keys)
+
+    def clear(self):
+        """Vacía la caché y reinicia las estadísticas."""
+        self._data.clear()
+        self.hits = self.misses = 0
+
+    def stats(self):
+        """dict con hits, misses, size, maxsize y hit_rate."""
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._data),
+                "maxsize": self.maxsize, "hit_rate": self.hits/total if total else 0.0}
+
+
+TEMPLATE_CACHE = TemplateCache()
+
+
+# REGISTRO
+_CUTS = {}   # nombre -> (constructor, parámetros fijos, parámetros aceptados | None = todos)
+
+
+def register_cut(name, builder=None, replace=False, **fixed):
+    """
+    Registra un constructor de plantillas bajo 'name'.
+
+    Se puede usar como decorador (@register_cut("Nombre")). Los parámetros
+    'fixed' se pasan siempre al constructor (p.ej. variante="zigzag").
+
+    Parámetros:
+        name (str): nombre del cuele (el que ven la GUI y los specs).
+        builder (callable): builder(**params) -> CutTemplate.
+        replace (bool): permite redefinir un nombre ya registrado.
+
+    Retorna:
+        callable: el mismo constructor.
+    """
+    if builder is None:
+        return lambda fn: register_cut(name, fn, replace=replace, **fixed)
+    if name in _CUTS and not replace:
+        raise ValueError(f"cuele ya registrado: {name!r}")
+    params = inspect.signature(builder).parameters.values()
+    if any(p.kind is inspect.Parameter.VAR_KEYWORD for p in params):
+        accepted = None
+    else:
+        accepted = frozenset(p.name for p in params) - frozenset(fixed)
+    _CUTS[name] = (builder, fixed, accepted)
+    TEMPLATE_CACHE.invalidate(name)
+    return builder
+
+
+def unregister_cut(name):
+    """Quita un cuele del registro (KeyError si no existe)."""
+    del _CUTS[name]
+    TEMPLATE_CACHE.invalidate(name)
+
+
+def invalidate_cut(name=None):
+    """
+    Descarta de la caché las plantillas de 'name' (o de todos los cueles).
+
+    Hace falta solo si la definición cambia sin volver a registrarse (p.ej.
+    un plug-in que modifica la máscara que usa su constructor).
+    """
+    return TEMPLATE_CACHE.invalidate(name)
+
+
+def cut_names():
+    """Nombres registrados, en orden de registro."""
+    return tuple(_CUTS)
+
+
+def _entry(name):
+    try:
+        return _CUTS[name]
+    except KeyError:
+        raise ValueError(f"cuele desconocido: {name!r}") from None
+
+
+def cut_params(name):
+    """Parámetros que acepta el cuele 'name' (None = cualquiera)."""
+    return _entry(name)[2]
+
+
+def cut_template(name, **params):
+    """
+    Plantilla del cuele 'name' con los parámetros de forma dados.
+
+    Los parámetros que el cuele no usa se ignoran (p.ej. vy_factor fuera de
+    Bethune), de modo que la GUI y los lotes pueden pasar siempre el mismo
+    juego.
+    """
+    builder, fixed, accepted = _entry(name)
+    if accepted is not None:
+        params = {k: v for k, v in params.items() if k in accepted}
+    return builder(**fixed, **params)
+
+
+def cut_holes(name, center, scale_x=1.0, scale_y=1.0, rot_deg=0.0, **params):
+    """Perforaciones (con serie/delay) del cuele 'name' ubicado en 'center' (vía TEMPLATE_CACHE)."""
+    return TEMPLATE_CACHE.get(name, scale_x, scale_y, rot_deg, **params).holes(center)
+
+
+def load_plugins(modules):
+    """Importa los módulos dados para que registren sus cueles."""
+    for mod in modules or ():
+        importlib.import_module(mod)
+
+
+register_cut("Sarrois", sarrois_template)
+register_cut("Sueco", sueco_template)
+register_cut("Coromant", coromant_template)
+register_cut("Cuña 2x3", cuna_template, variante="2x3")
+register_cut("Cuña zigzag", cuna_template, variante="zigzag")
+register_cut("Abanico", abanico_template)
+register_cut("Bethune", bethune_template)
+register_cut("Cuatro secciones", cuatro_secciones_template)
@@ -0,0 +1,297 @@
+# design_engine.py
+#
+# MOTOR DE DISEÑO SIN INTERFAZ
+# ----------------------------
+# Orquesta los pasos del asistente (geometría, zapateras, cajas, corona,
+# cueles, contracuele y auxiliares) sobre una Scene, sin depender de tkinter.
+# La GUI (drilling_design.App) es un cliente de este motor; también se puede
+# usar en servidores, scripts por lotes o pruebas.
+#
+# Un diseño completo se describe con un "spec" declarativo (dict, p.ej. leído
+# de JSON); los pasos ausentes se omiten:
+#
+#   {
+#     "geometry":    {"type": "D-shaped", "center": [0, 0], "width": 3.0, "height": 3.0},
+#     "zapateras":   {"n": 6},
+#     "cajas":       {"n_per_side": 5},
+#     "corona":      {"n": 8},
+#     "cueles":      [{"type": "Sarrois", "center": [0, 1.2], "d": 0.15,
+#                      "rot_deg": 0, "scale_x": 1, "scale_y": 1}],
+#     "contracuele": [{"type": "Hexágono", "center": [0, 1.2], "r": 0.8, "snap": true}],
+#     "aux":         {"nx": 5, "ny": 3},
+#     "transform":   {"rotate": 35.0, "about": [0, 0], "translate": [120.0, 40.0]}
+#   }
+#
+# "transform" (ver transform.from_spec) se aplica al final a todo el frente,
+# p.ej. para llevar un diseño local al azimut y posición de la galería.
+
+from cut_registry import cut_holes
+from drift_contour import (
+    semicircular_contour, d_shaped_contour, rectangular_contour,
+    horseshoe_contour, bezier_contour
+)
+from drift_layout import (
+    place_zapateras, place_cajas, place_corona,
+    place_aux_grid, place_contracuele_hex, place_contracuele_rect,
+    prepare_contour
+)
+from transform import from_spec as transform_from_spec, rotation, transform_holes
+from scene import (
+    Scene, SP_GEOM, SP_ZAP, SP_CAJAS, SP_CORONA, SP_CUELES, SP_CC, SP_AUX
+)
+
+ARC_TOL_M  = 0.005  # desviación máxima cuerda-arco al teselar techos curvos
+SNAP_TOL_M = 0.20   # tolerancia para “snap” de contracuele a una perforación
+
+GEOMETRY_TYPES = ("Semicircular", "D-shaped", "Rectangular", "Horseshoe", "Bezier")
+CC_TYPES = ("Hexágono", "Rectángulo")
+
+
+def build_contour(kind, center, width=3.0, height=3.0, radius=1.5, curve=0.8):
+    """
+    Construye el contorno analítico de una galería.
+
+    Parámetros:
+        kind (str): uno de GEOMETRY_TYPES.
+        center (tuple): (x, y) del centro de la base.
+        width, height (float): ancho y alto (en Bezier, height es el alto de pared).
+        radius (float): radio (solo Semicircular).
+        curve (float): altura de la curva del techo (solo Bezier).
+
+    Retorna:
+        Contour
+    """
+    x, y = center
+    if kind == "Semicircular":
+        return semicircular_contour(x, y, radius=radius)
+    if kind == "D-shaped":
+        return d_shaped_contour(x, y, width=width, height=height)
+    if kind == "Rectangular":
+        return rectangular_contour(x, y, width=width, height=height)
+    if kind == "Horseshoe":
+        return horseshoe_contour(x, y, width=width, height=height)
+    if kind == "Bezier":
+        return bezier_contour(x, y, width=width, wall_height=height, curve_height=curve)
+    raise ValueError(f"tipo de galería desconocido: {kind!r}")
+
+
+def cuele_holes(name, center, d=0.15, scale_x=1.0, scale_y=1.0, rot_deg=0.0, vy=3.5, **params):
+    """
+    Perforaciones (con serie/delay) de un cuele centrado en 'center'.
+
+    Parámetros:
+        name (str): nombre registrado en cut_registry (ver cut_names()).
+        d (float): diámetro / espaciamiento base del cuele.
+        scale_x, scale_y, rot_deg (float): transformación del patrón.
+        vy (float): factor vertical (solo Bethune).
+        **params: otros parámetros de forma del cuele (los que no usa se ignoran).
+
+    Retorna:
+        list[dict]
+    """
+    return cut_holes(name, center, scale_x, scale_y, rot_deg, d=d, vy_factor=vy, **params)
+
+
+def contracuele_holes(kind, center, r=0.8, w=1.6, h=1.1, n_per_side=2, rot_deg=0.0):
+    """
+    Perforaciones de un contracuele hexagonal (r) o rectangular (w, h, n_per_side),
+    rotado rot_deg respecto de su centro.
+    """
+    if kind == "Hexágono":
+        holes = place_contracuele_hex(center, r=r)
+    elif kind == "Rectángulo":
+        holes = place_contracuele_rect(center, w=w, h=h, n_per_side=n_per_side)
+    else:
+        raise ValueError(f"tipo de contracuele desconocido: {kind!r}")
+    if rot_deg:
+        holes = transform_holes(holes, rotation(rot_deg, about=center))
+    return holes
+
+
+def tag_holes(holes, step, kind):
+    """Agrega etiquetas internas de control (_step, _kind) a un conjunto de perforaciones."""
+    for h in holes:
+        h["_step"] = step
+        h["_kind"] = kind
+    return holes
+
+
+class DesignEngine:
+    """
+    Motor de diseño paso a paso sobre una Scene.
+
+    Atributos:
+        scene (Scene): escena que se va llenando.
+        contour (Contour|None): contorno analítico de la galería activa.
+        poly (list[tuple]): polilínea (para dibujo/exportación) de la galería activa.
+        prep (PreparedContour|None): contorno preparado, reutilizado por todos los pasos.
+        geom_index (int|None): índice de la galería activa en scene.tunnels.
+        done (dict[int,bool]): pasos completados (SP_*).
+    """
+
+    def __init__(self, scene=None, arc_tol=ARC_TOL_M):
+        self.arc_tol = arc_tol
+        self.reset(scene)
+
+    def reset(self, scene=None):
+        """Vacía el diseño (nueva escena, sin galería, ningún paso completado)."""
+        self.scene = scene if scene is not None else Scene()
+        self.contour = None
+        self.poly = []
+        self.prep = None
+        self.geom_index = None
+        self.done = {s: False for s in (SP_GEOM, SP_ZAP, SP_CAJAS, SP_CORONA,
+                                        SP_CUELES, SP_CC, SP_AUX)}
+
+    def adopt(self, scene, active=None):
+        """
+        Toma una escena ya armada (p.ej. cargada de un archivo) como diseño actual.
+
+        La galería activa es scene.tunnels[active] (por defecto la primera);
+        como el contorno analítico no se guarda, los pasos siguientes trabajan
+        sobre su polilínea.
+        """
+        self.reset(scene)
+        if scene.tunnels:
+            self.set_active_tunnel(0 if active is None else active)
+        self.refresh_done()
+
+    def set_active_tunnel(self, i):
+        """Deja como activa la galería scene.tunnels[i] (a partir de su polilínea)."""
+        self.poly = self.scene.tunnels[i]
+        self.contour = None
+        self.prep = prepare_contour(self.poly)
+        self.geom_index = i
+
+    def refresh_done(self):
+        """Recalcula los pasos completados a partir del contenido de la escena."""
+        self.done[SP_GEOM] = bool(self.scene.tunnels)
+        for step in self.done:
+            if step != SP_GEOM:
+                self.done[step] = bool(self.scene.table.step_rids(step))
+
+    def _require_geometry(self):
+        if not self.poly:
+            raise ValueError("Primero inserta la geometría (Paso 1).")
+
+    def _add(self, holes, step, kind):
+        rids = self.scene.add_holes(tag_holes(holes, step, kind))
+        self.done[step] = True
+        return rids
+
+    # --- pasos ---
+    def set_geometry(self, kind, center, **dims):
+        """Inserta una galería (ver build_contour) y la deja como activa. Retorna su índice."""
+        self.contour = build_contour(kind, center, **dims)
+        self.poly = self.contour.polyline(tol=self.arc_tol)
+        self.prep = prepare_contour(self.contour, tol=self.arc_tol)
+        self.geom_index = self.scene.add_tunnel(self.poly)
+        self.done[SP_GEOM] = True
+        return self.geom_index
+
+    def add_zapateras(self, n):
+        """Zapateras equidistantes sobre la base. Retorna los rids agregados."""
+        self._require_geometry()
+        return self._add(place_zapateras(self.prep, int(n)), SP_ZAP, "zapatera")
+
+    def add_cajas(self, n_per_side):
+        """Cajas en ambos lados. Retorna los rids agregados."""
+        self._require_geometry()
+        return self._add(place_cajas(self.prep, int(n_per_side)), SP_CAJAS, "caja")
+
+    def add_corona(self, n):
+        """Corona equidistante sobre el techo. Retorna los rids agregados."""
+        self._require_geometry()
+        return self._add(place_corona(self.prep, int(n)), SP_CORONA, "corona")
+
+    def add_cuele(self, name, center, **params):
+        """Cuele 'name' centrado en 'center' (ver cuele_holes). Retorna los rids agregados."""
+        holes = cuele_holes(name, center, **params)
+        if not holes:
+            return []
+        return self._add(holes, SP_CUELES, "cuele")
+
+    def add_contracuele(self, kind, center, snap=False, snap_tol=SNAP_TOL_M, **params):
+        """
+        Contracuele en 'center' (ver contracuele_holes).
+
+        Con snap=True se centra en la perforación más cercana dentro de
+        snap_tol; si no hay ninguna no agrega nada.
+
+        Retorna:
+            list[int]: rids agregados.
+        """
+        if snap:
+            idx = self.scene.nearest(center[0], center[1], tol_m=snap_tol)
+            if idx is None:
+                return []
+            h = self.scene.holes[idx]
+            center = (h["x"], h["y"])
+        return self._add(contracuele_holes(kind, center, **params), SP_CC, "contracuele")
+
+    def add_aux(self, nx, ny):
+        """Rejilla auxiliar interna nx × ny. Retorna los rids agregados."""
+        self._require_geometry()
+        return self._add(place_aux_grid(self.prep, int(nx), int(ny)), SP_AUX, "aux")
+
+    def transform(self, m, steps=None, tunnels=True):
+        """
+        Aplica la matriz afín m (ver transform.py) al diseño.
+
+        Parámetros:
+            m (np.ndarray): matriz 3×3.
+            steps (iterable|None): solo las perforaciones de esos pasos (None = todas).
+            tunnels (bool): transforma también las galerías; la activa se
+                vuelve a preparar a partir de su polilínea transformada.
+        """
+        rids = None
+        if steps is not None:
+            rids = sorted(r for s in steps for r in self.scene.table.step_rids(s))
+        self.scene.transform(m, rids, tunnels)
+        if tunnels and self.geom_index is not None:
+            self.set_active_tunnel(self.geom_index)
+
+    def clear_step(self, step):
+        """Borra el contenido de un paso. Si es geometría, resetea todo el diseño."""
+        if step == SP_GEOM:
+            self.reset()
+            return
+        self.scene.remove_holes_by_step(step)
+        self.done[step] = False
+
+    # --- spec declarativo ---
+    def run(self, spec):
+        """
+        Aplica un spec declarativo (ver encabezado del módulo) sobre la escena.
+
+        Retorna:
+            Scene
+        """
+        g = spec.get("geometry")
+        if g is not None:
+            g = dict(g)
+            self.set_geometry(g.pop("type"), tuple(g.pop("center", (0.0, 0.0))), **g)
+        if "zapateras" in spec:
+            self.add_zapateras(spec["zapateras"]["n"])
+        if "cajas" in spec:
+            self.add_cajas(spec["cajas"]["n_per_side"])
+        if "corona" in spec:
+            self.add_corona(spec["corona"]["n"])
+        for c in spec.get("cueles", ()):
+            c = dict(c)
+            self.add_cuele(c.pop("type"), tuple(c.pop("center")), **c)
+        for c in spec.get("contracuele", ()):
+            c = dict(c)
+            self.add_contracuele(c.pop("type"), tuple(c.pop("center")), **c)
+        if "aux" in spec:
+            self.add_aux(spec["aux"]["nx"], spec["aux"]["ny"])
+        if "transform" in spec:
+            self.transform(transform_from_spec(spec["transform"]))
+        return self.scene
+
+
+def design_from_spec(spec, arc_tol=ARC_TOL_M):
+    """Crea un motor, aplica el spec y lo retorna (la escena queda en .scene)."""
+    engine = DesignEngine(arc_tol=arc_tol)
+    engine.run(spec)
+    return engine
@@ -0,0 +1,403 @@
+# drift_contour.py
+#
+# CONTORNO ANALÍTICO DE GALERÍAS
+# ------------------------------
+# A diferencia de drift_geometry (que entrega polilíneas), aquí cada galería
+# se describe con sus primitivas exactas:
+#   - Line:        segmento recto (paredes, base, techo plano)
+#   - Arc:         arco circular (semicircular, D-shaped, herradura)
+#   - CubicBezier: techo Bezier cúbico
+#
+# Cada primitiva lleva un rol: "base", "lado_izq", "corona" o "lado_der".
+# El Contour responde longitud, área, punto a una distancia de arco dada y
+# los tramos base/paredes/corona de forma cerrada, sin recorrer polilíneas.
+# Solo se tesela (polyline) cuando algo necesita dibujarse o un test de
+# contención requiere polígono; el resultado queda en caché.
+#
+# Orden (sentido horario, igual que drift_geometry):
+#   izquierda base -> izquierda top -> corona -> derecha top -> derecha base -> cierre
+
+import bisect
+from math import ceil, cos, sin, hypot, pi, sqrt
+
+from drift_geometry import _update_center, arc_segments, bezier_segments
+
+ROLES = ("lado_izq", "corona", "lado_der", "base")
+DEFAULT_TOL = 0.005  # desviación cuerda-curva (m) usada si no se indica otra
+
+# Gauss-Legendre de 5 nodos en [0,1] (exacto hasta grado 9)
+_GL_X = (0.04691007703066800, 0.23076534494715845, 0.5,
+         0.76923465505284155, 0.95308992296933200)
+_GL_W = (0.11846344252809454, 0.23931433524968324, 0.28444444444444444,
+         0.23931433524968324, 0.11846344252809454)
+
+
+# ======================================================================
+# PRIMITIVAS
+# ======================================================================
+
+class Line:
+    """Segmento recto p0 -> p1."""
+
+    def __init__(self, p0, p1, role=""):
+        self.p0 = (float(p0[0]), float(p0[1]))
+        self.p1 = (float(p1[0]), float(p1[1]))
+        self.role = role
+        self.length = hypot(self.p1[0]-self.p0[0], self.p1[1]-self.p0[1])
+
+    def point_at(self, s):
+        """Punto a distancia s (0..length) desde p0."""
+        t = 0.0 if self.length <= 0 else min(max(s/self.length, 0.0), 1.0)
+        (x0,y0), (x1,y1) = self.p0, self.p1
+        return (x0 + t*(x1-x0), y0 + t*(y1-y0))
+
+    def signed_area(self):
+        """Aporte a ½∮(x dy - y dx)."""
+        (x0,y0), (x1,y1) = self.p0, self.p1
+        return 0.5*(x0*y1 - x1*y0)
+
+    def bbox(self):
+        (x0,y0), (x1,y1) = self.p0, self.p1
+        return min(x0,x1), max(x0,x1), min(y0,y1), max(y0,y1)
+
+    def points(self, tol=None, n=None):
+        """Vértices de la teselación (incluye ambos extremos)."""
+        return [self.p0, self.p1]
+
+
+class Arc:
+    """Arco circular de centro c y radio r, desde th0 hasta th1 (rad)."""
+
+    def __init__(self, center, radius, th0, th1, role=""):
+        self.center = (float(center[0]), float(center[1]))
+        self.radius = float(radius)
+        self.th0 = float(th0)
+        self.th1 = float(th1)
+        self.role = role
+        self.length = self.radius * abs(self.th1 - self.th0)
+
+    @property
+    def p0(self):
+        return self._at_angle(self.th0)
+
+    @property
+    def p1(self):
+        return self._at_angle(self.th1)
+
+    def _at_angle(self, th):
+        cx, cy = self.center
+        return (cx + self.radius*cos(th), cy + self.radius*sin(th))
+
+    def point_at(self, s):
+        if self.length <= 0:
+            return self.p0
+        f = min(max(s/self.length, 0.0), 1.0)
+        return self._at_angle(self.th0 + f*(self.th1 - self.th0))
+
+    def signed_area(self):
+        cx, cy = self.center
+        r, a, b = self.radius, self.th0, self.th1
+        return 0.5*(cx*r*(sin(b) - sin(a)) - cy*r*(cos(b) - cos(a)) + r*r*(b - a))
+
+    def bbox(self):
+        xs = [self.p0[0], self.p1[0]]
+        ys = [self.p0[1], self.p1[1]]
+        lo, hi = sorted((self.th0, self.th1))
+        k = ceil(lo/(pi/2))
+        while k*(pi/2) <= hi:
+            x, y = self._at_angle(k*(pi/2))
+            xs.append(x); ys.append(y)
+            k += 1
+        return min(xs), max(xs), min(ys), max(ys)
+
+    def points(self, tol=None, n=None):
+        if n is None:
+            n = int(arc_segments(self.radius, tol or DEFAULT_TOL, abs(self.th1 - self.th0)))
+        d = self.th1 - self.th0
+        cx, cy = self.center
+        r = self.radius
+        out = []
+        for i in range(n + 1):
+            th = self.th0 + (d * i / n)
+            out.append((cx + r*cos(th), cy + r*sin(th)))
+        return out
+
+
+class CubicBezier:
+    """Bezier cúbico con controles p0..p3."""
+
+    _N_SUB = 16  # tramos de la tabla de longitudes
+
+    def __init__(self, p0, p1, p2, p3, role=""):
+        self.p0, self.c1, self.c2, self.p1 = [(float(p[0]), float(p[1])) for p in (p0, p1, p2, p3)]
+        self.role = role
+        self._cum = None
+
+    def point(self, t):
+        (x0,y0), (x1,y1), (x2,y2), (x3,y3) = self.p0, self.c1, self.c2, self.p1
+        b0 = (1-t)**3; b1 = 3*(1-t)**2 * t; b2 = 3*(1-t) * t**2; b3 = t**3
+        return (b0*x0 + b1*x1 + b2*x2 + b3*x3, b0*y0 + b1*y1 + b2*y2 + b3*y3)
+
+    def deriv(self, t):
+        (x0,y0), (x1,y1), (x2,y2), (x3,y3) = self.p0, self.c1, self.c2, self.p1
+        a = 3*(1-t)**2; b = 6*(1-t)*t; c = 3*t**2
+        return (a*(x1-x0) + b*(x2-x1) + c*(x3-x2), a*(y1-y0) + b*(y2-y1) + c*(y3-y2))
+
+    def _speed(self, t):
+        dx, dy = self.deriv(t)
+        return hypot(dx, dy)
+
+    def _len(self, a, b):
+        """Longitud entre parámetros a y b (cuadratura de Gauss-Legendre)."""
+        h = b - a
+        return h * sum(w*self._speed(a + h*x) for x, w in zip(_GL_X, _GL_W))
+
+    def _table(self):
+        if self._cum is None:
+            n = self._N_SUB
+            cum = [0.0]
+            for i in range(n):
+                cum.append(cum[-1] + self._len(i/n, (i+1)/n))
+            self._cum = cum
+        return self._cum
+
+    @property
+    def length(self):
+        return self._table()[-1]
+
+    def t_at(self, s):
+        """Parámetro t cuya longitud de arco desde p0 es s (Newton por tramo)."""
+        cum = self._table()
+        if s <= 0:
+            return 0.0
+        if s >= cum[-1]:
+            return 1.0
+        n = self._N_SUB
+        i = min(bisect.bisect_right(cum, s) - 1, n - 1)
+        a, b = i/n, (i+1)/n
+        t = a + (b - a)*(s - cum[i])/max(cum[i+1] - cum[i], 1e-15)
+        for _ in range(8):
+            sp = self._speed(t)
+            if sp <= 1e-15:
+                break
+            dt = (cum[i] + self._len(a, t) - s)/sp
+            t = min(max(t - dt, a), b)
+            if abs(dt) < 1e-13:
+                break
+        return t
+
+    def point_at(self, s):
+        return self.point(self.t_at(s))
+
+    def signed_area(self):
+        # x·y' - y·x' es polinomio de grado 5: Gauss-Legendre de 5 nodos es exacto
+        acc = 0.0
+        for x, w in zip(_GL_X, _GL_W):
+            px, py = self.point(x)
+            dx, dy = self.deriv(x)
+            acc += w*(px*dy - py*dx)
+        return 0.5*acc
+
+    def bbox(self):
+        xs = [self.p0[0], self.p1[0]]
+        ys = [self.p0[1], self.p1[1]]
+        for k in (0, 1):
+            q0 = self.c1[k] - self.p0[k]
+            q1 = self.c2[k] - self.c1[k]
+            q2 = self.p1[k] - self.c2[k]
+            # B'(t)/3 = a t² + b t + c
+            a = q0 - 2*q1 + q2; b = 2*(q1 - q0); c = q0
+            if abs(a) < 1e-15:
+                roots = [-c/b] if abs(b) > 1e-15 else []
+            else:
+                disc = b*b - 4*a*c
+                roots = [] if disc < 0 else [(-b + sqrt(disc))/(2*a), (-b - sqrt(disc))/(2*a)]
+            for t in roots:
+                if 0.0 < t < 1.0:
+                    (xs if k == 0 else ys).append(self.point(t)[k])
+        return min(xs), max(xs), min(ys), max(ys)
+
+    def points(self, tol=None, n=None):
+        if n is None:
+            m = max(hypot(self.p0[0] - 2*self.c1[0] + self.c2[0], self.p0[1] - 2*self.c1[1] + self.c2[1]),
+                    hypot(self.c1[0] - 2*self.c2[0] + self.p1[0], self.c1[1] - 2*self.c2[1] + self.p1[1]))
+            n = int(bezier_segments(m, tol or DEFAULT_TOL))
+        return [self.point(i / n) for i in range(n + 1)]
+
+
+# ======================================================================
+# CONTORNO
+# ======================================================================
+
+class Span:
+    """Cadena de primitivas contiguas (p.ej. la corona) con parametrización por longitud."""
+
+    def __init__(self, prims):
+        self.prims = list(prims)
+        self.cum = [0.0]
+        for p in self.prims:
+            self.cum.append(self.cum[-1] + p.length)
+
+    @property
+    def length(self):
+        return self.cum[-1]
+
+    def point_at(self, s):
+        """Punto a distancia s desde el inicio del tramo."""
+        if not self.prims:
+            raise ValueError("tramo vacío")
+        i = bisect.bisect_right(self.cum, s) - 1
+        i = max(0, min(i, len(self.prims) - 1))
+        return self.prims[i].point_at(s - self.cum[i])
+
+    def sample_interior(self, n):
+        """n puntos equidistantes sin tocar extremos: s = (i+1)/(n+1)·L."""
+        if n <= 0 or not self.prims:
+            return []
+        L = self.length
+        return [self.point_at((i + 1)/(n + 1)*L) for i in range(n)]
+
+    def sample_centered(self, n):
+        """n puntos en los centros de n franjas iguales: s = (j+½)/n·L."""
+        if n <= 0 or not self.prims:
+            return []
+        L = self.length
+        return [self.point_at((j + 0.5)/n*L) for j in range(n)]
+
+    def sample_inclusive(self, n):
+        """n puntos equidistantes incluyendo ambos extremos (n=1: punto medio)."""
+        if n <= 0 or not self.prims:
+            return []
+        L = self.length
+        if n == 1:
+            return [self.point_at(L/2)]
+        return [self.point_at(k*L/(n - 1)) for k in range(n)]
+
+
+class Contour:
+    """
+    Contorno cerrado formado por primitivas exactas con roles.
+
+    Atributos:
+        prims (list): primitivas en orden horario.
+        kind (str): tipo de galería de origen (informativo).
+    """
+
+    def __init__(self, prims, kind=""):
+        self.prims = list(prims)
+        self.kind = kind
+        self._spans = {}
+        self._polys = {}
+        self._all = Span(self.prims)
+
+    @property
+    def length(self):
+        """Perímetro exacto."""
+        return self._all.length
+
+    @property
+    def area(self):
+        """Área encerrada (Green sobre las primitivas, sin teselar)."""
+        return abs(sum(p.signed_area() for p in self.prims))
+
+    def bbox(self):
+        """(xmin, xmax, ymin, ymax) exacto."""
+        bbs = [p.bbox() for p in self.prims]
+        return (min(b[0] for b in bbs), max(b[1] for b in bbs),
+                min(b[2] for b in bbs), max(b[3] for b in bbs))
+
+    def point_at(self, s):
+        """Punto a distancia s recorriendo el contorno desde el inicio."""
+        return self._all.point_at(s % self.length if self.length > 0 else 0.0)
+
+    def span(self, role):
+        """Tramo con el rol dado ('base', 'lado_izq', 'lado_der', 'corona')."""
+        if role not in self._spans:
+            self._spans[role] = Span([p for p in self.prims if p.role == role])
+        return self._spans[role]
+
+    @property
+    def wall_top_y(self):
+        """Cota de las cabezas de pared (donde nace la corona)."""
+        return min(self.span("lado_izq").prims[-1].p1[1], self.span("lado_der").prims[0].p0[1])
+
+    def polyline(self, tol=None, n=None):
+        """
+        Polilínea cerrada [(x,y), ...] para dibujo o tests de contención.
+        Las curvas usan 'n' segmentos o, si no, la tolerancia 'tol' (m).
+        El resultado se guarda en caché por (tol, n).
+        """
+        key = (tol, n)
+        if key not in self._polys:
+            pts = []
+            for p in self.prims:
+                seg = p.points(tol=tol, n=n if not isinstance(p, Line) else None)
+                if pts and pts[-1] == seg[0]:
+                    seg = seg[1:]
+                pts.extend(seg)
+            if pts and pts[0] != pts[-1]:
+                pts.append(pts[0])
+            self._polys[key] = pts
+        return self._polys[key]
+
+
+# ======================================================================
+# CONSTRUCTORES (mismos parámetros que drift_geometry)
+# ======================================================================
+
+def _walled(cx, yb, yt, xl, xr, crown, kind):
+    lb, lt, rt, rb = (xl, yb), (xl, yt), (xr, yt), (xr, yb)
+    return Contour([
+        Line(lb, lt, "lado_izq"),
+        crown,
+        Line(rt, rb, "lado_der"),
+        Line(rb, lb, "base"),
+    ], kind=kind)
+
+
+def rectangular_contour(center_x, center_y, width, height):
+    """Rectángulo con base en y=center_y; el techo plano es la corona."""
+    dx = width*0.5
+    yb, yt = center_y, center_y + height
+    crown = Line((center_x - dx, yt), (center_x + dx, yt), "corona")
+    return _walled(center_x, yb, yt, center_x - dx, center_x + dx, crown, "rectangular")
+
+
+def semicircular_contour(center_x, center_y, radius, offset_x=0.0, offset_y=0.0):
+    """Paredes de alto 'radius' y arco de radio 'radius' (como semicircular)."""
+    cx, cy = _update_center(center_x, center_y, offset_x, offset_y)
+    r = radius
+    yt = cy + r
+    crown = Arc((cx, yt), r, pi, 0.0, "corona")
+    return _walled(cx, cy, yt, cx - r, cx + r, crown, "semicircular")
+
+
+def d_shaped_contour(center_x, center_y, width, height, offset_x=0.0, offset_y=0.0):
+    """Paredes hasta height - width/2 y semicírculo de radio width/2."""
+    cx, cy = _update_center(center_x, center_y, offset_x, offset_y)
+    r = width*0.5
+    yt = cy + max(height - r, 0.0)
+    crown = Arc((cx, yt), r, pi, 0.0, "corona")
+    return _walled(cx, cy, yt, cx - r, cx + r, crown, "d_shaped")
+
+
+def horseshoe_contour(center_x, center_y, width, height, offset_x=0.0, offset_y=0.0):
+    """Paredes de alto 'height' y semicírculo de radio width/2."""
+    cx, cy = _update_center(center_x, center_y, offset_x, offset_y)
+    r = width*0.5
+    yt = cy + height
+    crown = Arc((cx, yt), r, pi, 0.0, "corona")
+    return _walled(cx, cy, yt, cx - r, cx + r, crown, "horseshoe")
+
+
+def bezier_contour(center_x, center_y, width, wall_height, curve_height,
+                   offset_x=0.0, offset_y=0.0):
+    """Paredes hasta wall_height y techo Bezier cúbico con bombeo curve_height."""
+    cx, cy = _update_center(center_x, center_y, offset_x, offset_y)
+    yt = cy + wall_height
+    x0 = cx - width*0.5
+    x3 = cx + width*0.5
+    crown = CubicBezier((x0, yt), (x0 + width/3.0, yt + curve_height),
+                        (x0 + 2.0*width/3.0, yt + curve_height), (x3, yt), "corona")
+    return _walled(cx, cy, yt, x0, x3, crown, "bezier")
+
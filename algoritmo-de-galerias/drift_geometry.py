@@ -11,140 +11,224 @@ Orden de los vértices (sentido horario):
   izquierda base -> izquierda top -> techo/curva -> derecha top -> derecha base -> (cierre)
 """
  
-from math import cos, sin, pi, pow
+from math import pi
+
+import numpy as np
  
 # ---------------- Utilidad ----------------
 def _update_center(center_x: float, center_y: float,
                    offset_x: float = 0.0, offset_y: float = 0.0):
     return center_x + offset_x, center_y + offset_y
  
+# ---------------- Generador en lote ----------------
+PROFILE_KINDS = ("rectangular", "semicircular", "d_shaped", "horseshoe", "bezier")
+
+
+def _per_profile(values, m, name):
+    """Expande un escalar o arreglo a un vector (m,) de floats."""
+    if values is None:
+        raise ValueError(f"'{name}' es obligatorio para este tipo de galería")
+    arr = np.asarray(values, dtype=float).reshape(-1)
+    if arr.size == 1:
+        return np.full(m, arr[0])
+    if arr.size != m:
+        raise ValueError(f"'{name}' debe tener {m} valores (uno por galería)")
+    return arr
+
+
+def arc_segments(radius, tol, span=pi):
+    """
+    Mínimo número de cuerdas para un arco de radio 'radius' y ángulo 'span'
+    tal que la flecha (desviación cuerda-arco) no supere 'tol' metros.
+    Acepta escalares o arreglos; siempre retorna al menos 2 segmentos.
+    """
+    if tol <= 0:
+        raise ValueError("tol debe ser > 0")
+    r = np.asarray(radius, dtype=float)
+    ratio = np.clip(1.0 - tol / np.maximum(r, 1e-12), -1.0, 1.0)
+    dth = 2.0 * np.arccos(ratio)  # ángulo máximo por cuerda
+    n = np.ceil(span / np.maximum(dth, 1e-12) - 1e-9).astype(int)
+    return np.maximum(n, 2)
+
+
+def bezier_segments(curve_height, tol):
+    """
+    Mínimo número de tramos (parámetro t uniforme) del techo Bezier para que
+    la desviación no supere 'tol' metros. Usa la cota |B - cuerda| ≤ máx|B''|/(8n²)
+    con |B''| ≤ 6·|curve_height| para los controles de bezier_tunnel.
+    """
+    if tol <= 0:
+        raise ValueError("tol debe ser > 0")
+    ch = np.abs(np.asarray(curve_height, dtype=float))
+    n = np.ceil(np.sqrt(0.75 * ch / tol) - 1e-9).astype(int)
+    return np.maximum(n, 1)
+
+
+def profiles_batch(kind, centers, widths, heights=None, curve_heights=None,
+                   n_points=30, offset_x=0.0, offset_y=0.0, tol=None):
+    """
+    Genera en lote los contornos de m galerías del mismo tipo.
+
+    Parámetros:
+        kind (str): uno de PROFILE_KINDS.
+        centers (array (m,2)): puntos base (click) de cada galería.
+        widths (array (m,) o escalar): ancho total; en 'semicircular' es 2·radio.
+        heights (array (m,) o escalar): alto (rectangular, d_shaped),
+            altura de paredes (horseshoe, bezier); no se usa en 'semicircular'.
+        curve_heights (array (m,) o escalar): bombeo del techo (solo 'bezier').
+        n_points (int): segmentos del arco/curva superior (si tol es None).
+        offset_x, offset_y (float): desplazamiento común del centro.
+        tol (float|None): desviación máxima cuerda-curva en metros; si se da,
+            cada galería usa el mínimo número de segmentos que la cumple.
+
+    Retorna:
+        (verts, offsets): verts es un arreglo (N,2) con todos los contornos
+        concatenados; el contorno k es verts[offsets[k]:offsets[k+1]].
+        Cada contorno sigue el orden del módulo y viene cerrado.
+    """
+    if kind not in PROFILE_KINDS:
+        raise ValueError(f"kind debe ser uno de {PROFILE_KINDS}")
+    c = np.asarray(centers, dtype=float).reshape(-1, 2)
+    m = len(c)
+    cx = c[:, 0] + offset_x
+    cy = c[:, 1] + offset_y
+    w = _per_profile(widths, m, "widths")
+    r = w * 0.5
+    yb = cy
+
+    ch = None
+    if kind in ("rectangular", "horseshoe", "bezier"):
+        yt = cy + _per_profile(heights, m, "heights")
+    elif kind == "semicircular":
+        yt = cy + r
+    else:  # d_shaped
+        yt = cy + np.maximum(_per_profile(heights, m, "heights") - r, 0.0)
+    if kind == "bezier":
+        ch = _per_profile(curve_heights, m, "curve_heights")
+
+    # segmentos de la curva superior por galería
+    if kind == "rectangular":
+        n_seg = np.full(m, -1)  # sin curva
+    elif tol is None:
+        n_seg = np.full(m, int(n_points))
+    elif kind == "bezier":
+        n_seg = bezier_segments(ch, tol)
+    else:
+        n_seg = arc_segments(r, tol)
+
+    # izquierda base -> izquierda top -> curva -> derecha top -> derecha base -> cierre
+    counts = n_seg + 6
+    offsets = np.zeros(m + 1, dtype=int)
+    np.cumsum(counts, out=offsets[1:])
+    verts = np.empty((offsets[-1], 2))
+
+    for n in np.unique(n_seg):
+        n = int(n)
+        idx = np.nonzero(n_seg == n)[0]
+        k = len(idx)
+        gx, gr, gyt = cx[idx], r[idx], yt[idx]
+        if n < 0:
+            curve = np.empty((k, 0, 2))
+        elif kind == "bezier":
+            x0 = gx - w[idx] * 0.5
+            x3 = gx + w[idx] * 0.5
+            x1, y1 = x0 + w[idx]/3.0, gyt + ch[idx]
+            x2, y2 = x0 + 2.0*w[idx]/3.0, gyt + ch[idx]
+            # base de Bernstein con potencias escalares (np.power difiere en el último bit)
+            ts = [i / n for i in range(n + 1)]
+            b0 = np.array([(1-t)**3 for t in ts])
+            b1 = np.array([3*(1-t)**2 * t for t in ts])
+            b2 = np.array([3*(1-t) * t**2 for t in ts])
+            b3 = np.array([t**3 for t in ts])
+            curve = np.empty((k, n + 1, 2))
+            curve[:, :, 0] = (b0 * x0[:, None] + b1 * x1[:, None]
+                              + b2 * x2[:, None] + b3 * x3[:, None])
+            curve[:, :, 1] = (b0 * gyt[:, None] + b1 * y1[:, None]
+                              + b2 * y2[:, None] + b3 * gyt[:, None])
+        else:
+            th = pi - (pi * np.arange(n + 1) / n)  # pi -> 0
+            curve = np.empty((k, n + 1, 2))
+            curve[:, :, 0] = gx[:, None] + gr[:, None] * np.cos(th)
+            curve[:, :, 1] = gyt[:, None] + gr[:, None] * np.sin(th)
+
+        xl, xr = gx - gr, gx + gr
+        block = np.empty((k, n + 6, 2))
+        block[:, 0, 0], block[:, 0, 1] = xl, yb[idx]
+        block[:, 1, 0], block[:, 1, 1] = xl, gyt
+        block[:, 2:-3] = curve
+        block[:, -3, 0], block[:, -3, 1] = xr, gyt
+        block[:, -2, 0], block[:, -2, 1] = xr, yb[idx]
+        block[:, -1] = block[:, 0]
+        rows = offsets[idx][:, None] + np.arange(n + 6)
+        verts[rows.reshape(-1)] = block.reshape(-1, 2)
+    return verts, offsets
+
+
+def split_profiles(verts, offsets):
+    """
+    Convierte la salida de profiles_batch en listas de tuplas [(x,y), ...].
+    """
+    return [[(float(x), float(y)) for x, y in verts[a:b]]
+            for a, b in zip(offsets[:-1], offsets[1:])]
+
+
+def _single(kind, center_x, center_y, width, height=None, curve_height=None, **kw):
+    verts, offsets = profiles_batch(kind, [(center_x, center_y)], width, height,
+                                    curve_height, **kw)
+    return split_profiles(verts, offsets)[0]
+
 # ---------------- 1) Rectangular ----------------
 def rectangular(center_x: float, center_y: float, width: float, height: float):
     """
     Rectángulo con base en y=center_y y techo en y=center_y+height.
     """
-    cx, cy = center_x, center_y
-    dx = width * 0.5
-    yb = cy
-    yt = cy + height
- 
-    left_base  = (cx - dx, yb)
-    left_top   = (cx - dx, yt)
-    right_top  = (cx + dx, yt)
-    right_base = (cx + dx, yb)
- 
-    verts = [left_base, left_top, right_top, right_base, left_base]  # cerrado
-    return verts
+    return _single("rectangular", center_x, center_y, width, height)
  
 # ---------------- 2) Semicircular (base plana) ----------------
 def semicircular(center_x: float, center_y: float, radius: float,
-                 n_points: int = 30, offset_x: float = 0.0, offset_y: float = 0.0):
+                 n_points: int = 30, offset_x: float = 0.0, offset_y: float = 0.0,
+                 tol: float = None):
     """
     Base en y=center_y, arco superior de radio 'radius' hasta y=center_y+radius.
+    Con 'tol' (m) el arco usa el mínimo de puntos con esa desviación máxima.
     """
-    cx, cy = _update_center(center_x, center_y, offset_x, offset_y)
-    r = radius
-    yb = cy
-    yt = cy + r
- 
-    left_base  = (cx - r, yb)
-    right_base = (cx + r, yb)
- 
-    verts = [left_base, (cx - r, yt)]  # sube pared izquierda hasta inicio del arco
-    # arco de izquierda (pi) a derecha (0)
-    for i in range(n_points + 1):
-        th = pi - (pi * i / n_points)  # pi -> 0
-        x = cx + r * cos(th)
-        y = yt + r * sin(th)
-        verts.append((x, y))
-    verts += [(cx + r, yt), right_base, left_base]  # pared derecha, base, cierre
-    return verts
+    return _single("semicircular", center_x, center_y, 2.0*radius,
+                   n_points=n_points, offset_x=offset_x, offset_y=offset_y, tol=tol)
  
 # ---------------- 3) D-Shaped ----------------
 def d_shaped(center_x: float, center_y: float, width: float, height: float,
-             n_points: int = 30, offset_x: float = 0.0, offset_y: float = 0.0):
+             n_points: int = 30, offset_x: float = 0.0, offset_y: float = 0.0,
+             tol: float = None):
     """
     Paredes rectas hasta y_top, y semicírculo superior de radio = width/2.
+    Con 'tol' (m) el arco usa el mínimo de puntos con esa desviación máxima.
     """
-    cx, cy = _update_center(center_x, center_y, offset_x, offset_y)
-    r = width * 0.5
-    wall_h = max(height - r, 0.0)
-    yb = cy
-    yt = cy + wall_h
- 
-    left_base  = (cx - r, yb)
-    left_top   = (cx - r, yt)
-    right_top  = (cx + r, yt)
-    right_base = (cx + r, yb)
- 
-    verts = [left_base, left_top]
-    # arco superior (izq->der)
-    for i in range(n_points + 1):
-        th = pi - (pi * i / n_points)  # pi -> 0
-        x = cx + r * cos(th)
-        y = yt + r * sin(th)
-        verts.append((x, y))
-    verts += [right_top, right_base, left_base]
-    return verts
+    return _single("d_shaped", center_x, center_y, width, height,
+                   n_points=n_points, offset_x=offset_x, offset_y=offset_y, tol=tol)
  
 # ---------------- 4) Horseshoe (herradura) ----------------
 def horseshoe(center_x: float, center_y: float, width: float, height: float,
-              n_curve: int = 24, offset_x: float = 0.0, offset_y: float = 0.0):
+              n_curve: int = 24, offset_x: float = 0.0, offset_y: float = 0.0,
+              tol: float = None):
     """
     Herradura clásica: paredes rectas hasta y_top y semicírculo superior
     de radio = width/2 (NO usa width completo en y, así no “explota” al click).
  
     width: ancho total en la base
     height: altura recta de paredes (hasta el inicio del arco)
+    tol: desviación máxima del arco en metros (reemplaza n_curve si se da)
     """
-    cx, cy = _update_center(center_x, center_y, offset_x, offset_y)
-    r = width * 0.5
-    yb = cy
-    yt = cy + height
- 
-    left_base  = (cx - r, yb)
-    left_top   = (cx - r, yt)
-    right_top  = (cx + r, yt)
-    right_base = (cx + r, yb)
- 
-    verts = [left_base, left_top]
-    # arco superior (izq->der) centrado en (cx, yt) con radio r
-    for i in range(n_curve + 1):
-        th = pi - (pi * i / n_curve)  # pi -> 0
-        x = cx + r * cos(th)
-        y = yt + r * sin(th)
-        verts.append((x, y))
-    verts += [right_top, right_base, left_base]
-    return verts
+    return _single("horseshoe", center_x, center_y, width, height,
+                   n_points=n_curve, offset_x=offset_x, offset_y=offset_y, tol=tol)
  
 # ---------------- 5) Bezier (techo Bezier + paredes) ----------------
 def bezier_tunnel(center_x: float, center_y: float, width: float,
                   wall_height: float, curve_height: float, n_points: int = 30,
-                  offset_x: float = 0.0, offset_y: float = 0.0):
+                  offset_x: float = 0.0, offset_y: float = 0.0, tol: float = None):
     """
     Paredes rectas hasta y_top = center_y + wall_height
     y techo Bezier cúbico de (x0,y_top) a (x3,y_top) con bombeo 'curve_height'.
+    Con 'tol' (m) la curva usa el mínimo de puntos con esa desviación máxima.
     """
-    cx, cy = _update_center(center_x, center_y, offset_x, offset_y)
-    yb = cy
-    yt = cy + wall_height
-    x0 = cx - width * 0.5
-    x3 = cx + width * 0.5
-    # controles Bezier (suben curve_height)
-    x1, y1 = x0 + width/3.0, yt + curve_height
-    x2, y2 = x0 + 2.0*width/3.0, yt + curve_height
- 
-    left_base  = (x0, yb)
-    left_top   = (x0, yt)
-    right_top  = (x3, yt)
-    right_base = (x3, yb)
- 
-    verts = [left_base, left_top]
-    # curva superior Bezier de izq->der
-    for i in range(n_points + 1):
-        t = i / n_points
-        Bx = (1-t)**3 * x0 + 3*(1-t)**2 * t * x1 + 3*(1-t) * t**2 * x2 + t**3 * x3
-        By = (1-t)**3 * yt + 3*(1-t)**2 * t * y1 + 3*(1-t) * t**2 * y2 + t**3 * yt
-        verts.append((Bx, By))
-    verts += [right_top, right_base, left_base]
-    return verts
\ No newline at end of file
+    return _single("bezier", center_x, center_y, width, wall_height, curve_height,
+                   n_points=n_points, offset_x=offset_x, offset_y=offset_y, tol=tol)
@@ -10,12 +10,22 @@
 #   - Auxiliares: rejilla interna recortada al contorno (robusto)
 #   - Contracuele: figura alrededor de un centro (hexágono/rectángulo)
 #
+# Los colocadores en contorno aceptan también un Contour analítico
+# (drift_contour): en ese caso base/paredes/corona se toman de sus
+# primitivas y el espaciado sobre curvas es exacto, sin escanear polilíneas.
+# Para varias llamadas sobre la misma galería conviene pasar un
+# PreparedContour (prepare_contour), que clasifica el contorno una sola vez.
+#
 # Todas las funciones devuelven una lista de dicts con llaves:
 #   {"x": float, "y": float, "is_void": bool, "note": str}
 
 
 from math import cos, sin, pi
 
+import numpy as np
+
+from drift_contour import Contour, DEFAULT_TOL
+
 
 # ======================================================================
 # UTILIDADES BÁSICAS
@@ -37,21 +47,6 @@ def _pt(x, y, note="", is_void=False):
     return {"x": x, "y": y, "is_void": bool(is_void), "note": note}
 
 
-def _bbox(poly):
-    """
-    Bounding box de una polilínea.
-
-    Parámetros:
-        poly (list[tuple]): [(x,y), ...] abierta o cerrada.
-
-    Retorna:
-        tuple: (xmin, xmax, ymin, ymax)
-    """
-    xs = [p[0] for p in poly]
-    ys = [p[1] for p in poly]
-    return min(xs), max(xs), min(ys), max(ys)
-
-
 def _interp(a, b, t):
     """
     Interpolación lineal entre dos puntos.
@@ -67,124 +62,6 @@ def _interp(a, b, t):
     return (a[0] + t*(b[0]-a[0]), a[1] + t*(b[1]-a[1]))
 
 
-def _poly_length(poly):
-    """
-    Longitud total de una polilínea (suma de segmentos contiguos).
-
-    Parámetros:
-        poly (list[tuple]): [(x,y), ...]
-
-    Retorna:
-        float: longitud
-    """
-    import math
-    L = 0.0
-    for i in range(len(poly)-1):
-        x1,y1 = poly[i]
-        x2,y2 = poly[i+1]
-        L += math.hypot(x2-x1, y2-y1)
-    return L
-
-
-# ======================================================================
-# DETECCIÓN DE SEGMENTOS CON BASE/TECHO/LADOS
-# ======================================================================
-
-def _segments_mask_by_coord(poly, which="base", eps=0.02):
-    """
-    Devuelve índices de segmentos alineados con una banda del bounding box.
-
-    Parámetros:
-        poly (list[tuple]): polilínea [(x,y), ...] abierta o cerrada.
-        which (str): "base" (y≈ymin), "techo" (y≈ymax),
-                      "lado_izq" (x≈xmin), "lado_der" (x≈xmax)
-        eps (float): tolerancia relativa (por defecto 2%)
-
-    Retorna:
-        list[int]: índices i tales que el segmento (poly[i]→poly[i+1]) está en esa banda.
-    """
-    xmin,xmax,ymin,ymax = _bbox(poly)
-    dx = max(xmax - xmin, 1e-6)
-    dy = max(ymax - ymin, 1e-6)
-
-    idxs = []
-    for i in range(len(poly)-1):
-        x1,y1 = poly[i]
-        x2,y2 = poly[i+1]
-        if which == "base":
-            if abs(y1 - ymin) <= eps*dy and abs(y2 - ymin) <= eps*dy:
-                idxs.append(i)
-        elif which == "techo":
-            if abs(y1 - ymax) <= eps*dy and abs(y2 - ymax) <= eps*dy:
-                idxs.append(i)
-        elif which == "lado_izq":
-            if abs(x1 - xmin) <= eps*dx and abs(x2 - xmin) <= eps*dx:
-                idxs.append(i)
-        elif which == "lado_der":
-            if abs(x1 - xmax) <= eps*dx and abs(x2 - xmax) <= eps*dx:
-                idxs.append(i)
-    return idxs
-
-
-def _sample_on_segment_equidistant(a, b, n):
-    """
-    n puntos equidistantes en un segmento SIN tocar vértices.
-
-    Parámetros:
-        a (tuple): (x1,y1)
-        b (tuple): (x2,y2)
-        n (int): cantidad
-
-    Retorna:
-        list[tuple]: [(x,y), ...]
-    """
-    if n <= 0:
-        return []
-    return [_interp(a,b,(i+1)/(n+1)) for i in range(n)]
-
-
-# ======================================================================
-# REPARTO EQUITATIVO SOBRE UN CONJUNTO DE SEGMENTOS
-# ======================================================================
-
-def _distribute_over_segments(poly, idxs, n):
-    """
-    Coloca n puntos equiespaciados a lo largo de varios segmentos continuos,
-    respetando su longitud total (sin tocar vértices).
-
-    Parámetros:
-        poly (list[tuple]): polilínea [(x,y), ...]
-        idxs (list[int]): índices de segmentos seleccionados
-        n (int): cantidad total de puntos a repartir
-
-    Retorna:
-        list[tuple]: [(x,y), ...] puntos sobre la cadena de segmentos
-    """
-    import math
-    if not idxs or n <= 0:
-        return []
-
-    segs  = [(poly[i], poly[i+1]) for i in idxs]
-    lens  = [math.hypot(b[0]-a[0], b[1]-a[1]) for (a,b) in segs]
-    Ltot  = sum(lens)
-    if Ltot <= 0:
-        return []
-
-    # Posiciones objetivo (centros de franja) en coordenada “longitud”
-    targets = [ (j + 0.5) / n * Ltot for j in range(n) ]
-
-    pts = []
-    acc = 0.0
-    k   = 0
-    for ln, (a,b) in zip(lens, segs):
-        while k < n and targets[k] <= acc + ln:
-            t = (targets[k] - acc)/ln if ln > 1e-12 else 0.5
-            pts.append(_interp(a, b, t))
-            k += 1
-        acc += ln
-    return pts
-
-
 # ======================================================================
 # ARCO SUPERIOR ENTRE CABEZAS DE PARED
 # ======================================================================
@@ -263,74 +140,130 @@ def _extract_longest_arc_above(poly, y_cut):
     return arcs[0]
 
 
-def _sample_on_open_poly(poly, n):
-    """
-    Muestreo equiespaciado sobre una polilínea ABIERTA.
-
-    Parámetros:
-        poly (list[tuple]): [(x,y), ...] abierta
-        n (int): cantidad de puntos
+# ======================================================================
+# CONTORNO PREPARADO (CACHÉ PARA TODOS LOS COLOCADORES)
+# ======================================================================
 
-    Retorna:
-        list[tuple]: [(x,y), ...]
+class PreparedContour:
     """
-    import math, bisect
-    if n <= 0 or len(poly) < 2:
-        return []
-    d = [0.0]
-    for i in range(len(poly)-1):
-        x1,y1 = poly[i]
-        x2,y2 = poly[i+1]
-        d.append(d[-1] + math.hypot(x2-x1, y2-y1))
-    L = d[-1] if d[-1] > 0 else 1.0
-
-    def point_at(s):
-        if s <= 0: return poly[0]
-        if s >= L: return poly[-1]
-        i = max(0, min(len(poly)-2, bisect.bisect_right(d, s)-1))
-        ds = s - d[i]
-        x1,y1 = poly[i]
-        x2,y2 = poly[i+1]
-        seg = d[i+1] - d[i]
-        t = 0.0 if abs(seg) < 1e-12 else ds/seg
-        return (x1 + t*(x2-x1), y1 + t*(y2-y1))
-
-    if n == 1:
-        return [point_at(L/2)]
-    step = L/(n-1)
-    return [point_at(k*step) for k in range(n)]
-
-
-def _wall_top_y(poly):
-    """
-    Estima la cota Y de la cabeza de muro (parte superior de las paredes).
-    Busca segmentos verticales cerca de x≈xmin y x≈xmax y toma el máximo Y
-    de cada lado; retorna el mínimo de ambos (para quedar entre paredes).
+    Contorno clasificado una sola vez para reutilizarlo en todos los place_*.
 
-    Parámetros:
-        poly (list[tuple]): contorno de galería
+    En un solo barrido (vectorizado) separa base / lado izquierdo / lado
+    derecho / techo, y guarda las tablas de longitud acumulada de cada cadena,
+    la cabeza de muro, el arco de corona y las aristas como arreglos.
 
-    Retorna:
-        float: y_cut recomendado para el arco de corona.
+    Atributos:
+        poly (list[tuple]): polilínea cerrada del contorno.
+        contour (Contour|None): contorno analítico de origen, si lo hay.
+        tol (float): desviación cuerda-curva con que se teseló el Contour.
+        bbox (tuple): (xmin, xmax, ymin, ymax).
+        edges (np.ndarray): (m,4) con x0, y0, x1, y1 de cada arista.
+        seg_len (np.ndarray): (m,) longitud de cada arista.
+        chains (dict): rol -> (idxs, cum) para "base", "lado_izq",
+            "lado_der" y "techo"; cum es la longitud acumulada (k+1,).
+        y_wall_top (float): cota de cabeza de muro.
+        crown (np.ndarray): (k,2) arco de corona; crown_cum su tabla (k,).
     """
-    xmin,xmax,ymin,ymax = _bbox(poly)
-    left_idxs  = _segments_mask_by_coord(poly, "lado_izq")
-    right_idxs = _segments_mask_by_coord(poly, "lado_der")
 
-    def max_y_on_segments(idxs):
-        ys=[]
-        for i in idxs:
-            ys.append(poly[i][1])
-            ys.append(poly[i+1][1])
-        return max(ys) if ys else None
+    def __init__(self, tunnel, eps=0.02, tol=DEFAULT_TOL):
+        self.tol = tol
+        if isinstance(tunnel, Contour):
+            self.contour = tunnel
+            poly = tunnel.polyline(tol=tol)
+        else:
+            self.contour = None
+            poly = list(tunnel)
+        if poly and poly[0] != poly[-1]:
+            closed = poly + [poly[0]]
+        else:
+            closed = poly
+        self.poly = poly
+        P = np.asarray(closed, dtype=float).reshape(-1, 2)
+        self.edges = np.hstack([P[:-1], P[1:]])
+        x0, y0, x1, y1 = self.edges.T
+        self.seg_len = np.hypot(x1 - x0, y1 - y0)
+
+        # bbox y bandas sobre la polilínea tal como viene (sin el cierre agregado)
+        V = np.asarray(poly, dtype=float).reshape(-1, 2)
+        xmin, ymin = V.min(axis=0)
+        xmax, ymax = V.max(axis=0)
+        self.bbox = (float(xmin), float(xmax), float(ymin), float(ymax))
+        dx = max(xmax - xmin, 1e-6)
+        dy = max(ymax - ymin, 1e-6)
+        # aristas de la polilínea original (sin la de cierre agregada)
+        m = len(V) - 1
+        X0, Y0, X1, Y1 = x0[:m], y0[:m], x1[:m], y1[:m]
+        masks = {
+            "base":     (np.abs(Y0 - ymin) <= eps*dy) & (np.abs(Y1 - ymin) <= eps*dy),
+            "techo":    (np.abs(Y0 - ymax) <= eps*dy) & (np.abs(Y1 - ymax) <= eps*dy),
+            "lado_izq": (np.abs(X0 - xmin) <= eps*dx) & (np.abs(X1 - xmin) <= eps*dx),
+            "lado_der": (np.abs(X0 - xmax) <= eps*dx) & (np.abs(X1 - xmax) <= eps*dx),
+        }
+        self.chains = {}
+        for role, mask in masks.items():
+            idxs = np.nonzero(mask)[0]
+            cum = np.zeros(len(idxs) + 1)
+            np.cumsum(self.seg_len[idxs], out=cum[1:])
+            self.chains[role] = (idxs, cum)
+
+        # cabeza de muro y arco de corona (una sola vez)
+        if self.contour is not None:
+            self.y_wall_top = self.contour.wall_top_y
+        else:
+            tops = [max(Y0[i].max(), Y1[i].max()) for i in
+                    (self.chains["lado_izq"][0], self.chains["lado_der"][0]) if len(i)]
+            self.y_wall_top = float(min(tops)) if len(tops) == 2 else float(ymax - 0.02*(ymax - ymin))
+        arc = _extract_longest_arc_above(poly, self.y_wall_top) if len(poly) >= 2 else []
+        self.crown = np.asarray(arc, dtype=float).reshape(-1, 2)
+        self.crown_cum = np.zeros(len(self.crown))
+        if len(self.crown) >= 2:
+            np.cumsum(np.hypot(*np.diff(self.crown, axis=0).T), out=self.crown_cum[1:])
+
+    def contains(self, xs, ys, include_boundary=False):
+        """Máscara de contención para muchos puntos (ver points_in_polygon)."""
+        return points_in_polygon(self.edges, xs, ys, include_boundary=include_boundary)
+
+    def chain_points(self, role, s):
+        """Puntos a las distancias s (arreglo) a lo largo de la cadena 'role'."""
+        idxs, cum = self.chains[role]
+        if len(idxs) == 0:
+            return []
+        e = self.edges[idxs]
+        return _points_on_chain(e[:, :2], e[:, 2:], cum, np.asarray(s, dtype=float))
+
+    def crown_points(self, s):
+        """Puntos a las distancias s sobre el arco de corona."""
+        return _points_on_chain(self.crown[:-1], self.crown[1:], self.crown_cum,
+                                np.clip(np.asarray(s, dtype=float), 0.0, self.crown_cum[-1]))
+
+
+def _points_on_chain(P0, P1, cum, s):
+    """
+    Interpola puntos sobre una cadena de segmentos P0[i]->P1[i] con tabla
+    de longitud acumulada cum (k+1,), para las distancias s.
+    """
+    k = len(P0)
+    if k == 0 or len(s) == 0:
+        return []
+    i = np.clip(np.searchsorted(cum, s, side="right") - 1, 0, k - 1)
+    ln = cum[i + 1] - cum[i]
+    t = np.where(ln > 1e-12, (s - cum[i]) / np.where(ln > 1e-12, ln, 1.0), 0.5)
+    t = np.clip(t, 0.0, 1.0)
+    pts = P0[i] + t[:, None]*(P1[i] - P0[i])
+    return [(float(x), float(y)) for x, y in pts]
 
-    yl = max_y_on_segments(left_idxs)
-    yr = max_y_on_segments(right_idxs)
 
-    if yl is not None and yr is not None:
-        return min(yl, yr)  # segura: entre las cabezas
-    # Fallback suave (por ejemplo en semicircular sin paredes):
-    return ymax - 0.02*(ymax - ymin)
+def prepare_contour(tunnel, tol=DEFAULT_TOL):
+    """
+    Retorna un PreparedContour para 'tunnel' (polilínea, Contour o ya preparado).
+    Construirlo una vez por galería y pasarlo a todos los place_* evita
+    reclasificar el contorno en cada llamada. Un Contour se tesela con la
+    desviación 'tol', que debe ser la misma de la polilínea que se dibuja y
+    exporta para que el recorte interior calce con ella.
+    """
+    if isinstance(tunnel, PreparedContour):
+        return tunnel
+    return PreparedContour(tunnel, tol=tol)
 
 
 # ======================================================================
@@ -342,37 +275,49 @@ def place_zapateras(tunnel_poly, n, note="zapatera"):
     Coloca n perforaciones equidistantes sobre la BASE (y≈ymin).
 
     Parámetros:
-        tunnel_poly (list[tuple]): contorno de la galería
+        tunnel_poly (list[tuple]|Contour|PreparedContour): contorno de la galería
         n (int): cantidad total a colocar
         note (str): etiqueta
 
     Retorna:
         list[dict]: perforaciones en base
     """
-    idxs = _segments_mask_by_coord(tunnel_poly, "base")
-    pts = _distribute_over_segments(tunnel_poly, idxs, n)
+    if n <= 0:
+        return []
+    pc = prepare_contour(tunnel_poly)
+    if pc.contour is not None:
+        pts = pc.contour.span("base").sample_centered(n)
+    else:
+        L = pc.chains["base"][1][-1]
+        pts = pc.chain_points("base", (np.arange(n) + 0.5) / n * L) if L > 0 else []
     return [_pt(x,y, note=note) for (x,y) in pts]
 
 
 def place_cajas(tunnel_poly, n_per_side, note="caja"):
     """
     Coloca perforaciones en ambos LADOS (izq y der), sin tocar vértices.
+    Cada lado se trata como una sola cadena, así el número de perforaciones
+    no depende de la teselación del contorno (n_points o tol).
 
     Parámetros:
-        tunnel_poly (list[tuple]): contorno de la galería
+        tunnel_poly (list[tuple]|Contour|PreparedContour): contorno de la galería
         n_per_side (int): cantidad por lado (misma para izq y der)
         note (str): etiqueta
 
     Retorna:
         list[dict]: perforaciones en paredes
     """
+    if n_per_side <= 0:
+        return []
+    pc = prepare_contour(tunnel_poly)
     pts=[]
     for side in ("lado_izq","lado_der"):
-        idxs = _segments_mask_by_coord(tunnel_poly, side)
-        for i in idxs:
-            a = tunnel_poly[i]
-            b = tunnel_poly[i+1]
-            pts += _sample_on_segment_equidistant(a, b, n_per_side)
+        if pc.contour is not None:
+            pts += pc.contour.span(side).sample_interior(n_per_side)
+            continue
+        L = pc.chains[side][1][-1]
+        if L > 0:
+            pts += pc.chain_points(side, (np.arange(n_per_side) + 1) / (n_per_side + 1) * L)
     return [_pt(x,y, note=note) for (x,y) in pts]
 
 
@@ -386,9 +331,10 @@ def place_corona(tunnel_poly, n, note="corona"):
       2) Extrae el arco más largo por encima de y_cut.
       3) Muestra n puntos equidistantes sobre ese arco.
       4) Si no se logra (caso raro), cae a segmentos “techo” (y≈ymax).
+    Con un Contour analítico se usa directamente su tramo de corona.
 
     Parámetros:
-        tunnel_poly (list[tuple]): contorno de la galería
+        tunnel_poly (list[tuple]|Contour|PreparedContour): contorno de la galería
         n (int): cantidad total
         note (str): etiqueta
 
@@ -397,15 +343,19 @@ def place_corona(tunnel_poly, n, note="corona"):
     """
     if n <= 0:
         return []
-    y_cut = _wall_top_y(tunnel_poly)
-    arc = _extract_longest_arc_above(tunnel_poly, y_cut)
-    if len(arc) >= 2:
-        pts = _sample_on_open_poly(arc, n)
+    pc = prepare_contour(tunnel_poly)
+    if pc.contour is not None:
+        pts = pc.contour.span("corona").sample_inclusive(n)
+        return [_pt(x,y, note=note) for (x,y) in pts]
+    if len(pc.crown) >= 2:
+        L = pc.crown_cum[-1] if pc.crown_cum[-1] > 0 else 1.0
+        s = [L/2] if n == 1 else np.arange(n) * (L/(n-1))
+        pts = pc.crown_points(s)
         return [_pt(x,y, note=note) for (x,y) in pts]
 
     # Fallback: usar “techo” plano si lo hay
-    idxs = _segments_mask_by_coord(tunnel_poly, "techo")
-    pts = _distribute_over_segments(tunnel_poly, idxs, n)
+    L = pc.chains["techo"][1][-1]
+    pts = pc.chain_points("techo", (np.arange(n) + 0.5) / n * L) if L > 0 else []
     return [_pt(x,y, note=note) for (x,y) in pts]
 
 
@@ -413,46 +363,117 @@ def place_corona(tunnel_poly, n, note="corona"):
 # FAMILIAS INTERIORES (REJILLA ROBUSTA)
 # ======================================================================
 
-def _point_in_polygon(poly, x, y):
+def _polygon_edges(poly):
+    """
+    Aristas (m,4) = x0, y0, x1, y1 de un contorno abierto o cerrado
+    (lo cierra si hace falta).
     """
-    Test Ray Casting: True si (x,y) está dentro del polígono.
-    Acepta polilínea abierta o cerrada; internamente la cierra.
+    P = np.asarray(poly, dtype=float).reshape(-1, 2)
+    if len(P) and (P[0] != P[-1]).any():
+        P = np.vstack([P, P[:1]])
+    return np.hstack([P[:-1], P[1:]])
+
+
+def points_in_polygon(poly, xs, ys, include_boundary=False, atol=1e-12, chunk=250_000):
+    """
+    Test de contención vectorizado (ray casting) para muchos puntos a la vez.
+
+    Los puntos sobre el contorno se detectan explícitamente (producto cruz
+    nulo dentro de la arista, con tolerancia absoluta 'atol' en metros) y se
+    clasifican según include_boundary, en vez de depender del redondeo.
+    Las aristas horizontales nunca cruzan el rayo, así que no hay división
+    por cero.
 
     Parámetros:
-        poly (list[tuple]): contorno abierto/cerrado
-        x, y (float): punto de prueba
+        poly (list[tuple]|np.ndarray): contorno abierto/cerrado, o aristas (m,4)
+            ya calculadas (p.ej. PreparedContour.edges).
+        xs, ys (array): coordenadas de los puntos (misma forma).
+        include_boundary (bool): valor para puntos sobre el contorno.
+        atol (float): tolerancia de distancia al contorno.
+        chunk (int): máximo de pares punto-arista evaluados por bloque
+            (cada temporal float64 ocupa 8·chunk bytes).
 
     Retorna:
-        bool: True si está dentro
-    """
-    if not poly or len(poly) < 3:
-        return False
-    # cerrar si es necesario
-    if poly[0] != poly[-1]:
-        p = poly + [poly[0]]
-    else:
-        p = poly
+        np.ndarray[bool]: máscara con la forma de xs.
+    """
+    E = np.asarray(poly, dtype=float)
+    if E.ndim != 2 or E.shape[1] != 4:
+        E = _polygon_edges(poly)
+    X = np.asarray(xs, dtype=float)
+    Y = np.asarray(ys, dtype=float)
+    shape = X.shape
+    X = X.reshape(-1)
+    Y = Y.reshape(-1)
+    out = np.zeros(X.size, dtype=bool)
+    if len(E) < 3 or X.size == 0:
+        return out.reshape(shape)
+
+    x0, y0, x1, y1 = (c[None, :] for c in E.T)
+    ex, ey = x1 - x0, y1 - y0
+    elen = np.hypot(ex, ey)
+    step = max(1, chunk // len(E))
+    for a in range(0, X.size, step):
+        px = X[a:a+step, None]
+        py = Y[a:a+step, None]
+        # sobre el contorno: |cruz| ≤ atol·|e| y proyección dentro de la arista
+        cross = ex*(py - y0) - ey*(px - x0)
+        dot = ex*(px - x0) + ey*(py - y0)
+        on_edge = (elen > 0) & (np.abs(cross) <= atol*elen) & \
+                  (dot >= -atol*elen) & (dot <= elen*elen + atol*elen)
+        # a menos de atol de un vértice (cubre aristas degeneradas)
+        on_edge |= np.hypot(px - x0, py - y0) <= atol
+        on_boundary = on_edge.any(axis=1)
+
+        straddle = (y0 > py) != (y1 > py)
+        safe_ey = np.where(straddle, ey, 1.0)
+        x_int = x0 + (py - y0)*ex/safe_ey
+        crossings = (straddle & (px < x_int)).sum(axis=1)
+        inside = (crossings % 2) == 1
+        out[a:a+step] = np.where(on_boundary, include_boundary, inside)
+    return out.reshape(shape)
+
+
+def raster_in_polygon(poly, gx, gy):
+    """
+    Máscara de contención de una grilla regular (centros gx × gy) por barrido
+    de filas: en cada fila se ordenan los cruces con las aristas y se cuenta
+    la paridad, en vez de probar cada celda contra cada arista.
 
-    inside = False
-    j = len(p) - 1
-    for i in range(len(p)):
-        xi, yi = p[i]
-        xj, yj = p[j]
-        intersects = ((yi > y) != (yj > y)) and \
-                     (x < (xj - xi) * (y - yi) / (yj - yi + 1e-12) + xi)
-        if intersects:
-            inside = not inside
-        j = i
-    return inside
+    Parámetros:
+        poly (list[tuple]|np.ndarray): contorno abierto/cerrado, o aristas (m,4).
+        gx (np.ndarray): x de las columnas (creciente).
+        gy (np.ndarray): y de las filas.
+
+    Retorna:
+        np.ndarray[bool]: máscara (len(gy), len(gx)).
+    """
+    E = np.asarray(poly, dtype=float)
+    if E.ndim != 2 or E.shape[1] != 4:
+        E = _polygon_edges(poly)
+    out = np.zeros((len(gy), len(gx)), dtype=bool)
+    if len(E) < 3:
+        return out
+    x0, y0, x1, y1 = E.T
+    gy = np.asarray(gy, dtype=float)
+    straddle = (y0[None, :] > gy[:, None]) != (y1[None, :] > gy[:, None])
+    dy = np.where(y1 != y0, y1 - y0, 1.0)
+    xc = x0[None, :] + (gy[:, None] - y0[None, :])*((x1 - x0)/dy)[None, :]
+    for r in np.nonzero(straddle.any(axis=1))[0]:
+        cross = np.sort(xc[r, straddle[r]])
+        out[r] = (np.searchsorted(cross, gx, side="right") % 2) == 1
+    return out
 
 
 def place_aux_grid(tunnel_poly, nx, ny, note="aux"):
     """
     Rejilla interna nx×ny recortada al contorno de la galería.
     No asume convexidad y tolera contornos abiertos/cerrados.
+    Toda la rejilla se clasifica de una vez con points_in_polygon sobre las
+    aristas precalculadas del contorno; los puntos justo sobre el contorno
+    quedan fuera.
 
     Parámetros:
-        tunnel_poly (list[tuple]): contorno de la galería
+        tunnel_poly (list[tuple]|Contour|PreparedContour): contorno de la galería
         nx (int): columnas internas (sin contar bordes)
         ny (int): filas internas (sin contar bordes)
         note (str): etiqueta
@@ -460,17 +481,23 @@ def place_aux_grid(tunnel_poly, nx, ny, note="aux"):
     Retorna:
         list[dict]: perforaciones de la rejilla
     """
-    xmin,xmax,ymin,ymax = _bbox(tunnel_poly)
     if nx <= 0 or ny <= 0:
         return []
+    pc = prepare_contour(tunnel_poly)
+    if pc.contour is not None:
+        xmin,xmax,ymin,ymax = pc.contour.bbox()
+    else:
+        xmin,xmax,ymin,ymax = pc.bbox
 
     xs = [xmin + (xmax-xmin)*(i+1)/(nx+1) for i in range(nx)]
     ys = [ymin + (ymax-ymin)*(j+1)/(ny+1) for j in range(ny)]
+    GX, GY = np.meshgrid(xs, ys)  # filas = y, columnas = x (mismo orden que antes)
+    inside = pc.contains(GX, GY)
 
     out=[]
-    for y in ys:
-        for x in xs:
-            if _point_in_polygon(tunnel_poly, x, y):
+    for j, y in enumerate(ys):
+        for i, x in enumerate(xs):
+            if inside[j, i]:
                 out.append(_pt(x, y, note=note))
     return out
 
@@ -2,26 +2,27 @@
 # APLICACIÓN GUI PARA DISEÑO DE GALERÍAS (DRIFTS), FAMILIAS Y CUELES
 
 import math
+import time
 import tkinter as tk
-from tkinter import ttk, messagebox
-
-# CARGA DE PATRONES DE CUELES (blast_cuts)
-from blast_cuts import (
-    cuele_sarrois_geom, cuele_sueco_geom, cuele_coromant_geom,
-    cuele_cuna_geom, cuele_abanico_geom, cuele_bethune_geom, cuele_cuatro_secciones_geom,
-    apply_series_sarrois, apply_series_sueco, apply_series_coromant,
-    apply_series_cuna, apply_series_abanico, apply_series_bethune,
-    apply_series_cuatro_secciones,
+from tkinter import ttk, messagebox, filedialog
+
+# ESCENA (MODELO DE DATOS) Y PASOS DEL ASISTENTE
+from scene import (
+    Scene, SP_GEOM, SP_ZAP, SP_CAJAS, SP_CORONA, SP_CUELES, SP_CC, SP_AUX, STEPS_MAX
 )
 
-# GEOMETRÍA DE GALERÍAS (drift_geometry)
-from drift_geometry import semicircular, d_shaped, rectangular, horseshoe, bezier_tunnel
+# EXPORTACIÓN / CARGA (json, ndjson, npz)
+from layout_io import export_layout, open_layout, LazyLayout
+from rig_export import export_rig, RIG_EXPORTERS
 
-# COLOCACIÓN DE FAMILIAS SOBRE LA GALERÍA (drift_layout)
-from drift_layout import (
-    place_zapateras, place_cajas, place_corona,
-    place_aux_grid, place_contracuele_hex, place_contracuele_rect
+# MOTOR DE DISEÑO (geometría, familias, cueles y contracuele sin interfaz)
+from design_engine import (
+    DesignEngine, GEOMETRY_TYPES, CC_TYPES, SNAP_TOL_M
 )
+# REGISTRO DE CUELES (incluye los de plug-ins ya importados)
+from cut_registry import cut_names
+# SECUENCIA DE DETONACIÓN (conflictos de simultaneidad)
+from timing import ConflictMonitor
 
 # CONSTANTES MUNDO ↔ PANTALLA
 PX_PER_M   = 160.0
@@ -30,69 +31,82 @@ CANVAS_W   = 1000
 CANVAS_H   = 700
 ORIGIN_X   = CANVAS_W // 2
 ORIGIN_Y   = CANVAS_H // 2
-SNAP_TOL_M = 0.20  # tolerancia para “snap” de contracuele en doble clic
-
-def w2c(xm: float, ym: float):
-    """Convierte coordenadas mundo (m) a canvas (px)."""
-    return ORIGIN_X + xm*PX_PER_M, ORIGIN_Y - ym*PX_PER_M
+FRAME_MS   = 16    # intervalo mínimo entre redibujos (~60 fps)
 
-def c2w(xp: float, yp: float):
-    """Convierte coordenadas canvas (px) a mundo (m)."""
-    return (xp - ORIGIN_X)/PX_PER_M, (ORIGIN_Y - yp)/PX_PER_M
+# VISTA (ZOOM / PANEO / NIVEL DE DETALLE)
+MIN_PX_PER_M = 8.0     # zoom mínimo
+MAX_PX_PER_M = 2000.0  # zoom máximo
+ZOOM_STEP    = 1.2     # factor por paso de rueda
+LOD_PX_PER_M = 60.0    # bajo esta escala: perforaciones como puntos, sin rótulos
+LOD_DECIMATE_PX = 3.0  # en vista simplificada, distancia mínima entre vértices dibujados
+CULL_MARGIN_PX  = 12   # margen alrededor de la vista al descartar elementos
+PICK_PX         = 8    # tolerancia mínima de selección en pantalla
 
 
-# ESCENA (MODELO DE DATOS)
-class Scene:
-    """Contenedor de perforaciones y geometrías de galería en memoria.
+class Viewport:
+    """Transformación mundo (m) ↔ canvas (px) con zoom y paneo.
 
     Atributos:
-        holes (list[dict]): perforaciones con campos x, y, is_void, note y tags de paso/kind.
-        tunnels (list[list[tuple]]): polilíneas de galería [(x,y), ...].
-        selected_idx (int|None): índice de perforación seleccionada, si hay.
+        px_per_m (float): escala actual.
+        origin_x, origin_y (float): posición en pantalla del origen del mundo.
+        width, height (int): tamaño del canvas en px.
     """
-    def __init__(self):
-        self.holes = []
-        self.tunnels = []
-        self.selected_idx = None
-
-    def add_holes(self, hs):
-        """Agrega una lista de perforaciones (dicts)."""
-        self.holes.extend(hs)
-
-    def add_tunnel(self, poly):
-        """Agrega una polilínea de galería.
-
-        Retorna:
-            int|None: índice de la galería insertada o None si no se agregó.
-        """
-        if poly and len(poly) >= 2:
-            self.tunnels.append(poly)
-            return len(self.tunnels) - 1
-        return None
-
-    def remove_holes_by_step(self, step):
-        """Elimina todas las perforaciones etiquetadas con el paso dado."""
-        self.holes = [h for h in self.holes if h.get("_step") != step]
-
-    def nearest(self, xm, ym, tol_m=0.15):
-        """Retorna el índice de la perforación más cercana al punto (xm,ym) si está dentro de tol_m."""
-        best_i, best_d = None, 1e9
-        for i, h in enumerate(self.holes):
-            d = math.hypot(h["x"] - xm, h["y"] - ym)
-            if d < best_d and d <= tol_m:
-                best_d, best_i = d, i
-        return best_i
-
-
-# PASOS DEL ASISTENTE
-SP_GEOM   = 0   # geometría
-SP_ZAP    = 1   # zapateras (base)
-SP_CAJAS  = 2   # cajas (paredes)
-SP_CORONA = 3   # corona (techo)
-SP_CUELES = 4   # cueles (clic para ubicar)
-SP_CC     = 5   # contracuele (clic libre o doble clic en perforación)
-SP_AUX    = 6   # perforaciones auxiliares (rejilla interna)
-STEPS_MAX = SP_AUX
+    def __init__(self, px_per_m=PX_PER_M, origin_x=ORIGIN_X, origin_y=ORIGIN_Y,
+                 width=CANVAS_W, height=CANVAS_H):
+        self.px_per_m = float(px_per_m)
+        self.origin_x = float(origin_x)
+        self.origin_y = float(origin_y)
+        self.width = width
+        self.height = height
+
+    def w2c(self, xm, ym):
+        """Mundo (m) -> canvas (px)."""
+        return self.origin_x + xm*self.px_per_m, self.origin_y - ym*self.px_per_m
+
+    def c2w(self, xp, yp):
+        """Canvas (px) -> mundo (m)."""
+        return (xp - self.origin_x)/self.px_per_m, (self.origin_y - yp)/self.px_per_m
+
+    def key(self):
+        """Tupla que identifica la vista (para cachés dependientes de ella)."""
+        return (self.px_per_m, self.origin_x, self.origin_y, self.width, self.height)
+
+    @property
+    def simplified(self):
+        """True si la escala es tan baja que conviene dibujar simplificado."""
+        return self.px_per_m < LOD_PX_PER_M
+
+    def visible_rect(self, margin_px=0):
+        """Rectángulo del mundo visible: (xmin, ymin, xmax, ymax)."""
+        x0, y1 = self.c2w(-margin_px, -margin_px)
+        x1, y0 = self.c2w(self.width + margin_px, self.height + margin_px)
+        return x0, y0, x1, y1
+
+    def zoom_at(self, factor, xp, yp):
+        """Escala por 'factor' manteniendo fijo el punto de pantalla (xp,yp)."""
+        new = min(max(self.px_per_m*factor, MIN_PX_PER_M), MAX_PX_PER_M)
+        if new == self.px_per_m:
+            return False
+        xm, ym = self.c2w(xp, yp)
+        self.px_per_m = new
+        self.origin_x = xp - xm*new
+        self.origin_y = yp + ym*new
+        return True
+
+    def pan(self, dx_px, dy_px):
+        """Desplaza la vista en píxeles."""
+        self.origin_x += dx_px
+        self.origin_y += dy_px
+
+    def fit(self, xmin, xmax, ymin, ymax, margin_px=40):
+        """Ajusta escala y origen para que el rectángulo dado quepa en pantalla."""
+        w = max(xmax - xmin, 1e-6)
+        h = max(ymax - ymin, 1e-6)
+        s = min((self.width - 2*margin_px)/w, (self.height - 2*margin_px)/h)
+        self.px_per_m = min(max(s, MIN_PX_PER_M), MAX_PX_PER_M)
+        cx, cy = (xmin + xmax)/2, (ymin + ymax)/2
+        self.origin_x = self.width/2 - cx*self.px_per_m
+        self.origin_y = self.height/2 + cy*self.px_per_m
 
 
 # APLICACIÓN
@@ -103,21 +117,32 @@ class App(tk.Tk):
         self.title("Diseño de galerías (drifts) y cueles - asistente por pasos")
         self.geometry(f"{CANVAS_W+380}x{CANVAS_H+40}")
 
-        # estado
-        self.scene = Scene()
-        self.tunnel_poly = []   # polilínea de la galería activa
-        self.geom_index = None  # índice de la galería activa
+        # estado (escena, galería activa y pasos completados viven en el motor)
+        self.engine = DesignEngine()
+        self._lazy = None  # LazyLayout abierto (galerías que se cargan al verse)
         self.step = SP_GEOM
         self.dragging_idx = None
 
-        # flags de finalización
-        self.done_geom = False
-        self.done_zap = False
-        self.done_cajas = False
-        self.done_corona = False
-        self.done_cueles = False
-        self.done_cc = False
-        self.done_aux = False
+        # vista (zoom/paneo) y arrastre de paneo en curso
+        self.view = Viewport()
+        self._pan_last = None
+
+        # ítems persistentes del canvas (ver draw)
+        self._hole_items = {}    # rid -> [oval, texto|None, estado]
+        self._tunnel_items = {}  # id(poly) -> (poly, línea, coords)
+        self._grid_cache_key = None  # vista con que se dibujó la capa "grid"
+        self._conflict_items = {}    # (rid_a, rid_b) -> línea
+        self._conflicts = None       # ConflictMonitor de la escena actual
+        self._moved_rids = set()     # perforaciones movidas desde el último redibujo
+        self._conflict_warned = None # último error de tiempos ya avisado
+
+        # planificador de redibujo (ver request_redraw)
+        self._redraw_job = None      # id de after/after_idle pendiente
+        self._last_flush = 0.0       # perf_counter del último redibujo
+        self._dirty_full = False     # hay que sincronizar toda la escena
+        self._dirty_holes = set()    # índices de perforaciones a actualizar
+        self._pending_drag = None    # (idx, xm, ym) último movimiento sin aplicar
+        self.redraw_stats = {"requested": 0, "performed": 0, "skipped": 0}
 
         # UI
         self._build_ui()
@@ -125,18 +150,37 @@ class App(tk.Tk):
         self._update_step_label()
         self.draw()
 
-    def _tag(self, holes, step, kind):
-        """Agrega etiquetas internas de control a un conjunto de perforaciones."""
-        for h in holes:
-            h["_step"] = step
-            h["_kind"] = kind
-        return holes
+    # --- estado delegado al motor ---
+    def _engine_attr(name, doc):
+        return property(lambda self: getattr(self.engine, name), doc=doc)
+
+    def _done_flag(step):
+        return property(lambda self: self.engine.done[step],
+                        lambda self, v: self.engine.done.__setitem__(step, bool(v)))
+
+    scene          = _engine_attr("scene", "Escena del diseño.")
+    tunnel_poly    = _engine_attr("poly", "Polilínea de la galería activa.")
+    tunnel_contour = _engine_attr("contour", "Contorno analítico de la galería activa.")
+    tunnel_prep    = _engine_attr("prep", "Contorno preparado (reutilizado por todos los pasos).")
+    geom_index     = _engine_attr("geom_index", "Índice de la galería activa.")
+
+    # flags de finalización
+    done_geom   = _done_flag(SP_GEOM)
+    done_zap    = _done_flag(SP_ZAP)
+    done_cajas  = _done_flag(SP_CAJAS)
+    done_corona = _done_flag(SP_CORONA)
+    done_cueles = _done_flag(SP_CUELES)
+    done_cc     = _done_flag(SP_CC)
+    done_aux    = _done_flag(SP_AUX)
+    del _engine_attr, _done_flag
 
     def _build_ui(self):
         """Construye los widgets estáticos de la interfaz."""
         # canvas
         self.canvas = tk.Canvas(self, width=CANVAS_W, height=CANVAS_H, bg="white")
         self.canvas.grid(row=0, column=0, padx=6, pady=6, sticky="nsew")
+        self._sel_item = self.canvas.create_oval(0, 0, 0, 0, outline="#444",
+                                                 state="hidden", tags="sel")
         self.grid_columnconfigure(0, weight=1)
         self.grid_rowconfigure(0,   weight=1)
 
@@ -157,10 +201,16 @@ class App(tk.Tk):
         opts = ttk.LabelFrame(self.side, text="Opciones")
         opts.pack(fill="x", pady=6)
         self.show_labels = tk.BooleanVar(value=False)
-        ttk.Checkbutton(opts, text="Mostrar series", variable=self.show_labels).pack(anchor="w")
+        ttk.Checkbutton(opts, text="Mostrar series", variable=self.show_labels,
+                        command=self.request_redraw).pack(anchor="w")
         self.snap_grid = tk.BooleanVar(value=True)
         ttk.Checkbutton(opts, text="Ajustar a grilla", variable=self.snap_grid).pack(anchor="w")
-        ttk.Label(self.side, text="Arrastra puntos para ajustarlos manualmente.").pack(anchor="w", pady=(2,8))
+        self.show_conflicts = tk.BooleanVar(value=True)
+        ttk.Checkbutton(opts, text="Marcar salidas simultáneas", variable=self.show_conflicts,
+                        command=self.request_redraw).pack(anchor="w")
+        ttk.Button(opts, text="Ajustar vista", command=self.fit_view).pack(anchor="w", pady=(4,0))
+        ttk.Label(self.side, text="Arrastra puntos para ajustarlos manualmente.").pack(anchor="w", pady=(2,0))
+        ttk.Label(self.side, text="Rueda: zoom. Botón central/derecho: desplazar.").pack(anchor="w", pady=(0,8))
 
         # navegación
         foot = ttk.Frame(self.side); foot.pack(fill="x", pady=(6,0))
@@ -171,13 +221,20 @@ class App(tk.Tk):
 
         util = ttk.Frame(self.side); util.pack(fill="x", pady=6)
         ttk.Button(util, text="Borrar todo", command=self.clear_all).pack(side="left")
-        ttk.Button(util, text="Export JSON", command=self.export_json).pack(side="right")
+        ttk.Button(util, text="Exportar", command=self.export_layout).pack(side="right")
+        ttk.Button(util, text="Abrir", command=self.open_layout).pack(side="right", padx=6)
 
         # eventos
         self.canvas.bind("<Button-1>", self.on_click)
         self.canvas.bind("<B1-Motion>", self.on_drag)
         self.canvas.bind("<ButtonRelease-1>", self.on_release)
         self.canvas.bind("<Double-Button-1>", self.on_double_click)
+        self.canvas.bind("<MouseWheel>", self.on_wheel)   # Windows / macOS
+        self.canvas.bind("<Button-4>", self.on_wheel)     # Linux
+        self.canvas.bind("<Button-5>", self.on_wheel)
+        for b in ("2", "3"):
+            self.canvas.bind(f"<ButtonPress-{b}>", self.on_pan_start)
+            self.canvas.bind(f"<B{b}-Motion>", self.on_pan)
         self.bind("<Delete>", self._delete_selected)
         self.bind("<BackSpace>", self._delete_selected)
 
@@ -197,7 +254,7 @@ class App(tk.Tk):
             self.geom_type = tk.StringVar(value="Semicircular")
             ttk.Combobox(
                 frm, textvariable=self.geom_type,
-                values=["Semicircular", "D-shaped", "Rectangular", "Horseshoe", "Bezier"],
+                values=list(GEOMETRY_TYPES),
                 state="readonly", width=18
             ).grid(row=0, column=1, sticky="e")
 
@@ -274,7 +331,7 @@ class App(tk.Tk):
             self.cuele_type = tk.StringVar(value="Sarrois")
             ttk.Combobox(
                 frm, textvariable=self.cuele_type,
-                values=["Sarrois","Sueco","Coromant","Cuña 2x3","Cuña zigzag","Abanico","Bethune","Cuatro secciones"],
+                values=list(cut_names()),
                 state="readonly", width=18
             ).grid(row=0, column=1, sticky="e")
 
@@ -302,7 +359,7 @@ class App(tk.Tk):
             ttk.Label(frm, text="Figura").grid(row=0, column=0, sticky="w")
             self.cc_type = tk.StringVar(value="Hexágono")
             ttk.Combobox(frm, textvariable=self.cc_type,
-                         values=["Hexágono","Rectángulo"], state="readonly", width=18).grid(row=0, column=1, sticky="e")
+                         values=list(CC_TYPES), state="readonly", width=18).grid(row=0, column=1, sticky="e")
 
             self.cc_hex_r  = tk.DoubleVar(value=0.8)
             self.cc_rect_w = tk.DoubleVar(value=1.6)
@@ -386,62 +443,360 @@ class App(tk.Tk):
             self._render_step_panel()
             self._update_step_label()
 
+    def request_redraw(self, hole_idx=None):
+        """Marca la escena (o una perforación) como sucia y agenda un redibujo.
+
+        Las solicitudes se agrupan: como máximo se redibuja una vez por
+        cuadro (FRAME_MS), vía after_idle si ya pasó el intervalo o after si no.
+        Cada solicitud absorbida por un redibujo ya agendado cuenta como
+        'skipped' en redraw_stats.
+        """
+        self.redraw_stats["requested"] += 1
+        if hole_idx is None:
+            self._dirty_full = True
+        else:
+            self._dirty_holes.add(hole_idx)
+        if self._redraw_job is not None:
+            self.redraw_stats["skipped"] += 1
+            return
+        elapsed_ms = (time.perf_counter() - self._last_flush) * 1000.0
+        if elapsed_ms >= FRAME_MS:
+            self._redraw_job = self.after_idle(self._flush_redraw)
+        else:
+            self._redraw_job = self.after(int(FRAME_MS - elapsed_ms) + 1, self._flush_redraw)
+
+    def _apply_pending_drag(self):
+        """Aplica a la escena el último movimiento de arrastre acumulado."""
+        if self._pending_drag is None:
+            return
+        i, xm, ym = self._pending_drag
+        self._pending_drag = None
+        if 0 <= i < len(self.scene.holes):
+            self.scene.move_hole(i, xm, ym)
+            self._moved_rids.add(self.scene.holes[i].rid)
+
+    def _flush_redraw(self):
+        """Ejecuta el redibujo agendado con todo lo acumulado desde el anterior."""
+        self._redraw_job = None
+        try:
+            self._apply_pending_drag()
+            if self._dirty_full:
+                self.draw()
+            else:
+                n = len(self.scene.holes)
+                for i in sorted(self._dirty_holes):
+                    if 0 <= i < n:
+                        self._redraw_hole(i)
+                self._draw_conflicts()
+        finally:
+            self._dirty_full = False
+            self._dirty_holes.clear()
+            self._last_flush = time.perf_counter()
+            self.redraw_stats["performed"] += 1
+
     def draw(self):
-        """Redibuja la grilla, galerías y perforaciones."""
-        self.canvas.delete("all")
-        self._draw_grid()
+        """Sincroniza el canvas con la escena.
+
+        La grilla es una capa en caché (tag "grid") que solo se regenera
+        cuando cambia la vista. Los ítems de galerías y perforaciones son
+        persistentes: solo se crean, mueven (coords) o recolorean (itemconfig)
+        los que cambiaron, y se borran los que ya no existen en la escena.
+        """
+        self._materialize_visible()
+        self._ensure_grid()
         self._draw_tunnels()
         self._draw_holes()
+        self._draw_conflicts()
+
+    def _materialize_visible(self):
+        """Carga desde el archivo abierto las galerías (y sus perforaciones) que entraron en vista."""
+        lazy = self._lazy
+        if lazy is None:
+            return
+        ids = lazy.tunnels_in_rect(*self.view.visible_rect(CULL_MARGIN_PX))
+        if any(i not in lazy.loaded for i in ids):
+            lazy.materialize(self.scene, ids)
+            self.engine.refresh_done()
+
+    def _grid_key(self):
+        """Parámetros de vista de los que depende la grilla."""
+        return self.view.key() + (GRID_M,)
+
+    def _ensure_grid(self):
+        """Dibuja la capa de grilla solo si cambió la vista; si no, la reutiliza."""
+        key = self._grid_key()
+        if key == self._grid_cache_key:
+            return
+        self.canvas.delete("grid")
+        self._draw_grid()
+        self.canvas.tag_lower("grid")
+        self._grid_cache_key = key
+
+    def invalidate_grid(self):
+        """Fuerza a regenerar la grilla en el próximo redibujo (cambio de vista)."""
+        self._grid_cache_key = None
+        self.request_redraw()
 
     def _draw_grid(self):
-        """Dibuja la grilla cartesiana con ejes."""
-        step = GRID_M * PX_PER_M
-        x = ORIGIN_X % step
-        while x < CANVAS_W:
-            self.canvas.create_line(x, 0, x, CANVAS_H, fill="#eee")
+        """Dibuja la grilla cartesiana con ejes (más gruesa si la escala es baja)."""
+        v = self.view
+        step = GRID_M * v.px_per_m
+        while step < 8:  # evita miles de líneas al alejar
+            step *= 10
+        x = v.origin_x % step
+        while x < v.width:
+            self.canvas.create_line(x, 0, x, v.height, fill="#eee", tags="grid")
             x += step
-        y = ORIGIN_Y % step
-        while y < CANVAS_H:
-            self.canvas.create_line(0, y, CANVAS_W, y, fill="#eee")
+        y = v.origin_y % step
+        while y < v.height:
+            self.canvas.create_line(0, y, v.width, y, fill="#eee", tags="grid")
             y += step
-        self.canvas.create_line(0, ORIGIN_Y, CANVAS_W, ORIGIN_Y, fill="#bbb")
-        self.canvas.create_line(ORIGIN_X, 0, ORIGIN_X, CANVAS_H, fill="#bbb")
+        self.canvas.create_line(0, v.origin_y, v.width, v.origin_y, fill="#bbb", tags="grid")
+        self.canvas.create_line(v.origin_x, 0, v.origin_x, v.height, fill="#bbb", tags="grid")
+
+    def _tunnel_runs(self, poly, rect):
+        """
+        Tramos visibles de una galería en coordenadas de canvas.
+
+        Descarta los segmentos fuera del rectángulo visible (cada racha
+        continua de segmentos visibles es un tramo) y, en vista simplificada,
+        omite vértices a menos de LOD_DECIMATE_PX del último dibujado.
+        """
+        xmin, ymin, xmax, ymax = rect
+        w2c_ = self.view.w2c
+        min_px = LOD_DECIMATE_PX if self.view.simplified else 0.0
+        runs, cur = [], []
+        for a, b in zip(poly, poly[1:]):
+            visible = not (max(a[0], b[0]) < xmin or min(a[0], b[0]) > xmax or
+                           max(a[1], b[1]) < ymin or min(a[1], b[1]) > ymax)
+            if not visible:
+                if len(cur) >= 2:
+                    runs.append(cur)
+                cur = []
+                continue
+            if not cur:
+                cur = [w2c_(*a)]
+            pb = w2c_(*b)
+            if min_px and len(cur) >= 2 and math.hypot(pb[0]-cur[-1][0], pb[1]-cur[-1][1]) < min_px:
+                cur[-1] = pb  # reemplaza el último: conserva el extremo del tramo
+            else:
+                cur.append(pb)
+        if len(cur) >= 2:
+            runs.append(cur)
+        return [[c for p in run for c in p] for run in runs]
 
     def _draw_tunnels(self):
-        """Dibuja todas las polilíneas de galería."""
+        """Dibuja las galerías: ítems persistentes, solo los tramos visibles."""
+        rect = self.view.visible_rect(CULL_MARGIN_PX)
+        seen = set()
+        created = False
         for poly in self.scene.tunnels + ([self.tunnel_poly] if self.tunnel_poly else []):
-            if len(poly) < 2:
+            key = id(poly)
+            if len(poly) < 2 or key in seen:
                 continue
-            pts = []
-            for (x, y) in poly:
-                xp, yp = w2c(x, y); pts.extend([xp, yp])
-            self.canvas.create_line(*pts, fill="#888", width=2)
+            seen.add(key)
+            runs = self._tunnel_runs(poly, rect)
+            item = self._tunnel_items.get(key)
+            if item is not None and item[2] == runs:
+                continue
+            ids = item[1] if item is not None else []
+            # reutiliza las líneas existentes y crea/borra solo la diferencia
+            for iid, pts in zip(ids, runs):
+                self.canvas.coords(iid, *pts)
+            for iid in ids[len(runs):]:
+                self.canvas.delete(iid)
+            new_ids = ids[:len(runs)]
+            for pts in runs[len(ids):]:
+                new_ids.append(self.canvas.create_line(*pts, fill="#888", width=2, tags="tunnel"))
+                created = True
+            self._tunnel_items[key] = (poly, new_ids, runs)
+        for key in [k for k in self._tunnel_items if k not in seen]:
+            for iid in self._tunnel_items.pop(key)[1]:
+                self.canvas.delete(iid)
+        if created:
+            # las galerías nuevas quedan bajo las perforaciones
+            for tag in ("conflict", "hole", "label", "sel"):
+                self.canvas.tag_raise(tag)
+
+    def _hole_state(self, h):
+        """Posición en pantalla, radio, color y rótulo con que se dibuja una perforación."""
+        xp, yp = self.view.w2c(h["x"], h["y"])
+        color = "black" if h.get("is_void", False) else "#1f77b4"
+        if "serie" in h:
+            palette = ["#2ca02c","#ff7f0e","#d62728","#9467bd","#8c564b","#e377c2"]
+            color = "black" if h.get("is_void", False) else palette[h["serie"] % len(palette)]
+        if self.view.simplified:
+            return xp, yp, 2, color, None  # punto sin rótulo
+        label = str(h["serie"]) if self.show_labels.get() and "serie" in h else None
+        return xp, yp, 5, color, label
+
+    def _sync_hole(self, h):
+        """Crea o actualiza (solo si cambió) los ítems de una perforación."""
+        state = self._hole_state(h)
+        xp, yp, r_px, color, label = state
+        key = h.rid
+        item = self._hole_items.get(key)
+        if item is None:
+            oval = self.canvas.create_oval(xp-r_px, yp-r_px, xp+r_px, yp+r_px,
+                                           fill=color, outline="", tags="hole")
+            text = None
+            if label is not None:
+                text = self.canvas.create_text(xp, yp-10, text=label, fill="#444",
+                                               font=("Arial", 9), tags="label")
+            self._hole_items[key] = [oval, text, state]
+            return
+        oval, text, old = item
+        if old == state:
+            return
+        if old[:3] != (xp, yp, r_px):
+            self.canvas.coords(oval, xp-r_px, yp-r_px, xp+r_px, yp+r_px)
+            if text is not None:
+                self.canvas.coords(text, xp, yp-10)
+        if old[3] != color:
+            self.canvas.itemconfigure(oval, fill=color)
+        if old[4] != label:
+            if label is None:
+                self.canvas.delete(text); text = None
+            elif text is None:
+                text = self.canvas.create_text(xp, yp-10, text=label, fill="#444",
+                                               font=("Arial", 9), tags="label")
+            else:
+                self.canvas.itemconfigure(text, text=label)
+        item[1] = text
+        item[2] = state
+
+    def _draw_selection(self):
+        """Ubica (u oculta) el anillo de selección persistente."""
+        i = self.scene.selected_idx
+        if i is None or not (0 <= i < len(self.scene.holes)):
+            self.canvas.itemconfigure(self._sel_item, state="hidden")
+            return
+        xp, yp = self.view.w2c(self.scene.holes[i]["x"], self.scene.holes[i]["y"])
+        self.canvas.coords(self._sel_item, xp-9, yp-9, xp+9, yp+9)
+        self.canvas.itemconfigure(self._sel_item, state="normal")
+        self.canvas.tag_raise(self._sel_item)
 
     def _draw_holes(self):
-        """Dibuja todas las perforaciones (con color por serie si existe)."""
-        r_px = 5
-        for i, h in enumerate(self.scene.holes):
-            xp, yp = w2c(h["x"], h["y"])
-            color = "black" if h.get("is_void", False) else "#1f77b4"
-            if "serie" in h:
-                palette = ["#2ca02c","#ff7f0e","#d62728","#9467bd","#8c564b","#e377c2"]
-                color = "black" if h.get("is_void", False) else palette[h["serie"] % len(palette)]
-            self.canvas.create_oval(xp-r_px, yp-r_px, xp+r_px, yp+r_px, fill=color, outline="")
-            if self.show_labels.get() and "serie" in h:
-                self.canvas.create_text(xp, yp-10, text=str(h["serie"]), fill="#444", font=("Arial", 9))
-            if i == self.scene.selected_idx:
-                self.canvas.create_oval(xp-9, yp-9, xp+9, yp+9, outline="#444")
+        """Dibuja las perforaciones visibles (consulta al índice espacial de la escena)."""
+        holes = self.scene.holes
+        visible = self.scene.holes_in_rect(*self.view.visible_rect(CULL_MARGIN_PX))
+        alive = set()
+        for i in visible:
+            h = holes[i]
+            alive.add(h.rid)
+            self._sync_hole(h)
+        for key in [k for k in self._hole_items if k not in alive]:
+            oval, text, _ = self._hole_items.pop(key)
+            self.canvas.delete(oval)
+            if text is not None:
+                self.canvas.delete(text)
+        self._draw_selection()
+
+    def _clear_conflicts(self):
+        """Borra las líneas de conflicto del canvas."""
+        for iid in self._conflict_items.values():
+            self.canvas.delete(iid)
+        self._conflict_items.clear()
+        self._moved_rids.clear()
+
+    def _draw_conflicts(self):
+        """Une con una línea roja los pares cercanos que salen dentro de la misma ventana.
+
+        El monitor se recalcula entero solo si cambió la escena o su número de
+        perforaciones; si no, rehace únicamente los pares de las movidas. Si
+        los tiempos no se pueden calcular (más retardos que la serie), la capa
+        queda vacía y el motivo se avisa una sola vez.
+        """
+        if not self.show_conflicts.get():
+            self._clear_conflicts()
+            return
+        mon = self._conflicts
+        if mon is None or mon.scene is not self.scene:
+            mon = self._conflicts = ConflictMonitor(self.scene)
+        if mon.stale():
+            try:
+                mon.refresh()
+            except ValueError as e:
+                self._clear_conflicts()
+                if str(e) != self._conflict_warned:
+                    self._conflict_warned = str(e)
+                    messagebox.showwarning("Salidas simultáneas", str(e))
+                return
+        elif self._moved_rids:
+            mon.moved(self._moved_rids)
+        self._moved_rids.clear()
+        index, w2c_ = self.scene.index, self.view.w2c
+        for pair in [p for p in self._conflict_items if p not in mon.pairs]:
+            self.canvas.delete(self._conflict_items.pop(pair))
+        created = False
+        for pair in mon.pairs:
+            xa, ya = w2c_(*index.position(pair[0]))
+            xb, yb = w2c_(*index.position(pair[1]))
+            iid = self._conflict_items.get(pair)
+            if iid is None:
+                self._conflict_items[pair] = self.canvas.create_line(
+                    xa, ya, xb, yb, fill="#d62728", width=2, dash=(4, 2), tags="conflict")
+                created = True
+            else:
+                self.canvas.coords(iid, xa, ya, xb, yb)
+        if created:
+            # las líneas nuevas quedan bajo las perforaciones
+            for tag in ("hole", "label", "sel"):
+                self.canvas.tag_raise(tag)
+
+    def _redraw_hole(self, i):
+        """Actualiza solo la perforación i (y el anillo de selección)."""
+        self._sync_hole(self.scene.holes[i])
+        self._draw_selection()
+
+    # --- vista ---
+    def on_wheel(self, ev):
+        """Zoom con la rueda del mouse centrado en el cursor."""
+        up = getattr(ev, "delta", 0) > 0 or getattr(ev, "num", None) == 4
+        if self.view.zoom_at(ZOOM_STEP if up else 1.0/ZOOM_STEP, ev.x, ev.y):
+            self.invalidate_grid()
+
+    def on_pan_start(self, ev):
+        """Inicia el paneo (botón central o derecho)."""
+        self._pan_last = (ev.x, ev.y)
+
+    def on_pan(self, ev):
+        """Desplaza la vista siguiendo el mouse."""
+        if self._pan_last is None:
+            return
+        self.view.pan(ev.x - self._pan_last[0], ev.y - self._pan_last[1])
+        self._pan_last = (ev.x, ev.y)
+        self.invalidate_grid()
+
+    def fit_view(self):
+        """Encuadra todas las galerías y perforaciones de la escena."""
+        boxes = []
+        b = self.scene.index.bounds()
+        if b is not None:
+            boxes.append(b)
+        for poly in self.scene.tunnels:
+            if poly:
+                xs = [p[0] for p in poly]; ys = [p[1] for p in poly]
+                boxes.append((min(xs), max(xs), min(ys), max(ys)))
+        if self._lazy is not None:
+            boxes.extend(b for b in self._lazy.bboxes if b is not None)
+        if boxes:
+            self.view.fit(min(b[0] for b in boxes), max(b[1] for b in boxes),
+                          min(b[2] for b in boxes), max(b[3] for b in boxes))
+        else:
+            self.view = Viewport()
+        self.invalidate_grid()
 
     def on_click(self, ev):
         """Maneja click izquierdo: inserción de geometría/cueles/cc o selección/arrastre de perforaciones."""
-        xm, ym = c2w(ev.x, ev.y)
+        xm, ym = self.view.c2w(ev.x, ev.y)
 
         # selección/arrastre de perforación salvo en pasos que requieren insertar
-        idx = self.scene.nearest(xm, ym)
+        idx = self.scene.nearest(xm, ym, tol_m=max(0.15, PICK_PX/self.view.px_per_m))
         if idx is not None and self.step not in (SP_CUELES, SP_CC):
             self.scene.selected_idx = idx
             self.dragging_idx = idx
-            self.draw()
+            self.request_redraw()
             return
 
         if self.snap_grid.get():
@@ -452,49 +807,27 @@ class App(tk.Tk):
         if self.step == SP_GEOM:
             gtype = self.geom_type.get()
             if gtype == "Semicircular":
-                R = float(self.geom_r.get())
-                self.tunnel_poly = semicircular(xm, ym, radius=R, n_points=48)
-            elif gtype == "D-shaped":
-                w = float(self.geom_w.get()); h = float(self.geom_h.get())
-                self.tunnel_poly = d_shaped(xm, ym, width=w, height=h, n_points=48)
-            elif gtype == "Rectangular":
-                w = float(self.geom_w.get()); h = float(self.geom_h.get())
-                self.tunnel_poly = rectangular(xm, ym, width=w, height=h)
-            elif gtype == "Horseshoe":
-                w = float(self.geom_w.get()); h = float(self.geom_h.get())
-                self.tunnel_poly = horseshoe(xm, ym, width=w, height=h, n_curve=24)
-            elif gtype == "Bezier":
-                w = float(self.geom_w.get()); wall = float(self.geom_h.get()); ch = float(self.geom_curve.get())
-                self.tunnel_poly = bezier_tunnel(xm, ym, width=w, wall_height=wall, curve_height=ch, n_points=48)
-
-            self.geom_index = self.scene.add_tunnel(self.tunnel_poly)
-            self.done_geom = True
-            self.draw()
+                dims = {"radius": float(self.geom_r.get())}
+            else:
+                dims = {"width": float(self.geom_w.get()), "height": float(self.geom_h.get())}
+                if gtype == "Bezier":
+                    dims["curve"] = float(self.geom_curve.get())
+            self.engine.set_geometry(gtype, (xm, ym), **dims)
+            self.request_redraw()
             self._render_step_panel()
             return
 
         # cueles
         if self.step == SP_CUELES:
-            holes = self._insert_cuele_at(xm, ym)
-            if holes:
-                self.scene.add_holes(self._tag(holes, SP_CUELES, "cuele"))
-                self.done_cueles = True
-                self.draw()
+            if self.engine.add_cuele(self.cuele_type.get(), (xm, ym), **self._cuele_params()):
+                self.request_redraw()
                 self._render_step_panel()
             return
 
         # contracuele (click libre)
         if self.step == SP_CC:
-            cct = self.cc_type.get()
-            if cct == "Hexágono":
-                r = float(self.cc_hex_r.get())
-                holes = place_contracuele_hex((xm, ym), r=r)
-            else:
-                w = float(self.cc_rect_w.get()); h = float(self.cc_rect_h.get()); m = int(self.cc_rect_n.get())
-                holes = place_contracuele_rect((xm, ym), w=w, h=h, n_per_side=m)
-            self.scene.add_holes(self._tag(holes, SP_CC, "contracuele"))
-            self.done_cc = True
-            self.draw()
+            self.engine.add_contracuele(self.cc_type.get(), (xm, ym), **self._cc_params())
+            self.request_redraw()
             self._render_step_panel()
             return
 
@@ -502,199 +835,170 @@ class App(tk.Tk):
         """Doble clic en Contracuele: snapea al centro de la perforación más cercana."""
         if self.step != SP_CC:
             return
-        xm, ym = c2w(ev.x, ev.y)
-        idx = self.scene.nearest(xm, ym, tol_m=SNAP_TOL_M)
-        if idx is None:
+        xm, ym = self.view.c2w(ev.x, ev.y)
+        if not self.engine.add_contracuele(self.cc_type.get(), (xm, ym), snap=True,
+                                           snap_tol=SNAP_TOL_M, **self._cc_params()):
             return
-        xm = self.scene.holes[idx]["x"]
-        ym = self.scene.holes[idx]["y"]
-
-        cct = self.cc_type.get()
-        if cct == "Hexágono":
-            r = float(self.cc_hex_r.get())
-            holes = place_contracuele_hex((xm, ym), r=r)
-        else:
-            w = float(self.cc_rect_w.get()); h = float(self.cc_rect_h.get()); m = int(self.cc_rect_n.get())
-            holes = place_contracuele_rect((xm, ym), w=w, h=h, n_per_side=m)
-
-        self.scene.add_holes(self._tag(holes, SP_CC, "contracuele"))
-        self.done_cc = True
-        self.draw()
+        self.request_redraw()
         self._render_step_panel()
 
     def on_drag(self, ev):
-        """Arrastra la perforación seleccionada si corresponde."""
+        """Arrastra la perforación seleccionada si corresponde (el movimiento se aplica al redibujar)."""
         if self.dragging_idx is None:
             return
-        xm, ym = c2w(ev.x, ev.y)
+        xm, ym = self.view.c2w(ev.x, ev.y)
         if self.snap_grid.get():
             xm = round(xm/GRID_M)*GRID_M
             ym = round(ym/GRID_M)*GRID_M
-        self.scene.holes[self.dragging_idx]["x"] = xm
-        self.scene.holes[self.dragging_idx]["y"] = ym
-        self.draw()
+        self._pending_drag = (self.dragging_idx, xm, ym)
+        self.request_redraw(self.dragging_idx)
 
     def on_release(self, ev):
         """Finaliza arrastre."""
+        self._apply_pending_drag()
         self.dragging_idx = None
 
     def _delete_selected(self, ev=None):
         """Elimina la perforación seleccionada."""
         i = self.scene.selected_idx
         if i is not None and 0 <= i < len(self.scene.holes):
-            del self.scene.holes[i]
+            self.scene.delete_hole(i)
             self.scene.selected_idx = None
-            self.draw()
-
-    def _insert_cuele_at(self, xm, ym):
-        """Genera y retorna la lista de perforaciones de un cuele en torno al punto (xm,ym)."""
-        name = self.cuele_type.get()
-        d  = float(self.d_var.get())
-        sx = float(self.sx.get())
-        sy = float(self.sy.get())
-        rot= float(self.rot.get())
-        vy = float(self.vy.get())
-
-        if name == "Sarrois":
-            holes = cuele_sarrois_geom(center=(xm,ym), d=d, scale_x=sx, scale_y=sy, rot_deg=rot)
-            apply_series_sarrois(holes, d=d)
-        elif name == "Sueco":
-            holes = cuele_sueco_geom(center=(xm,ym), d=d, scale_x=sx, scale_y=sy, rot_deg=rot)
-            apply_series_sueco(holes, d=d)
-        elif name == "Coromant":
-            v  = 0.5*d; ax = 1.2*d; ay = 1.2*d
-            holes = cuele_coromant_geom(center=(xm,ym), v=v, ax=ax, ay=ay, skew=0.4*d, spread=1.4,
-                                        scale_x=sx, scale_y=sy, rot_deg=rot)
-            apply_series_coromant(holes, v=v, ax=ax, ay=ay, skew=0.4*d)
-        elif name == "Cuña 2x3":
-            holes = cuele_cuna_geom(center=(xm,ym), d=d, variante="2x3", sep_cols_factor=2.0,
-                                    scale_x=sx, scale_y=sy, rot_deg=rot)
-            apply_series_cuna(holes, variante="2x3", d=d)
-        elif name == "Cuña zigzag":
-            holes = cuele_cuna_geom(center=(xm,ym), d=d, variante="zigzag",
-                                    scale_x=sx, scale_y=sy, rot_deg=rot)
-            apply_series_cuna(holes, variante="zigzag", d=d)
-        elif name == "Abanico":
-            holes = cuele_abanico_geom(center=(xm,ym), d=d, dx_factor=0.5,
-                                       scale_x=sx, scale_y=sy, rot_deg=rot)
-            apply_series_abanico(holes, d=d)
-        elif name == "Bethune":
-            holes = cuele_bethune_geom(center=(xm,ym), d=d, dx_factor=1.2,
-                                       y_levels=(1.6,1.4,1.2,1.0,0.9),
-                                       invert_y=True, vy_factor=vy,
-                                       scale_x=sx, scale_y=sy, rot_deg=rot)
-            apply_series_bethune(holes, d=d, y_levels=(1.6,1.4,1.2,1.0,0.9),
-                                 invert_y=True, vy_factor=vy)
-        elif name == "Cuatro secciones":
-            holes = cuele_cuatro_secciones_geom(center=(xm,ym), D=d, D2=d,
-                                                k2=1.5, k3=1.5, k4=1.5,
-                                                add_mids_S4=True,
-                                                scale_x=sx, scale_y=sy, rot_deg=rot)
-            B1=1.5*d; B2=1.5*B1; B3=1.5*B2; B4=1.5*B3
-            A1=B1; A2=B1+B2; A3=B1+B2+B3; A4=B1+B2+B3+B4
-            apply_series_cuatro_secciones(holes, A1,A2,A3,A4, add_mids_S4=True)
-        else:
-            holes = []
-
-        return holes
+            self.request_redraw()
+
+    def _cuele_params(self):
+        """Parámetros del cuele según los controles del paso."""
+        return {"d": float(self.d_var.get()), "scale_x": float(self.sx.get()),
+                "scale_y": float(self.sy.get()), "rot_deg": float(self.rot.get()),
+                "vy": float(self.vy.get())}
+
+    def _cc_params(self):
+        """Parámetros del contracuele según la figura elegida."""
+        if self.cc_type.get() == "Hexágono":
+            return {"r": float(self.cc_hex_r.get())}
+        return {"w": float(self.cc_rect_w.get()), "h": float(self.cc_rect_h.get()),
+                "n_per_side": int(self.cc_rect_n.get())}
+
+    def _run_step(self, add, *args):
+        """Ejecuta un paso de familia del motor y refresca; avisa si falta la geometría."""
+        try:
+            add(*args)
+        except ValueError as e:
+            messagebox.showwarning("Geometría", str(e))
+            return
+        self.request_redraw()
+        self.btn_next.configure(state="normal")
 
     def _do_zap(self):
         """Calcula y agrega perforaciones de zapateras sobre la base."""
-        if not self.tunnel_poly:
-            messagebox.showwarning("Geometría", "Primero inserta la geometría (Paso 1).")
-            return
-        n = int(self.n_zap.get())
-        holes = place_zapateras(self.tunnel_poly, n)
-        self.scene.add_holes(self._tag(holes, SP_ZAP, "zapatera"))
-        self.done_zap = True
-        self.draw()
-        self.btn_next.configure(state="normal")
+        self._run_step(self.engine.add_zapateras, int(self.n_zap.get()))
 
     def _do_cajas(self):
         """Calcula y agrega perforaciones de cajas en ambos lados."""
-        if not self.tunnel_poly:
-            messagebox.showwarning("Geometría", "Primero inserta la geometría (Paso 1).")
-            return
-        n = int(self.n_caja.get())
-        holes = place_cajas(self.tunnel_poly, n)
-        self.scene.add_holes(self._tag(holes, SP_CAJAS, "caja"))
-        self.done_cajas = True
-        self.draw()
-        self.btn_next.configure(state="normal")
+        self._run_step(self.engine.add_cajas, int(self.n_caja.get()))
 
     def _do_corona(self):
         """Calcula y agrega perforaciones de corona en el arco superior."""
-        if not self.tunnel_poly:
-            messagebox.showwarning("Geometría", "Primero inserta la geometría (Paso 1).")
-            return
-        n = int(self.n_corona.get())
-        holes = place_corona(self.tunnel_poly, n)
-        self.scene.add_holes(self._tag(holes, SP_CORONA, "corona"))
-        self.done_corona = True
-        self.draw()
-        self.btn_next.configure(state="normal")
+        self._run_step(self.engine.add_corona, int(self.n_corona.get()))
 
     def _do_aux(self):
         """Calcula y agrega perforaciones auxiliares como rejilla interna."""
-        if not self.tunnel_poly:
-            messagebox.showwarning("Geometría", "Primero inserta la geometría (Paso 1).")
-            return
-        nx = int(self.aux_nx.get()); ny = int(self.aux_ny.get())
-        holes = place_aux_grid(self.tunnel_poly, nx, ny)
-        self.scene.add_holes(self._tag(holes, SP_AUX, "aux"))
-        self.done_aux = True
-        self.draw()
-        self.btn_next.configure(state="normal")
+        self._run_step(self.engine.add_aux, int(self.aux_nx.get()), int(self.aux_ny.get()))
 
     def _clear_step(self, step_to_clear):
         """Borra el contenido de un paso. Si es geometría, resetea todo el flujo."""
         if step_to_clear == SP_GEOM:
-            self.scene = Scene()
-            self.tunnel_poly = []
-            self.geom_index = None
+            self._close_lazy()
+            self.engine.reset()
             self.step = SP_GEOM
-            self.done_geom = self.done_zap = self.done_cajas = False
-            self.done_corona = self.done_cueles = self.done_cc = self.done_aux = False
             self._render_step_panel()
             self._update_step_label()
-            self.draw()
+            self.request_redraw()
             return
 
-        self.scene.remove_holes_by_step(step_to_clear)
-
-        if step_to_clear == SP_ZAP:    self.done_zap = False
-        elif step_to_clear == SP_CAJAS: self.done_cajas = False
-        elif step_to_clear == SP_CORONA: self.done_corona = False
-        elif step_to_clear == SP_CUELES: self.done_cueles = False
-        elif step_to_clear == SP_CC:     self.done_cc = False
-        elif step_to_clear == SP_AUX:    self.done_aux = False
+        self.engine.clear_step(step_to_clear)
 
-        self.draw()
+        self.request_redraw()
         self._render_step_panel()
 
     def clear_all(self):
         """Borra todo el diseño y vuelve al paso 1."""
-        self.scene = Scene()
-        self.tunnel_poly = []
-        self.geom_index = None
+        self._close_lazy()
+        self.engine.reset()
         self.step = SP_GEOM
-        self.done_geom = self.done_zap = self.done_cajas = False
-        self.done_corona = self.done_cueles = self.done_cc = self.done_aux = False
         self._render_step_panel()
         self._update_step_label()
-        self.draw()
-
-    def export_json(self):
-        """Exporta a JSON los hoyos y galerías en layout_export.json."""
+        self.request_redraw()
+
+    def export_layout(self):
+        """Exporta hoyos y galerías; el formato (json, ndjson, npz, csv, dxf) sale de la extensión elegida."""
+        path = filedialog.asksaveasfilename(
+            initialfile="layout_export.json", defaultextension=".json",
+            filetypes=[("JSON", "*.json"), ("NDJSON (una perforación por línea)", "*.ndjson"),
+                       ("NumPy columnar", "*.npz"), ("Collares para jumbo (CSV)", "*.csv"),
+                       ("Plano CAD (DXF)", "*.dxf")])
+        if not path:
+            return
         try:
-            import json
-            data = {"holes": self.scene.holes, "tunnels": self.scene.tunnels}
-            with open("layout_export.json","w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            messagebox.showinfo("Export", "Guardado layout_export.json")
+            if self._lazy is not None:  # exporta el diseño completo, no solo lo cargado
+                self._lazy.materialize(self.scene)
+                self.engine.refresh_done()
+            if any(path.lower().endswith(ext) for ext in RIG_EXPORTERS):
+                export_rig(self.scene, path)
+            else:
+                export_layout(self.scene, path)
+            messagebox.showinfo("Export", f"Guardado {path}")
         except Exception as e:
             messagebox.showerror("Export", str(e))
 
+    def _close_lazy(self):
+        if self._lazy is not None:
+            self._lazy.close()
+            self._lazy = None
+
+    def open_layout(self, path=None):
+        """
+        Abre un diseño exportado (json, ndjson o npz) y retoma el asistente.
+
+        Los .npz se abren de forma perezosa: solo se cargan las galerías que
+        entran en la vista (inicialmente la primera). Los flags de pasos
+        completados se reconstruyen a partir de las etiquetas _step.
+        """
+        if path is None:
+            path = filedialog.askopenfilename(
+                filetypes=[("Diseños", "*.json *.ndjson *.npz"), ("Todos", "*.*")])
+        if not path:
+            return
+        try:
+            opened = open_layout(path)
+        except Exception as e:
+            messagebox.showerror("Abrir", str(e))
+            return
+        self._close_lazy()
+        if isinstance(opened, LazyLayout):
+            self._lazy = opened
+            scene = Scene()
+            opened.materialize(scene, [0] if opened.tunnels else None)
+            self.engine.adopt(scene)
+        else:
+            self.engine.adopt(opened)
+        self.scene.selected_idx = None
+        done = [s for s, d in self.engine.done.items() if d]
+        self.step = max(done) if done else SP_GEOM
+        self._render_step_panel()
+        self._update_step_label()
+        self._fit_active()
+
+    def _fit_active(self):
+        """Encuadra la galería activa (o toda la escena si no hay)."""
+        poly = self.tunnel_poly
+        if not poly:
+            self.fit_view()
+            return
+        xs = [p[0] for p in poly]; ys = [p[1] for p in poly]
+        self.view.fit(min(xs), max(xs), min(ys), max(ys))
+        self.invalidate_grid()
+
 
 if __name__ == "__main__":
     App().mainloop()
\ No newline at end of file
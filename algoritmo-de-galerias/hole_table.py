@@ -0,0 +1,629 @@
+# hole_table.py
+#
+# TABLA COLUMNAR DE PERFORACIONES
+# -------------------------------
+# Guarda las perforaciones en columnas paralelas (NumPy) en vez de un dict por
+# perforación:
+#   - x, y       : float64
+#   - is_void    : int8   (0/1)
+#   - note, _kind: int32  (código en una tabla de textos internados)
+#   - serie, delay: int32
+#   - _step      : int16
+# Cada fila tiene un id estable (rid) que nunca se reutiliza; las filas
+# borradas quedan como lápidas (tombstones) y se saltan al iterar. Cuando las
+# lápidas superan COMPACT_FRACTION de las filas usadas, la tabla se compacta:
+# las filas vivas se corren al principio (en el mismo orden) y desde entonces
+# rid -> posición física se resuelve con un dict. Los valores que no caben en
+# su columna (p.ej. un delay no entero) y las llaves extra se guardan en un
+# dict disperso por fila.
+#
+# HoleView expone una fila como un dict (MutableMapping) para el código
+# existente que usa h["x"], h.get("serie"), "serie" in h, etc.
+
+from collections.abc import MutableMapping, Sequence
+
+import numpy as np
+
+
+# columnas: llave -> (dtype, tipo de valor); el orden define el orden de llaves del dict
+_COLUMNS = {
+    "x":       (np.float64, float),
+    "y":       (np.float64, float),
+    "is_void": (np.int8,    bool),
+    "note":    (np.int32,   str),
+    "serie":   (np.int32,   int),
+    "delay":   (np.int32,   int),
+    "_step":   (np.int16,   int),
+    "_kind":   (np.int32,   str),
+}
+_REQUIRED = ("x", "y")
+_MISSING = {k: np.iinfo(dt).min for k, (dt, _) in _COLUMNS.items() if k not in _REQUIRED}
+MISSING = dict(_MISSING)  # valor centinela "ausente" de cada columna codificada
+_STR_KEYS = frozenset(k for k, (_, kind) in _COLUMNS.items() if kind is str)
+_INT_MAX = {k: int(np.iinfo(dt).max) for k, (dt, kind) in _COLUMNS.items() if kind is int}
+COMPACT_FRACTION = 0.25  # fracción de lápidas que dispara la compactación
+COMPACT_MIN_ROWS = 64    # no compactar por menos lápidas que esto
+
+
+class HoleTable:
+    """
+    Tabla columnar de perforaciones con ids de fila estables.
+
+    Parámetros:
+        capacity (int): capacidad inicial de las columnas.
+        on_move (callable|None): llamado como on_move(rid, x, y) cada vez que
+            cambia la posición de una fila (para mantener índices externos).
+    """
+
+    def __init__(self, capacity=64, on_move=None):
+        self._cap = max(int(capacity), 1)
+        self._n = 0  # filas físicas usadas (vivas + lápidas)
+        self._cols = {k: np.empty(self._cap, dtype=dt) for k, (dt, _) in _COLUMNS.items()}
+        self._alive = np.zeros(self._cap, dtype=bool)
+        self._rid_of = np.empty(self._cap, dtype=np.int64)  # fila física -> rid (creciente)
+        self._slots = None   # rid -> fila física; None = identidad (nunca se compactó)
+        self._next_rid = 0
+        self._extra = {}     # rid -> dict de llaves fuera de columna
+        self._strings = []   # textos internados (note/_kind)
+        self._codes = {}     # texto -> código
+        self._buckets = {}   # _step -> set(rid)
+        self._order = None   # rids vivos en orden (caché)
+        self._live_slots = None  # filas físicas vivas en orden (caché)
+        self._live = 0
+        self.on_move = on_move
+
+    # --- filas físicas ---
+    def _slot(self, rid):
+        """Fila física de rid, o -1 si no está viva."""
+        s = rid if self._slots is None else self._slots.get(rid, -1)
+        if 0 <= s < self._n and self._alive[s]:
+            return s
+        return -1
+
+    def _slots_of(self, rids):
+        """Filas físicas (vectorizado) de rids vivos; KeyError si alguno no lo está."""
+        rids = np.asarray(rids, dtype=np.int64)
+        if self._slots is None:
+            slots = rids
+            bad = (rids < 0) | (rids >= self._n)
+        else:
+            slots = np.searchsorted(self._rid_of[:self._n], rids)
+            bad = slots >= self._n
+            slots = np.where(bad, 0, slots)
+            bad |= self._rid_of[slots] != rids
+        if len(rids):
+            bad |= ~self._alive[np.where(bad, 0, slots)]
+            if bad.any():
+                raise KeyError(f"fila no viva en {rids[bad][:5].tolist()}")
+        return slots
+
+    # --- tamaño y orden ---
+    def __len__(self):
+        return self._live
+
+    def __contains__(self, rid):
+        return self._slot(rid) >= 0
+
+    def _live_rows(self):
+        """Filas físicas vivas, en orden."""
+        if self._live_slots is None:
+            self._live_slots = np.flatnonzero(self._alive[:self._n])
+        return self._live_slots
+
+    def rids(self):
+        """Arreglo (de solo lectura) con los rids vivos en orden de inserción."""
+        if self._order is None:
+            rows = self._live_rows()
+            self._order = rows.copy() if self._slots is None else self._rid_of[rows]
+            self._order.flags.writeable = False
+        return self._order
+
+    def rid_at(self, i):
+        """rid de la i-ésima perforación viva."""
+        return int(self.rids()[i])
+
+    def index_of(self, rid):
+        """Posición de la fila rid entre las vivas (los rids vivos están ordenados)."""
+        order = self.rids()
+        i = int(np.searchsorted(order, rid))
+        if i >= len(order) or order[i] != rid:
+            raise KeyError(rid)
+        return i
+
+    def indices_of(self, rids):
+        """Posiciones (vectorizado) de una colección de rids vivos."""
+        return np.searchsorted(self.rids(), np.asarray(rids, dtype=np.int64))
+
+    # --- textos internados ---
+    def _intern(self, s):
+        code = self._codes.get(s)
+        if code is None:
+            code = len(self._strings)
+            self._strings.append(s)
+            self._codes[s] = code
+        return code
+
+    # --- codificación de valores ---
+    def _encode(self, key, value):
+        """Código de columna para value, o None si debe ir al dict disperso."""
+        kind = _COLUMNS[key][1]
+        if kind is float:
+            return float(value)
+        if kind is bool:
+            return int(value) if isinstance(value, (bool, np.bool_)) else None
+        if kind is str:
+            return self._intern(value) if isinstance(value, str) else None
+        if isinstance(value, (int, np.integer)) and not isinstance(value, (bool, np.bool_)):
+            if _MISSING[key] < value <= _INT_MAX[key]:  # el mínimo es el centinela "ausente"
+                return int(value)
+        return None
+
+    def _decode(self, key, code):
+        kind = _COLUMNS[key][1]
+        if kind is float:
+            return float(code)
+        if kind is bool:
+            return bool(code)
+        if kind is str:
+            return self._strings[code]
+        return int(code)
+
+    # --- altas y bajas ---
+    def _grow(self, need):
+        cap = self._cap
+        while cap < need:
+            cap *= 2
+        if cap == self._cap:
+            return
+        for k, col in self._cols.items():
+            new = np.empty(cap, dtype=col.dtype)
+            new[:self._n] = col[:self._n]
+            self._cols[k] = new
+        alive = np.zeros(cap, dtype=bool)
+        alive[:self._n] = self._alive[:self._n]
+        self._alive = alive
+        rid_of = np.empty(cap, dtype=np.int64)
+        rid_of[:self._n] = self._rid_of[:self._n]
+        self._rid_of = rid_of
+        self._cap = cap
+
+    def _add_rows(self, k):
+        """Reserva k filas físicas al final. Retorna (fila inicial, rid inicial)."""
+        self._grow(self._n + k)
+        n0, r0 = self._n, self._next_rid
+        self._rid_of[n0:n0+k] = np.arange(r0, r0 + k)
+        if self._slots is not None:
+            self._slots.update(zip(range(r0, r0 + k), range(n0, n0 + k)))
+        self._alive[n0:n0+k] = True
+        self._n += k
+        self._next_rid += k
+        self._live += k
+        self._order = None
+        self._live_slots = None
+        return n0, r0
+
+    def compact(self):
+        """
+        Quita las lápidas: corre las filas vivas al principio (mismo orden y
+        mismos rids) y libera capacidad si sobra más de la mitad.
+        """
+        rows = self._live_rows()
+        m = len(rows)
+        if m == self._n:
+            return
+        cap = self._cap
+        while cap > 64 and cap//2 >= 2*m:
+            cap //= 2
+        for k, col in self._cols.items():
+            new = np.empty(cap, dtype=col.dtype) if cap != self._cap else col
+            new[:m] = col[rows]
+            self._cols[k] = new
+        rids = self._rid_of[rows]
+        if cap != self._cap:
+            self._rid_of = np.empty(cap, dtype=np.int64)
+            self._alive = np.zeros(cap, dtype=bool)
+            self._cap = cap
+        self._rid_of[:m] = rids
+        self._alive[:m] = True
+        self._alive[m:] = False
+        self._n = m
+        self._slots = dict(zip(rids.tolist(), range(m)))
+        self._live_slots = None
+        self._order = None
+
+    def _maybe_compact(self):
+        dead = self._n - self._live
+        if dead >= COMPACT_MIN_ROWS and dead > COMPACT_FRACTION*self._n:
+            self.compact()
+
+    def append(self, h):
+        """Agrega una perforación (mapping con al menos x, y). Retorna su rid."""
+        return self.extend((h,))[0]
+
+    def extend(self, hs):
+        """
+        Agrega varias perforaciones (mappings con al menos x, y).
+
+        Los valores se codifican en listas y se copian a las columnas en un
+        solo bloque por columna.
+
+        Retorna:
+            list[int]: rids asignados, en orden.
+        """
+        hs = list(hs)
+        k = len(hs)
+        if not k:
+            return []
+        self._grow(self._n + k)
+        n0, r0 = self._n, self._next_rid
+        vals = {key: [miss]*k for key, miss in _MISSING.items()}
+        xs = [0.0]*k
+        ys = [0.0]*k
+        encode = self._encode
+        codes = self._codes
+        for j, h in enumerate(hs):
+            xs[j] = float(h["x"])
+            ys[j] = float(h["y"])
+            for key, v in h.items():
+                if key in _REQUIRED:
+                    continue
+                # atajos para los tipos habituales; el resto pasa por _encode
+                t = type(v)
+                if t is str and key in _STR_KEYS:
+                    code = codes.get(v)
+                    if code is None:
+                        code = self._intern(v)
+                elif t is bool and key == "is_void":
+                    code = int(v)
+                else:
+                    code = encode(key, v) if key in vals else None
+                if code is None:
+                    self._extra.setdefault(r0 + j, {})[key] = v
+                else:
+                    vals[key][j] = code
+        cols = self._cols
+        cols["x"][n0:n0+k] = xs
+        cols["y"][n0:n0+k] = ys
+        for key, lst in vals.items():
+            cols[key][n0:n0+k] = lst
+        miss = _MISSING["_step"]
+        for j, st in enumerate(vals["_step"]):
+            if st != miss:
+                self._buckets.setdefault(st, set()).add(r0 + j)
+        self._add_rows(k)
+        return list(range(r0, r0 + k))
+
+    def remove(self, rid):
+        """Marca la fila rid como borrada (lápida)."""
+        s = self._check(rid)
+        self._alive[s] = False
+        self._live -= 1
+        self._order = None
+        self._live_slots = None
+        self._extra.pop(rid, None)
+        step = self._cols["_step"][s]
+        if step != _MISSING["_step"]:
+            bucket = self._buckets.get(int(step))
+            if bucket is not None:
+                bucket.discard(rid)
+        self._maybe_compact()
+
+    def remove_step(self, step):
+        """Borra todas las filas con _step == step en O(k). Retorna sus rids."""
+        bucket = self._buckets.pop(step, None)
+        if not bucket:
+            return []
+        rids = sorted(bucket)
+        self._alive[self._slots_of(rids)] = False
+        self._live -= len(rids)
+        self._order = None
+        self._live_slots = None
+        for rid in rids:
+            self._extra.pop(rid, None)
+        self._maybe_compact()
+        return rids
+
+    def step_rids(self, step):
+        """rids (ordenados) de las filas vivas con _step == step."""
+        return sorted(self._buckets.get(step, ()))
+
+    # --- acceso por campo ---
+    def _check(self, rid):
+        """Fila física de rid; KeyError si no está viva."""
+        s = self._slot(rid)
+        if s < 0:
+            raise KeyError(rid)
+        return s
+
+    def get(self, rid, key, default=None):
+        """Valor del campo key de la fila rid (o default si no está)."""
+        s = self._check(rid)
+        col = self._cols.get(key)
+        if col is None:
+            return self._extra.get(rid, {}).get(key, default)
+        code = col[s]
+        if key in _MISSING and code == _MISSING[key]:
+            return self._extra.get(rid, {}).get(key, default)
+        return self._decode(key, code)
+
+    def has(self, rid, key):
+        """True si la fila rid tiene el campo key."""
+        s = self._check(rid)
+        col = self._cols.get(key)
+        if col is not None and (key in _REQUIRED or col[s] != _MISSING[key]):
+            return True
+        extra = self._extra.get(rid)
+        return extra is not None and key in extra
+
+    def keys(self, rid):
+        """Llaves presentes en la fila rid (columnas en orden fijo y luego extras)."""
+        s = self._check(rid)
+        extra = self._extra.get(rid) or {}
+        out = [k for k in _COLUMNS
+               if k in _REQUIRED or self._cols[k][s] != _MISSING[k] or k in extra]
+        out.extend(k for k in extra if k not in _COLUMNS)
+        return out
+
+    def _set_field(self, rid, s, key, value):
+        col = self._cols.get(key)
+        code = None if col is None else self._encode(key, value)
+        if key == "_step":
+            old = col[s]
+            if old != _MISSING["_step"]:
+                self._buckets.get(int(old), set()).discard(rid)
+        if code is None:
+            if col is not None:
+                col[s] = _MISSING[key]
+            self._extra.setdefault(rid, {})[key] = value
+        else:
+            col[s] = code
+            extra = self._extra.get(rid)
+            if extra is not None:
+                extra.pop(key, None)
+                if not extra:
+                    del self._extra[rid]
+            if key == "_step":
+                self._buckets.setdefault(code, set()).add(rid)
+
+    def set(self, rid, key, value):
+        """Asigna el campo key de la fila rid."""
+        s = self._check(rid)
+        if key in _REQUIRED:
+            self._cols[key][s] = float(value)
+            if self.on_move is not None:
+                self.on_move(rid, float(self._cols["x"][s]), float(self._cols["y"][s]))
+            return
+        self._set_field(rid, s, key, value)
+
+    def position(self, rid):
+        """(x, y) de la fila rid."""
+        s = self._check(rid)
+        return float(self._cols["x"][s]), float(self._cols["y"][s])
+
+    def move(self, rid, x, y):
+        """Cambia x e y de la fila rid (un solo aviso a on_move)."""
+        s = self._check(rid)
+        self._cols["x"][s] = float(x)
+        self._cols["y"][s] = float(y)
+        if self.on_move is not None:
+            self.on_move(rid, float(x), float(y))
+
+    def move_many(self, rids, xs, ys, notify=True):
+        """
+        Cambia x e y de muchas filas en bloque.
+
+        Con notify=False no se llama a on_move (quien llama actualiza su
+        índice de una vez).
+        """
+        rids = np.asarray(rids, dtype=np.int64)
+        slots = self._slots_of(rids)
+        self._cols["x"][slots] = xs
+        self._cols["y"][slots] = ys
+        if notify and self.on_move is not None:
+            for rid, x, y in zip(rids.tolist(), self._cols["x"][slots].tolist(),
+                                 self._cols["y"][slots].tolist()):
+                self.on_move(rid, x, y)
+
+    def delete(self, rid, key):
+        """Quita el campo key de la fila rid."""
+        if not self.has(rid, key):
+            raise KeyError(key)
+        if key in _REQUIRED:
+            raise KeyError(f"'{key}' es obligatorio")
+        if key in _MISSING:
+            s = self._slot(rid)
+            if key == "_step" and self._cols[key][s] != _MISSING[key]:
+                self._buckets.get(int(self._cols[key][s]), set()).discard(rid)
+            self._cols[key][s] = _MISSING[key]
+        extra = self._extra.get(rid)
+        if extra is not None:
+            extra.pop(key, None)
+            if not extra:
+                del self._extra[rid]
+
+    # --- vistas ---
+    def row(self, rid):
+        """Vista tipo dict de la fila rid."""
+        self._check(rid)
+        return HoleView(self, rid)
+
+    def to_dict(self, rid):
+        """Copia de la fila rid como dict plano."""
+        return {k: self.get(rid, k) for k in self.keys(rid)}
+
+    def to_dicts(self):
+        """Copia de todas las filas vivas como lista de dicts."""
+        return list(self.iter_dicts())
+
+    def iter_dicts(self):
+        """
+        Genera las filas vivas como dicts planos (mismas llaves y orden que
+        to_dict), leyendo las columnas en bloque en vez de campo por campo.
+        """
+        rows = self._live_rows()
+        cols = {k: self._cols[k][rows] for k in _COLUMNS}
+        return iter_column_dicts(cols, self._strings, self.extras())
+
+    def extras(self):
+        """{posición: dict} con los campos fuera de columna de las filas vivas."""
+        if not self._extra:
+            return {}
+        pos = self.indices_of(sorted(self._extra))
+        return {int(i): dict(self._extra[r]) for i, r in zip(pos, sorted(self._extra))}
+
+    def extend_columns(self, columns, strings=(), extras=None):
+        """
+        Agrega filas en bloque desde columnas ya codificadas (ver column()).
+
+        Parámetros:
+            columns (dict): llave -> arreglo de largo k; x e y obligatorias,
+                las demás opcionales (ausente = todas MISSING).
+            strings (sequence): textos a los que apuntan los códigos de note/_kind.
+            extras (dict|None): {fila (0..k-1): dict} de campos fuera de columna.
+
+        Retorna:
+            range: rids asignados.
+        """
+        xs = np.asarray(columns["x"], dtype=np.float64)
+        k = len(xs)
+        self._grow(self._n + k)
+        n0, r0 = self._n, self._next_rid
+        cols = self._cols
+        cols["x"][n0:n0+k] = xs
+        cols["y"][n0:n0+k] = np.asarray(columns["y"], dtype=np.float64)
+        lut = np.array([self._intern(s) for s in strings], dtype=np.int32)
+        for key, miss in _MISSING.items():
+            arr = columns.get(key)
+            dst = cols[key][n0:n0+k]
+            if arr is None:
+                dst[:] = miss
+                continue
+            arr = np.asarray(arr)
+            if key in _STR_KEYS:
+                dst[:] = miss
+                m = arr != miss
+                dst[m] = lut[arr[m]]
+            else:
+                dst[:] = arr
+        steps = cols["_step"][n0:n0+k]
+        for st in np.unique(steps[steps != _MISSING["_step"]]).tolist():
+            self._buckets.setdefault(st, set()).update((r0 + np.flatnonzero(steps == st)).tolist())
+        if extras:
+            for j, d in extras.items():
+                self._extra[r0 + int(j)] = dict(d)
+        self._add_rows(k)
+        return range(r0, r0 + k)
+
+    def column(self, key):
+        """
+        Copia de la columna key para las filas vivas (en orden).
+
+        Para campos codificados retorna los códigos crudos; el valor ausente es
+        MISSING[key] y los textos se decodifican con strings().
+        """
+        return self._cols[key][self._live_rows()]
+
+    def xy(self, rids=None):
+        """(xs, ys) de las filas vivas (o de las filas rids), como arreglos float64."""
+        rows = self._live_rows() if rids is None else self._slots_of(rids)
+        return self._cols["x"][rows], self._cols["y"][rows]
+
+    def strings(self):
+        """Lista de textos internados (índice = código)."""
+        return list(self._strings)
+
+    def nbytes(self):
+        """Bytes ocupados por las columnas (sin contar textos ni extras)."""
+        return (sum(c.nbytes for c in self._cols.values()) + self._alive.nbytes
+                + self._rid_of.nbytes)
+
+
+def iter_column_dicts(columns, strings, extras=None, start=0):
+    """
+    Genera dicts de perforación desde columnas codificadas (ver HoleTable.column).
+
+    Parámetros:
+        columns (dict): llave -> arreglo (x e y obligatorias).
+        strings (list): textos a los que apuntan los códigos de note/_kind.
+        extras (dict|None): {posición: dict} de campos fuera de columna.
+        start (int): posición de la primera fila (para buscar en extras).
+    """
+    cols = {k: np.asarray(v).tolist() for k, v in columns.items()}
+    extras = extras or {}
+    coded = [(k, cols[k], _MISSING[k], _COLUMNS[k][1]) for k in _MISSING if k in cols]
+    xs, ys = cols["x"], cols["y"]
+    for j in range(len(xs)):
+        d = {"x": xs[j], "y": ys[j]}
+        extra = extras.get(start + j)
+        for k, vals, miss, kind in coded:
+            c = vals[j]
+            if c != miss:
+                d[k] = strings[c] if kind is str else (bool(c) if kind is bool else c)
+            elif extra is not None and k in extra:
+                d[k] = extra[k]
+        if extra is not None:
+            for k, v in extra.items():
+                if k not in _COLUMNS:
+                    d[k] = v
+        yield d
+
+
+class HoleView(MutableMapping):
+    """Fila de una HoleTable vista como dict. Las escrituras van a la tabla."""
+    __slots__ = ("table", "rid")
+
+    def __init__(self, table, rid):
+        self.table = table
+        self.rid = rid
+
+    def __getitem__(self, key):
+        t = self.table
+        if not t.has(self.rid, key):
+            raise KeyError(key)
+        return t.get(self.rid, key)
+
+    def get(self, key, default=None):
+        return self.table.get(self.rid, key, default)
+
+    def __contains__(self, key):
+        return self.table.has(self.rid, key)
+
+    def __setitem__(self, key, value):
+        self.table.set(self.rid, key, value)
+
+    def __delitem__(self, key):
+        self.table.delete(self.rid, key)
+
+    def __iter__(self):
+        return iter(self.table.keys(self.rid))
+
+    def __len__(self):
+        return len(self.table.keys(self.rid))
+
+    def __repr__(self):
+        return f"HoleView({self.rid}, {self.table.to_dict(self.rid)!r})"
+
+
+class HoleList(Sequence):
+    """Secuencia de solo lectura (en orden) de las filas vivas de una HoleTable."""
+    __slots__ = ("table",)
+
+    def __init__(self, table):
+        self.table = table
+
+    def __len__(self):
+        return len(self.table)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [HoleView(self.table, int(r)) for r in self.table.rids()[i]]
+        return HoleView(self.table, self.table.rid_at(i))
+
+    def __iter__(self):
+        t = self.table
+        for r in t.rids():
+            yield HoleView(t, int(r))
+
+    def to_dicts(self):
+        """Copia como lista de dicts (p.ej. para json.dump)."""
+        return self.table.to_dicts()
@@ -0,0 +1,375 @@
+# layout_io.py
+#
+# EXPORTACIÓN / CARGA DE DISEÑOS
+# ------------------------------
+# Formatos (se eligen por extensión o por nombre en EXPORTERS/LOADERS):
+#   - .json   : {"holes": [...], "tunnels": [...], "charge": {...}} (el
+#               formato original más los totales de carga, sin sangría;
+#               load_json también lee los archivos con indent=2).
+#   - .ndjson : línea 1 = cabecera {"layout": "ndjson", "version", "n_holes",
+#               "tunnels", "charge"}; luego una perforación (dict) por línea.
+#               Se escribe y se lee en streaming.
+#   - .npz    : columnar binario (NumPy). Las columnas de la HoleTable tal
+#               cual (códigos crudos, ver hole_table.MISSING), la tabla de
+#               textos, los campos extra como JSON y las galerías como un
+#               solo arreglo de vértices (N,2) más offsets. Cada perforación
+#               lleva además la galería a la que pertenece (hole_tunnel), lo
+#               que permite abrirlo con LazyLayout y materializar solo las
+#               galerías visibles (las columnas se mapean en memoria).
+#
+# Los tres formatos guardan los totales del plan de carga del frente
+# (charge_plan.ChargePlan.totals; ver layout_charge) calculados al exportar.
+
+import json
+import struct
+import zipfile
+
+import numpy as np
+
+from charge_plan import plan as charge_plan
+from hole_table import MISSING, iter_column_dicts
+from scene import Scene
+
+NDJSON_VERSION = 1
+NPZ_VERSION = 1
+TUNNEL_MARGIN_M = 0.5  # holgura del bbox de galería al asignarle perforaciones
+_HOLE_COLUMNS = ("x", "y") + tuple(MISSING)
+
+
+def _dumps(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def _tunnel_lists(scene):
+    return [[list(p) for p in poly] for poly in scene.tunnels]
+
+
+def hole_tunnels(xs, ys, tunnels, margin=TUNNEL_MARGIN_M):
+    """
+    Galería a la que pertenece cada perforación: la primera cuyo bbox
+    (ampliado en 'margin') la contiene, o -1 si ninguna.
+    """
+    xs = np.asarray(xs, dtype=np.float64)
+    ys = np.asarray(ys, dtype=np.float64)
+    out = np.full(len(xs), -1, dtype=np.int32)
+    for t, poly in enumerate(tunnels):
+        if not len(poly):
+            continue
+        p = np.asarray(poly, dtype=np.float64).reshape(-1, 2)
+        (x0, y0), (x1, y1) = p.min(axis=0) - margin, p.max(axis=0) + margin
+        m = (out == -1) & (xs >= x0) & (xs <= x1) & (ys >= y0) & (ys <= y1)
+        out[m] = t
+    return out
+
+
+# --- exportadores ---
+def _charge_totals(scene, charge):
+    """Totales de carga a exportar: los dados o los del plan con parámetros por defecto."""
+    return charge if charge is not None else charge_plan(scene).totals()
+
+
+def export_json(scene, path, charge=None):
+    """Escribe el diseño como un único objeto JSON compacto."""
+    charge = _charge_totals(scene, charge)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"holes":[')
+        for i, h in enumerate(scene.table.iter_dicts()):
+            if i:
+                f.write(",")
+            f.write(_dumps(h))
+        f.write('],"tunnels":')
+        f.write(_dumps(_tunnel_lists(scene)))
+        f.write(',"charge":')
+        f.write(_dumps(charge))
+        f.write("}")
+
+
+def export_ndjson(scene, path, charge=None):
+    """Escribe una cabecera con las galerías y luego una perforación por línea."""
+    charge = _charge_totals(scene, charge)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(_dumps({"layout": "ndjson", "version": NDJSON_VERSION,
+                        "n_holes": len(scene.holes), "tunnels": _tunnel_lists(scene),
+                        "charge": charge}))
+        f.write("\n")
+        f.writelines(_dumps(h) + "\n" for h in scene.table.iter_dicts())
+
+
+def export_npz(scene, path, compress=False, charge=None):
+    """Escribe las columnas de perforaciones y los vértices de galería en un .npz."""
+    t = scene.table
+    arrays = {k: t.column(k) for k in _HOLE_COLUMNS}
+    arrays["strings"] = np.array(t.strings(), dtype=str)
+    arrays["extras"] = np.array(_dumps({str(k): v for k, v in t.extras().items()}))
+    polys = [np.asarray(p, dtype=np.float64).reshape(-1, 2) for p in scene.tunnels]
+    arrays["tunnel_xy"] = np.concatenate(polys) if polys else np.empty((0, 2))
+    arrays["tunnel_offsets"] = np.cumsum([0] + [len(p) for p in polys], dtype=np.int64)
+    arrays["hole_tunnel"] = hole_tunnels(arrays["x"], arrays["y"], polys)
+    arrays["charge"] = np.array(_dumps(_charge_totals(scene, charge)))
+    arrays["version"] = np.array(NPZ_VERSION)
+    with open(path, "wb") as f:
+        (np.savez_compressed if compress else np.savez)(f, **arrays)
+
+
+# --- cargadores ---
+def _tunnels_from_lists(tunnels):
+    return [[tuple(p) for p in poly] for poly in tunnels]
+
+
+def _add_tunnels(scene, tunnels):
+    for poly in tunnels:
+        scene.add_tunnel(poly)
+
+
+def load_json(path, scene=None):
+    """Carga un .json exportado (compacto o con sangría) en una Scene."""
+    scene = scene if scene is not None else Scene()
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    scene.add_holes(data.get("holes", []))
+    _add_tunnels(scene, _tunnels_from_lists(data.get("tunnels", [])))
+    return scene
+
+
+def load_ndjson(path, scene=None, chunk=10_000):
+    """Carga un .ndjson en streaming (por bloques de 'chunk' perforaciones)."""
+    scene = scene if scene is not None else Scene()
+    with open(path, encoding="utf-8") as f:
+        header = json.loads(f.readline())
+        if header.get("layout") != "ndjson":
+            raise ValueError(f"{path}: no es un diseño NDJSON")
+        block = []
+        for line in f:
+            if line.strip():
+                block.append(json.loads(line))
+                if len(block) >= chunk:
+                    scene.add_holes(block)
+                    block = []
+        scene.add_holes(block)
+    _add_tunnels(scene, _tunnels_from_lists(header.get("tunnels", [])))
+    return scene
+
+
+def load_npz(path, scene=None):
+    """Carga un .npz columnar copiando las columnas en bloque a la Scene."""
+    scene = scene if scene is not None else Scene()
+    with np.load(path, allow_pickle=False) as z:
+        columns = {k: z[k] for k in _HOLE_COLUMNS if k in z.files}
+        strings = z["strings"].tolist()
+        extras = json.loads(str(z["extras"]))
+        xy, off = z["tunnel_xy"], z["tunnel_offsets"]
+    scene.add_columns(columns, strings, {int(k): v for k, v in extras.items()})
+    _add_tunnels(scene, [list(map(tuple, xy[a:b].tolist())) for a, b in zip(off[:-1], off[1:])])
+    return scene
+
+
+def _npz_memmap(path, name):
+    """
+    Mapea en memoria el miembro 'name' de un .npz sin comprimir.
+    Retorna None si el miembro está comprimido o no es mapeable.
+    """
+    with zipfile.ZipFile(path) as zf:
+        info = zf.getinfo(name + ".npy")
+    if info.compress_type != zipfile.ZIP_STORED:
+        return None
+    with open(path, "rb") as f:
+        f.seek(info.header_offset)
+        n_name, n_extra = struct.unpack("<HH", f.read(30)[26:30])
+        f.seek(info.header_offset + 30 + n_name + n_extra)
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran, dtype = np.lib.format.read_array_header_2_0(f)
+        offset = f.tell()
+    if dtype.hasobject or not shape or 0 in shape:
+        return None
+    return np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=shape,
+                     order="F" if fortran else "C")
+
+
+class LazyLayout:
+    """
+    Diseño .npz abierto sin cargar sus perforaciones.
+
+    Las galerías (pocas) se leen al abrir; las columnas de perforaciones se
+    mapean en memoria y solo se copian a una Scene las de las galerías que
+    se materializan.
+
+    Atributos:
+        tunnels (list[list[tuple]]): galerías del archivo.
+        bboxes (list[tuple]): (xmin, xmax, ymin, ymax) de cada galería.
+        n_holes (int): perforaciones en el archivo.
+        loaded (set[int]): galerías ya materializadas.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._z = np.load(path, allow_pickle=False)  # lee cada miembro al pedirlo
+        xy, off = self._z["tunnel_xy"], self._z["tunnel_offsets"]
+        self.tunnels = [list(map(tuple, xy[a:b].tolist())) for a, b in zip(off[:-1], off[1:])]
+        self.bboxes = [(min(p[0] for p in t), max(p[0] for p in t),
+                        min(p[1] for p in t), max(p[1] for p in t)) if t else None
+                       for t in self.tunnels]
+        self._cols = {}
+        self.n_holes = len(self._col("x"))
+        self._groups = None
+        self._unassigned_loaded = False
+        self.loaded = set()
+
+    def close(self):
+        """Libera el archivo."""
+        self._cols.clear()
+        self._z.close()
+
+    def _col(self, name):
+        col = self._cols.get(name)
+        if col is None:
+            col = _npz_memmap(self.path, name) if name in self._z.files else None
+            if col is None:
+                col = self._z[name]
+            self._cols[name] = col
+        return col
+
+    def _hole_groups(self):
+        """{galería: índices de sus perforaciones} (-1 = sin galería)."""
+        if self._groups is None:
+            if "hole_tunnel" in self._z.files:
+                owner = np.asarray(self._col("hole_tunnel"))
+            else:
+                owner = hole_tunnels(self._col("x"), self._col("y"), self.tunnels)
+            order = np.argsort(owner, kind="stable")
+            keys, starts = np.unique(owner[order], return_index=True)
+            bounds = list(starts) + [len(order)]
+            self._groups = {int(k): order[bounds[i]:bounds[i+1]] for i, k in enumerate(keys)}
+        return self._groups
+
+    def tunnels_in_rect(self, xmin, ymin, xmax, ymax):
+        """Galerías cuyo bbox toca el rectángulo dado."""
+        return [i for i, b in enumerate(self.bboxes)
+                if b is not None and b[0] <= xmax and b[1] >= xmin and b[2] <= ymax and b[3] >= ymin]
+
+    def materialize(self, scene, tunnel_ids=None):
+        """
+        Copia a 'scene' las galerías indicadas (None = todas) y sus
+        perforaciones; las perforaciones sin galería van con la primera
+        llamada. Las ya cargadas se omiten.
+
+        Retorna:
+            dict: {galería del archivo: índice en scene.tunnels}.
+        """
+        ids = range(len(self.tunnels)) if tunnel_ids is None else tunnel_ids
+        ids = [i for i in ids if i not in self.loaded]
+        groups = self._hole_groups()
+        parts = [groups[i] for i in ids if i in groups]
+        if not self._unassigned_loaded and -1 in groups:
+            parts.insert(0, groups[-1])
+        self._unassigned_loaded = True
+        if parts:
+            rows = np.sort(np.concatenate(parts))  # conserva el orden del archivo
+            columns = {k: np.asarray(self._col(k)[rows]) for k in _HOLE_COLUMNS if k in self._z.files}
+            extras = json.loads(str(self._z["extras"]))
+            local = {}
+            if extras:
+                pos = {int(k): v for k, v in extras.items()}
+                for j, r in enumerate(rows.tolist()):
+                    if r in pos:
+                        local[j] = pos[r]
+            scene.add_columns(columns, self._z["strings"].tolist(), local)
+        out = {}
+        for i in ids:
+            out[i] = scene.add_tunnel(self.tunnels[i])
+            self.loaded.add(i)
+        return out
+
+
+def _iter_ndjson_holes(f):
+    with f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _iter_npz_holes(lazy, chunk):
+    try:
+        strings = lazy._z["strings"].tolist()
+        extras = {int(k): v for k, v in json.loads(str(lazy._z["extras"])).items()}
+        names = [k for k in _HOLE_COLUMNS if k in lazy._z.files]
+        for a in range(0, lazy.n_holes, chunk):
+            cols = {k: np.asarray(lazy._col(k)[a:a+chunk]) for k in names}
+            yield from iter_column_dicts(cols, strings, extras, start=a)
+    finally:
+        lazy.close()
+
+
+def iter_layout(source, chunk=65_536):
+    """
+    Recorre un diseño sin armar una Scene: retorna (tunnels, iterador de
+    perforaciones como dicts).
+
+    'source' puede ser una Scene o la ruta de un archivo exportado; los
+    .ndjson se leen línea a línea y los .npz por bloques de 'chunk' filas
+    mapeadas en memoria (el .json se carga entero).
+    """
+    if isinstance(source, Scene):
+        return source.tunnels, source.table.iter_dicts()
+    ext = _ext(source, LOADERS)
+    if ext == ".npz":
+        lazy = LazyLayout(source)
+        return lazy.tunnels, _iter_npz_holes(lazy, chunk)
+    if ext == ".ndjson":
+        f = open(source, encoding="utf-8")
+        header = json.loads(f.readline())
+        return _tunnels_from_lists(header.get("tunnels", [])), _iter_ndjson_holes(f)
+    with open(source, encoding="utf-8") as f:
+        data = json.load(f)
+    return _tunnels_from_lists(data.get("tunnels", [])), iter(data.get("holes", []))
+
+
+def open_layout(path):
+    """
+    Abre un diseño: .npz como LazyLayout (perezoso) y el resto con load_layout.
+
+    Retorna:
+        LazyLayout|Scene
+    """
+    if path.lower().endswith(".npz"):
+        return LazyLayout(path)
+    return load_layout(path)
+
+
+EXPORTERS = {".json": export_json, ".ndjson": export_ndjson, ".npz": export_npz}
+LOADERS = {".json": load_json, ".ndjson": load_ndjson, ".npz": load_npz}
+
+
+def _ext(path, table):
+    for ext in table:
+        if path.lower().endswith(ext):
+            return ext
+    raise ValueError(f"extensión no soportada: {path} (use {', '.join(table)})")
+
+
+def export_layout(scene, path, charge=None):
+    """
+    Exporta la escena con el formato que indica la extensión de 'path'.
+
+    'charge' son los totales de carga a guardar (ChargePlan.totals); si no
+    se dan, se calcula el plan con los parámetros por defecto.
+    """
+    EXPORTERS[_ext(path, EXPORTERS)](scene, path, charge=charge)
+
+
+def layout_charge(path):
+    """Totales de carga guardados en un diseño exportado (None si no los tiene)."""
+    ext = _ext(path, LOADERS)
+    if ext == ".npz":
+        with np.load(path, allow_pickle=False) as z:
+            return json.loads(str(z["charge"])) if "charge" in z.files else None
+    with open(path, encoding="utf-8") as f:
+        data = json.loads(f.readline()) if ext == ".ndjson" else json.load(f)
+    return data.get("charge")
+
+
+def load_layout(path, scene=None):
+    """Carga un diseño con el formato que indica la extensión de 'path'."""
+    return LOADERS[_ext(path, LOADERS)](path, scene)
@@ -0,0 +1,213 @@
+# rig_export.py
+#
+# EXPORTACIÓN PARA JUMBO / CAD
+# ----------------------------
+# - CSV: tabla de collares (n, x, y, kind, serie, delay) con el plan de carga
+#   de cada perforación (taco, columna y kg), una fila por perforación.
+# - DXF (R12, ASCII): contornos de galería como POLYLINE, perforaciones como
+#   CIRCLE (una capa por tipo), su número/serie como TEXT y, bajo el dibujo,
+#   el total de perforaciones cargadas y kg.
+#
+# La carga sale de charge_plan.kind_charges (una entrada por familia), así
+# que se calcula perforación a perforación sin romper el streaming.
+#
+# Ambos se escriben en streaming a partir de una Scene o de un archivo
+# exportado (ver layout_io.iter_layout), de modo que no requieren cargar la
+# campaña completa en memoria.
+#
+# Uso por línea de comandos:
+#   python rig_export.py diseño.npz -o collares.csv
+#   python rig_export.py diseño.ndjson -o plano.dxf --diam 0.051
+
+import argparse
+import csv
+import sys
+
+from charge_plan import charge_of, kind_charges
+from layout_io import iter_layout
+
+CSV_FIELDS = ("n", "x", "y", "kind", "serie", "delay", "stemming", "column", "kg")
+HOLE_DIAM_M = 0.045   # diámetro de perforación dibujado en el DXF
+TEXT_H_M    = 0.06    # altura de texto de los rótulos
+TUNNEL_LAYER = "GALERIA"
+LABEL_LAYER  = "ROTULOS"
+# capa y color ACI por tipo de perforación (los tipos desconocidos usan su nombre y color 7)
+KIND_LAYERS = {
+    "zapatera":    ("ZAPATERAS", 1),
+    "caja":        ("CAJAS", 2),
+    "corona":      ("CORONA", 3),
+    "cuele":       ("CUELES", 4),
+    "contracuele": ("CONTRACUELE", 5),
+    "aux":         ("AUXILIARES", 6),
+}
+
+
+def hole_kind(h):
+    """Tipo de la perforación: _kind si está, si no note."""
+    return h.get("_kind") or h.get("note") or ""
+
+
+def hole_charge(h, charges, totals=None):
+    """
+    (taco, columna, kg) de la perforación h según la tabla de kind_charges.
+
+    Los vacíos no se cargan. Si se da 'totals' ({"holes", "kg"}), suma ahí
+    la perforación cargada.
+    """
+    if h.get("is_void", False):
+        return 0.0, 0.0, 0.0
+    c = charge_of(charges, hole_kind(h))
+    if totals is not None:
+        totals["holes"] += 1
+        totals["kg"] += c[2]
+    return c
+
+
+# --- CSV ---
+def write_csv(holes, f, charges=None, totals=None):
+    """
+    Escribe la tabla de collares en el archivo de texto f.
+
+    Parámetros:
+        holes (iterable[dict]): perforaciones (se recorren una vez).
+        f (file): destino abierto con newline="".
+        charges (dict|None): tabla de charge_plan.kind_charges (None = por defecto).
+        totals (dict|None): si se da, acumula {"holes", "kg"} cargados.
+
+    Retorna:
+        int: filas escritas.
+    """
+    charges = kind_charges() if charges is None else charges
+    w = csv.writer(f)
+    w.writerow(CSV_FIELDS)
+    n = 0
+    for n, h in enumerate(holes, 1):
+        stem, column, kg = hole_charge(h, charges, totals)
+        w.writerow((n, f"{h['x']:.4f}", f"{h['y']:.4f}", hole_kind(h),
+                    h.get("serie", ""), h.get("delay", ""),
+                    f"{stem:.2f}", f"{column:.2f}", f"{kg:.3f}"))
+    return n
+
+
+def export_csv(source, path, charges=None, totals=None):
+    """Tabla de collares desde una Scene o un archivo exportado. Retorna nº de filas."""
+    _, holes = iter_layout(source)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        return write_csv(holes, f, charges, totals)
+
+
+# --- DXF R12 ---
+def _pairs(f, *items):
+    f.write("".join(f"{code}\n{value}\n" for code, value in zip(items[::2], items[1::2])))
+
+
+def _layer_of(kind):
+    return KIND_LAYERS.get(kind, (kind.upper() or "PERFORACIONES", 7))[0]
+
+
+def _write_dxf_header(f):
+    _pairs(f, 0, "SECTION", 2, "HEADER", 9, "$ACADVER", 1, "AC1009", 0, "ENDSEC")
+    layers = [(TUNNEL_LAYER, 8), (LABEL_LAYER, 7)] + list(KIND_LAYERS.values())
+    _pairs(f, 0, "SECTION", 2, "TABLES", 0, "TABLE", 2, "LAYER", 70, len(layers))
+    for name, color in layers:
+        _pairs(f, 0, "LAYER", 2, name, 70, 0, 62, color, 6, "CONTINUOUS")
+    _pairs(f, 0, "ENDTAB", 0, "ENDSEC", 0, "SECTION", 2, "ENTITIES")
+
+
+def _write_dxf_polyline(f, poly):
+    pts = list(poly)
+    closed = len(pts) > 2 and tuple(pts[0]) == tuple(pts[-1])
+    if closed:
+        pts = pts[:-1]
+    _pairs(f, 0, "POLYLINE", 8, TUNNEL_LAYER, 66, 1, 70, 1 if closed else 0)
+    for x, y in pts:
+        _pairs(f, 0, "VERTEX", 8, TUNNEL_LAYER, 10, f"{x:.6f}", 20, f"{y:.6f}", 30, 0.0)
+    _pairs(f, 0, "SEQEND", 8, TUNNEL_LAYER)
+
+
+def write_dxf(holes, tunnels, f, diam=HOLE_DIAM_M, text_h=TEXT_H_M, labels=True,
+              charges=None, totals=None):
+    """
+    Escribe un DXF R12 con galerías, perforaciones y rótulos en el archivo f.
+
+    Parámetros:
+        holes (iterable[dict]): perforaciones (se recorren una vez).
+        tunnels (list): polilíneas de galería.
+        diam (float): diámetro de los círculos (m).
+        text_h (float): altura de los rótulos (m).
+        labels (bool): agrega el rótulo "n" o "n/serie" junto a cada perforación.
+        charges, totals: plan de carga (ver write_csv); el total se rotula
+            bajo el dibujo.
+
+    Retorna:
+        int: perforaciones escritas.
+    """
+    charges = kind_charges() if charges is None else charges
+    totals = {"holes": 0, "kg": 0.0} if totals is None else totals
+    _write_dxf_header(f)
+    xmin, ymin = float("inf"), float("inf")
+    for poly in tunnels:
+        if len(poly) >= 2:
+            _write_dxf_polyline(f, poly)
+            xmin = min(xmin, min(p[0] for p in poly))
+            ymin = min(ymin, min(p[1] for p in poly))
+    r = diam/2
+    n = 0
+    for n, h in enumerate(holes, 1):
+        x, y = h["x"], h["y"]
+        xmin, ymin = min(xmin, x), min(ymin, y)
+        hole_charge(h, charges, totals)
+        _pairs(f, 0, "CIRCLE", 8, _layer_of(hole_kind(h)),
+               10, f"{x:.6f}", 20, f"{y:.6f}", 30, 0.0, 40, f"{r:.6f}")
+        if labels:
+            text = f"{n}/{h['serie']}" if "serie" in h else str(n)
+            _pairs(f, 0, "TEXT", 8, LABEL_LAYER, 10, f"{x + r*1.5:.6f}", 20, f"{y + r*1.5:.6f}",
+                   30, 0.0, 40, f"{text_h:.4f}", 1, text)
+    if n:
+        _pairs(f, 0, "TEXT", 8, LABEL_LAYER, 10, f"{xmin:.6f}", 20, f"{ymin - 4*text_h:.6f}",
+               30, 0.0, 40, f"{text_h:.4f}", 1,
+               f"CARGA TOTAL {totals['kg']:.2f} kg EN {totals['holes']} PERFORACIONES")
+    _pairs(f, 0, "ENDSEC", 0, "EOF")
+    return n
+
+
+def export_dxf(source, path, **kw):
+    """DXF desde una Scene o un archivo exportado. Retorna nº de perforaciones."""
+    tunnels, holes = iter_layout(source)
+    with open(path, "w", encoding="ascii", errors="replace", newline="\r\n") as f:
+        return write_dxf(holes, tunnels, f, **kw)
+
+
+RIG_EXPORTERS = {".csv": export_csv, ".dxf": export_dxf}
+
+
+def export_rig(source, path, **kw):
+    """Exporta CSV o DXF según la extensión de 'path' (kw: charges, totals)."""
+    for ext, fn in RIG_EXPORTERS.items():
+        if path.lower().endswith(ext):
+            return fn(source, path, **kw)
+    raise ValueError(f"extensión no soportada: {path} (use .csv o .dxf)")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Exporta un diseño a CSV de collares o DXF.")
+    ap.add_argument("layout", help="diseño exportado (.json, .ndjson o .npz)")
+    ap.add_argument("-o", "--output", required=True, help="archivo .csv o .dxf")
+    ap.add_argument("--diam", type=float, default=HOLE_DIAM_M, help="diámetro de perforación en el DXF (m)")
+    ap.add_argument("--no-labels", action="store_true", help="DXF sin rótulos")
+    ap.add_argument("--length", type=float, default=None, help="largo de perforación para el plan de carga (m)")
+    args = ap.parse_args(argv)
+    charges = kind_charges() if args.length is None else kind_charges(hole_length=args.length)
+    totals = {"holes": 0, "kg": 0.0}
+    if args.output.lower().endswith(".dxf"):
+        n = export_dxf(args.layout, args.output, diam=args.diam, labels=not args.no_labels,
+                       charges=charges, totals=totals)
+    else:
+        n = export_rig(args.layout, args.output, charges=charges, totals=totals)
+    print(f"{n} perforaciones -> {args.output} ({totals['kg']:.2f} kg en "
+          f"{totals['holes']} cargadas)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
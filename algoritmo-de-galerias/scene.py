@@ -0,0 +1,132 @@
+# scene.py
+#
+# ESCENA DE DISEÑO (SIN INTERFAZ)
+# -------------------------------
+# Modelo de datos del diseño: perforaciones (tabla columnar + índice
+# espacial), polilíneas de galería y los pasos del asistente. No depende de
+# tkinter, de modo que lo usan tanto la GUI como el motor de diseño.
+
+import numpy as np
+
+from spatial_index import GridIndex
+from hole_table import HoleTable, HoleList
+from transform import apply_xy, transform_polyline
+
+INDEX_CELL_M = 0.25  # lado de celda del índice espacial de perforaciones
+
+# PASOS DEL ASISTENTE
+SP_GEOM   = 0   # geometría
+SP_ZAP    = 1   # zapateras (base)
+SP_CAJAS  = 2   # cajas (paredes)
+SP_CORONA = 3   # corona (techo)
+SP_CUELES = 4   # cueles (clic para ubicar)
+SP_CC     = 5   # contracuele (clic libre o doble clic en perforación)
+SP_AUX    = 6   # perforaciones auxiliares (rejilla interna)
+STEPS_MAX = SP_AUX
+
+
+# ESCENA (MODELO DE DATOS)
+class Scene:
+    """Contenedor de perforaciones y geometrías de galería en memoria.
+
+    Atributos:
+        table (HoleTable): perforaciones en columnas (x, y, is_void, note,
+            serie, delay y tags de paso/kind), con id de fila estable (rid).
+        holes (HoleList): vista secuencial de table; holes[i] es un HoleView
+            que se comporta como el dict de la perforación.
+        tunnels (list[list[tuple]]): polilíneas de galería [(x,y), ...].
+        selected_idx (int|None): índice de perforación seleccionada, si hay.
+        index (GridIndex): índice espacial de las perforaciones (llave = rid).
+
+    El índice espacial se actualiza solo al cambiar x/y de una perforación
+    (por move_hole o escribiendo en su HoleView).
+    """
+    def __init__(self, cell_m=INDEX_CELL_M):
+        self.index = GridIndex(cell_m)
+        self.table = HoleTable(on_move=self.index.move)
+        self.holes = HoleList(self.table)
+        self.tunnels = []
+        self.selected_idx = None
+
+    def add_holes(self, hs):
+        """Agrega una lista de perforaciones (dicts). Retorna sus rids."""
+        rids = self.table.extend(hs)
+        pos = [self.table.position(rid) for rid in rids]
+        self.index.insert_many(rids, [p[0] for p in pos], [p[1] for p in pos])
+        return rids
+
+    def add_columns(self, columns, strings=(), extras=None):
+        """Agrega perforaciones en bloque desde columnas codificadas (ver HoleTable.extend_columns)."""
+        rids = self.table.extend_columns(columns, strings, extras)
+        self.index.insert_many(rids, np.asarray(columns["x"], dtype=np.float64).tolist(),
+                               np.asarray(columns["y"], dtype=np.float64).tolist())
+        return rids
+
+    def add_tunnel(self, poly):
+        """Agrega una polilínea de galería.
+
+        Retorna:
+            int|None: índice de la galería insertada o None si no se agregó.
+        """
+        if poly and len(poly) >= 2:
+            self.tunnels.append(poly)
+            return len(self.tunnels) - 1
+        return None
+
+    def move_hole(self, i, xm, ym):
+        """Mueve la perforación i a (xm,ym) y actualiza el índice."""
+        self.table.move(self.table.rid_at(i), xm, ym)
+
+    def transform(self, m, rids=None, tunnels=True):
+        """
+        Aplica la matriz afín m (ver transform.py) a las perforaciones y galerías.
+
+        Parámetros:
+            m (np.ndarray): matriz 3×3 (o 2×3).
+            rids (array|None): solo esas perforaciones (None = todas).
+            tunnels (bool): transforma también las polilíneas de galería.
+        """
+        table = self.table
+        rids = table.rids() if rids is None else np.asarray(rids, dtype=np.int64)
+        if len(rids):
+            xs, ys = apply_xy(m, *table.xy(rids))
+            table.move_many(rids, xs, ys, notify=False)
+            keys = rids.tolist()
+            if len(keys) == len(self.index):
+                self.index.clear()
+            else:
+                for k in keys:
+                    self.index.remove(k)
+            self.index.insert_many(keys, xs.tolist(), ys.tolist())
+        if tunnels:
+            self.tunnels = [transform_polyline(p, m) for p in self.tunnels]
+
+    def delete_hole(self, i):
+        """Elimina la perforación i."""
+        rid = self.table.rid_at(i)
+        self.table.remove(rid)
+        self.index.remove(rid)
+
+    def remove_holes_by_step(self, step):
+        """Elimina todas las perforaciones etiquetadas con el paso dado (O(k))."""
+        for rid in self.table.remove_step(step):
+            self.index.remove(rid)
+
+    def nearest(self, xm, ym, tol_m=0.15):
+        """Retorna el índice de la perforación más cercana al punto (xm,ym) si está dentro de tol_m."""
+        best = None
+        for d, rid in self.index.query_radius(xm, ym, tol_m):
+            cand = (d, rid)  # los rids crecen con el índice: mismo desempate
+            if best is None or cand < best:
+                best = cand
+        return None if best is None else self.table.index_of(best[1])
+
+    def holes_in_radius(self, xm, ym, r):
+        """Índices (ordenados) de las perforaciones a distancia ≤ r de (xm,ym)."""
+        rids = sorted(k for _, k in self.index.query_radius(xm, ym, r))
+        return self.table.indices_of(rids).tolist()
+
+    def holes_in_rect(self, xmin, ymin, xmax, ymax):
+        """Índices (ordenados) de las perforaciones dentro del rectángulo dado."""
+        rids = sorted(self.index.query_rect(xmin, ymin, xmax, ymax))
+        return self.table.indices_of(rids).tolist()
@@ -0,0 +1,188 @@
+# spatial_index.py
+#
+# ÍNDICE ESPACIAL DE GRILLA UNIFORME
+# ----------------------------------
+# Reparte puntos (perforaciones) en celdas cuadradas de lado 'cell' para
+# responder consultas de vecino más cercano, radio y rectángulo mirando solo
+# las celdas involucradas, en vez de recorrer todos los puntos.
+#
+# Cada punto se identifica con una llave hashable (en la Scene, el rid de la
+# perforación en la HoleTable) y se puede insertar, mover y eliminar en O(1).
+
+from math import floor, hypot, inf
+
+
+class GridIndex:
+    """
+    Índice de grilla uniforme (hash de celdas) para puntos 2D.
+
+    Atributos:
+        cell (float): lado de la celda en metros.
+    """
+
+    def __init__(self, cell=0.25):
+        if cell <= 0:
+            raise ValueError("cell debe ser > 0")
+        self.cell = float(cell)
+        self._cells = {}  # (i,j) -> set(llaves)
+        self._pos = {}    # llave -> (x, y, (i,j))
+
+    def __len__(self):
+        return len(self._pos)
+
+    def __contains__(self, key):
+        return key in self._pos
+
+    def _cell_of(self, x, y):
+        return (floor(x / self.cell), floor(y / self.cell))
+
+    def clear(self):
+        """Vacía el índice."""
+        self._cells.clear()
+        self._pos.clear()
+
+    def insert(self, key, x, y):
+        """Agrega (o reubica) el punto 'key' en (x,y)."""
+        if key in self._pos:
+            self.move(key, x, y)
+            return
+        c = self._cell_of(x, y)
+        self._cells.setdefault(c, set()).add(key)
+        self._pos[key] = (x, y, c)
+
+    def insert_many(self, keys, xs, ys):
+        """
+        Agrega muchos puntos nuevos de una vez (llaves que no estén en el índice).
+        Agrupa por celda antes de llenar los buckets.
+        """
+        keys = list(keys)
+        if any(k in self._pos for k in keys):
+            for k, x, y in zip(keys, xs, ys):
+                self.insert(k, x, y)
+            return
+        cell = self.cell
+        cells = [(floor(x / cell), floor(y / cell)) for x, y in zip(xs, ys)]
+        self._pos.update(zip(keys, zip(xs, ys, cells)))
+        groups = {}
+        for k, c in zip(keys, cells):
+            g = groups.get(c)
+            if g is None:
+                groups[c] = [k]
+            else:
+                g.append(k)
+        for c, g in groups.items():
+            bucket = self._cells.get(c)
+            if bucket is None:
+                self._cells[c] = set(g)
+            else:
+                bucket.update(g)
+
+    def move(self, key, x, y):
+        """Actualiza la posición de 'key'; solo cambia de celda si es necesario."""
+        _, _, old = self._pos[key]
+        c = self._cell_of(x, y)
+        if c != old:
+            bucket = self._cells[old]
+            bucket.discard(key)
+            if not bucket:
+                del self._cells[old]
+            self._cells.setdefault(c, set()).add(key)
+        self._pos[key] = (x, y, c)
+
+    def remove(self, key):
+        """Elimina 'key' (sin error si no está)."""
+        item = self._pos.pop(key, None)
+        if item is None:
+            return
+        bucket = self._cells.get(item[2])
+        if bucket is not None:
+            bucket.discard(key)
+            if not bucket:
+                del self._cells[item[2]]
+
+    def position(self, key):
+        """(x, y) registrado para 'key'."""
+        x, y, _ = self._pos[key]
+        return x, y
+
+    def _keys_in_cells(self, i0, i1, j0, j1):
+        cells = self._cells
+        # si el rango de celdas es mayor que las ocupadas, recorrer las ocupadas
+        if (i1 - i0 + 1)*(j1 - j0 + 1) > len(cells):
+            for (i, j), bucket in cells.items():
+                if i0 <= i <= i1 and j0 <= j <= j1:
+                    yield from bucket
+            return
+        for i in range(i0, i1 + 1):
+            for j in range(j0, j1 + 1):
+                bucket = cells.get((i, j))
+                if bucket:
+                    yield from bucket
+
+    def query_rect(self, xmin, ymin, xmax, ymax):
+        """Llaves de los puntos dentro del rectángulo [xmin,xmax]×[ymin,ymax]."""
+        i0, j0 = self._cell_of(xmin, ymin)
+        i1, j1 = self._cell_of(xmax, ymax)
+        pos = self._pos
+        out = []
+        for k in self._keys_in_cells(i0, i1, j0, j1):
+            x, y, _ = pos[k]
+            if xmin <= x <= xmax and ymin <= y <= ymax:
+                out.append(k)
+        return out
+
+    def query_radius(self, x, y, r):
+        """Lista de (distancia, llave) de los puntos a distancia ≤ r de (x,y)."""
+        i0, j0 = self._cell_of(x - r, y - r)
+        i1, j1 = self._cell_of(x + r, y + r)
+        pos = self._pos
+        out = []
+        for k in self._keys_in_cells(i0, i1, j0, j1):
+            px, py, _ = pos[k]
+            d = hypot(px - x, py - y)
+            if d <= r:
+                out.append((d, k))
+        return out
+
+    def nearest(self, x, y, max_dist=inf):
+        """
+        Llave del punto más cercano a (x,y) dentro de max_dist (o None).
+        Busca por anillos de celdas crecientes y se detiene en cuanto ningún
+        anillo restante puede contener un punto más cercano.
+        """
+        if not self._pos:
+            return None
+        ci, cj = self._cell_of(x, y)
+        if max_dist < inf:
+            max_ring = int(max_dist // self.cell) + 1
+        else:
+            i_all = [c[0] for c in self._cells]
+            j_all = [c[1] for c in self._cells]
+            max_ring = max(abs(ci - min(i_all)), abs(ci - max(i_all)),
+                           abs(cj - min(j_all)), abs(cj - max(j_all)))
+        best_k, best_d = None, max_dist
+        pos = self._pos
+        for ring in range(max_ring + 1):
+            # distancia mínima posible a cualquier celda del anillo
+            if ring > 0 and (ring - 1)*self.cell > best_d:
+                break
+            for i in range(ci - ring, ci + ring + 1):
+                for j in (range(cj - ring, cj + ring + 1)
+                          if i in (ci - ring, ci + ring) else (cj - ring, cj + ring)):
+                    bucket = self._cells.get((i, j))
+                    if not bucket:
+                        continue
+                    for k in bucket:
+                        px, py, _ = pos[k]
+                        d = hypot(px - x, py - y)
+                        if d <= best_d and (best_k is None or d < best_d):
+                            best_k, best_d = k, d
+        return best_k
+
+    def bounds(self):
+        """(xmin, xmax, ymin, ymax) de los puntos indexados, o None si está vacío."""
+        if not self._pos:
+            return None
+        xs = [p[0] for p in self._pos.values()]
+        ys = [p[1] for p in self._pos.values()]
+        return min(xs), max(xs), min(ys), max(ys)
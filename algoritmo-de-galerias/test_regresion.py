@@ -0,0 +1,159 @@
+# test_regresion.py
+#
+# PRUEBAS DE REGRESIÓN (sin gráficos)
+# -----------------------------------
+#   1) Exportar un frente completo a .json, .ndjson y .npz, volver a cargarlo
+#      y comparar perforación por perforación (iter_dicts), los pasos
+#      completados que recupera DesignEngine.adopt y los totales de carga.
+#   2) Series de los cueles registrados, ubicados con rotación y
+#      desplazamiento, contra el rotulado por tolerancia de blast_cuts
+#      (apply_series_*) sobre el patrón en el origen.
+#   3) Con un arc_tol distinto del por defecto, todas las perforaciones
+#      quedan dentro de la galería exportada: las interiores (cueles,
+#      contracuele, auxiliares) estrictamente, y las de contorno a no más de
+#      arc_tol de la polilínea (se muestrean sobre el contorno analítico).
+#
+# Uso:
+#   python test_regresion.py      (termina con código 1 si algo falla)
+
+import os
+import random
+import sys
+import tempfile
+
+import numpy as np
+
+from blast_cuts import (
+    apply_series_sarrois, apply_series_sueco, apply_series_coromant,
+    apply_series_cuatro_secciones, apply_series_cuna,
+    apply_series_abanico, apply_series_bethune,
+)
+from charge_plan import plan
+from cut_registry import cut_holes, cuatro_secciones_apothems
+from design_engine import DesignEngine, design_from_spec
+from drift_layout import points_in_polygon
+from layout_io import EXPORTERS, export_layout, layout_charge, load_layout
+from scene import SP_CUELES, SP_CC, SP_AUX
+from transform import apply_xy, place
+
+SPEC = {
+    "geometry": {"type": "D-shaped", "center": [1.0, 2.0]},
+    "zapateras": {"n": 7},
+    "cajas": {"n_per_side": 4},
+    "corona": {"n": 9},
+    "cueles": [{"type": "Sueco", "center": [1.0, 3.0]}],
+    "contracuele": [{"type": "Hexágono", "center": [1.0, 3.0]}],
+    "aux": {"nx": 5, "ny": 4},
+}
+ATOL = 1e-9
+COARSE_SPEC = {
+    "geometry": {"type": "Semicircular", "center": [0.0, 0.0], "radius": 1.5},
+    "zapateras": {"n": 7},
+    "cajas": {"n_per_side": 4},
+    "corona": {"n": 9},
+    "contracuele": [{"type": "Hexágono", "center": [0.0, 1.0]}],
+    "aux": {"nx": 60, "ny": 60},
+}
+COARSE_ARC_TOL = 0.1
+
+# cuele -> rotulado por tolerancia con los parámetros por defecto de su plantilla
+_A = cuatro_secciones_apothems(0.20, 0.20)
+LEGACY_SERIES = {
+    "Sarrois":          lambda hs: apply_series_sarrois(hs, 0.15),
+    "Sueco":            lambda hs: apply_series_sueco(hs, 0.12),
+    "Coromant":         lambda hs: apply_series_coromant(hs, 0.075, 0.18, 0.18, 0.06),
+    "Cuña 2x3":         lambda hs: apply_series_cuna(hs, "2x3", 0.20),
+    "Cuña zigzag":      lambda hs: apply_series_cuna(hs, "zigzag", 0.20),
+    "Abanico":          lambda hs: apply_series_abanico(hs, 0.20),
+    "Bethune":          lambda hs: apply_series_bethune(hs, 0.20),
+    "Cuatro secciones": lambda hs: apply_series_cuatro_secciones(hs, *(float(a) for a in _A)),
+}
+
+
+def check_roundtrip(errors):
+    """Exporta/carga en cada formato y compara con la escena original."""
+    engine = design_from_spec(SPEC)
+    scene = engine.scene
+    ref = list(scene.table.iter_dicts())
+    ref_kg = plan(scene).total_kg
+    with tempfile.TemporaryDirectory() as tmp:
+        for ext in EXPORTERS:
+            path = os.path.join(tmp, "frente" + ext)
+            export_layout(scene, path)
+            loaded = load_layout(path)
+            got = list(loaded.table.iter_dicts())
+            if got != ref:
+                bad = next((i for i, (a, b) in enumerate(zip(got, ref)) if a != b), min(len(got), len(ref)))
+                errors.append(f"{ext}: perforaciones distintas ({len(got)} vs {len(ref)}, primera en {bad})")
+            tunnels = [np.asarray(t, dtype=float) for t in loaded.tunnels]
+            if len(tunnels) != len(scene.tunnels) or not all(
+                    a.shape == np.shape(b) and np.allclose(a, b, atol=ATOL)
+                    for a, b in zip(tunnels, scene.tunnels)):
+                errors.append(f"{ext}: galerías distintas")
+            other = DesignEngine()
+            other.adopt(loaded)
+            if other.done != engine.done:
+                errors.append(f"{ext}: pasos completados {other.done} != {engine.done}")
+            charge = layout_charge(path)
+            if charge is None or abs(charge["kg"] - ref_kg) > ATOL:
+                errors.append(f"{ext}: carga total distinta de la del plan")
+            print(f"{ext:7s} {len(got)} perforaciones")
+
+
+def check_cut_series(errors, trials=25, seed=7):
+    """Series de cada cuele rotado/desplazado contra el rotulado en el origen."""
+    rng = random.Random(seed)
+    for name, label in LEGACY_SERIES.items():
+        base = [{k: v for k, v in h.items() if k not in ("serie", "delay")}
+                for h in cut_holes(name, (0.0, 0.0))]
+        label(base)
+        bx = [h["x"] for h in base]
+        by = [h["y"] for h in base]
+        for _ in range(trials):
+            center = (rng.uniform(-20, 20), rng.uniform(-20, 20))
+            rot = rng.uniform(-180, 180)
+            got = cut_holes(name, center, rot_deg=rot)
+            ex, ey = apply_xy(place(center, rot_deg=rot), bx, by)
+            if len(got) != len(base) or not (
+                    np.allclose([h["x"] for h in got], ex, atol=ATOL)
+                    and np.allclose([h["y"] for h in got], ey, atol=ATOL)):
+                errors.append(f"{name}: posiciones distintas (centro {center}, rot {rot:.1f}°)")
+                break
+            keys = ("is_void", "serie", "delay")
+            if [[h.get(k) for k in keys] for h in got] != [[h.get(k) for k in keys] for h in base]:
+                errors.append(f"{name}: series distintas (centro {center}, rot {rot:.1f}°)")
+                break
+        print(f"{name:17s} {len(base)} perforaciones")
+
+
+def check_arc_tol(errors):
+    """Perforaciones dentro de la galería exportada con un arc_tol grueso."""
+    scene = design_from_spec(COARSE_SPEC, arc_tol=COARSE_ARC_TOL).scene
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "frente.npz")
+        export_layout(scene, path)
+        tunnel = load_layout(path).tunnels[0]
+    xs, ys = scene.table.xy()
+    steps = scene.table.column("_step")
+    interior = np.isin(steps, (SP_CUELES, SP_CC, SP_AUX))
+    inside = points_in_polygon(tunnel, xs, ys)
+    near = points_in_polygon(tunnel, xs, ys, include_boundary=True, atol=COARSE_ARC_TOL)
+    out = int((interior & ~inside).sum() + (~interior & ~near).sum())
+    if out:
+        errors.append(f"arc_tol={COARSE_ARC_TOL}: {out} perforaciones fuera de la galería exportada")
+    print(f"arc_tol {COARSE_ARC_TOL} {len(xs)} perforaciones, {out} fuera")
+
+
+def main():
+    errors = []
+    check_roundtrip(errors)
+    check_cut_series(errors)
+    check_arc_tol(errors)
+    for e in errors:
+        print("FALLA:", e)
+    print("ok" if not errors else f"{len(errors)} fallas")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,516 @@
+# timing.py
+#
+# SIMULADOR DE SECUENCIA DE DETONACIÓN
+# ------------------------------------
+# Convierte los números de retardo de las perforaciones en tiempos de salida
+# (ms) según un catálogo de detonadores (series LP / MS con dispersión) y
+# arma la línea de tiempo de la tronadura de un frente:
+#   - grupos de perforaciones que salen juntas (dentro de window_ms);
+#   - área abierta acumulada tras cada grupo (área tributaria de cada
+#     perforación, rasterizada y recortada al contorno);
+#   - perforaciones sin cara libre al salir: ninguna perforación salida al
+#     menos relief_ms antes (ni un vacío) a menos de free_face_m.
+# Todo se resuelve con barridos sobre los tiempos ordenados y el índice de
+# grilla (spatial_index.GridIndex), sin recorrer pares.
+#
+# Conflictos de simultaneidad (simultaneous_pairs, find_conflicts,
+# ConflictMonitor): pares de perforaciones a menos de dist_m que salen dentro
+# de window_ms una de otra (congelamiento del cuele, sobre-excavación). Las
+# familias de contorno (CONTOUR_KINDS) salen juntas a propósito y sus pares
+# internos no se informan.
+#
+# Número de retardo de cada perforación: las familias salen en el orden de
+# FAMILY_ORDER (cuele, contracuele, auxiliares, cajas, corona, zapateras); dentro
+# de una familia se suma su 'delay' (p.ej. la serie del cuele), y la familia
+# siguiente empieza en el número libre siguiente. Los vacíos no se cargan y
+# son cara libre desde el inicio.
+#
+# Uso por línea de comandos:
+#   python timing.py diseño.npz --series LP --window 8 --seed 1
+
+import argparse
+import json
+import sys
+from math import floor
+
+import numpy as np
+
+from drift_layout import raster_in_polygon
+from hole_table import MISSING
+from spatial_index import GridIndex
+
+# Catálogo de referencia: tiempos nominales (ms) por número de retardo y
+# dispersión (desviación estándar relativa al nominal). Reemplazar por la
+# tabla del fabricante con load_catalogue().
+CATALOGUE = {
+    "MS": {"times_ms": [0, 25, 50, 75, 100, 125, 150, 175, 200, 225, 250,
+                        300, 350, 400, 450, 500, 600, 700, 800, 900, 1000],
+           "scatter": 0.03},
+    "LP": {"times_ms": [0, 200, 400, 600, 1000, 1400, 1800, 2400, 3000,
+                        3800, 4600, 5500, 6400, 7400, 8500, 9600],
+           "scatter": 0.015},
+}
+FAMILY_ORDER = ("cuele", "contracuele", "aux", "caja", "corona", "zapatera")
+WINDOW_MS     = 8.0    # ventana de simultaneidad
+RELIEF_MS     = 8.0    # tiempo mínimo para que una perforación salida sea cara libre
+FREE_FACE_M   = 1.0    # distancia máxima a una cara libre
+AREA_RES_M    = 0.05   # resolución del raster de área
+AREA_MAX_CELLS = 4_000_000
+CONFLICT_M    = 0.5    # distancia bajo la cual dos salidas simultáneas son conflicto
+CONTOUR_KINDS = ("corona", "caja", "zapatera")
+
+
+def load_catalogue(path):
+    """Catálogo desde JSON: {"serie": {"times_ms": [...], "scatter": σ_rel}, ...}."""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def face_arrays(source):
+    """
+    Columnas de un frente: Scene o iterable de dicts de perforación.
+
+    Retorna:
+        dict: "x", "y" (float64), "is_void" (bool), "delay" (int64, -1 = sin
+              delay), "kind" (list[str]: _kind o note).
+    """
+    table = getattr(source, "table", None)
+    if table is not None:
+        strings = table.strings()
+        kinds = table.column("_kind")
+        notes = table.column("note")
+        miss_k, miss_n = MISSING["_kind"], MISSING["note"]
+        kind = [strings[k] if k != miss_k else (strings[n] if n != miss_n else "")
+                for k, n in zip(kinds.tolist(), notes.tolist())]
+        delay = table.column("delay").astype(np.int64)
+        delay[delay == MISSING["delay"]] = -1
+        xs, ys = table.xy()
+        return {"x": xs.astype(np.float64), "y": ys.astype(np.float64),
+                "is_void": table.column("is_void") == 1, "delay": delay, "kind": kind}
+    holes = list(source)
+    delay = [h.get("delay") for h in holes]
+    return {
+        "x": np.array([h["x"] for h in holes], dtype=np.float64),
+        "y": np.array([h["y"] for h in holes], dtype=np.float64),
+        "is_void": np.array([bool(h.get("is_void", False)) for h in holes], dtype=bool),
+        "delay": np.array([d if isinstance(d, (int, np.integer)) else -1 for d in delay], dtype=np.int64),
+        "kind": [h.get("_kind") or h.get("note") or "" for h in holes],
+    }
+
+
+def firing_numbers(kinds, delays, is_void=None, order=FAMILY_ORDER):
+    """
+    Número de retardo de cada perforación según el orden de familias.
+
+    Las familias que no están en 'order' salen después, en orden de
+    aparición. Los vacíos quedan con -1.
+
+    Retorna:
+        np.ndarray[int64]
+    """
+    delays = np.asarray(delays, dtype=np.int64)
+    kinds = np.asarray(kinds, dtype=object)
+    rel = np.where(delays >= 0, delays, 0)
+    numbers = np.full(len(delays), -1, dtype=np.int64)
+    charged = np.ones(len(delays), dtype=bool) if is_void is None else ~np.asarray(is_void, dtype=bool)
+    extra = [k for k in dict.fromkeys(kinds[charged].tolist()) if k not in order]
+    offset = 0
+    for fam in tuple(order) + tuple(extra):
+        m = charged & (kinds == fam)
+        if not m.any():
+            continue
+        numbers[m] = offset + rel[m]
+        offset = int(numbers[m].max()) + 1
+    return numbers
+
+
+def nominal_times(numbers, series="LP", catalogue=CATALOGUE):
+    """Tiempos nominales (ms) de los números de retardo (-1 -> nan)."""
+    table = np.asarray(catalogue[series]["times_ms"], dtype=np.float64)
+    numbers = np.asarray(numbers, dtype=np.int64)
+    if numbers.size and numbers.max() >= len(table):
+        raise ValueError(f"la serie {series} tiene {len(table)} números de retardo; "
+                         f"el diseño usa hasta el {int(numbers.max())}")
+    return np.where(numbers >= 0, table[np.clip(numbers, 0, None)], np.nan)
+
+
+def firing_times(numbers, series="LP", catalogue=CATALOGUE, scatter=True, seed=None):
+    """
+    Tiempos de salida (ms): nominales más dispersión normal (σ = scatter·nominal).
+
+    Parámetros:
+        scatter (bool): aplica la dispersión del catálogo.
+        seed (int|None): semilla para reproducir una realización.
+    """
+    t = nominal_times(numbers, series, catalogue)
+    sigma = catalogue[series].get("scatter", 0.0)
+    if scatter and sigma:
+        rng = np.random.default_rng(seed)
+        t = t + rng.normal(0.0, 1.0, t.shape)*sigma*np.nan_to_num(t)
+        t = np.where(np.isnan(t), t, np.maximum(t, 0.0))
+    return t
+
+
+def fire_groups(times, window_ms=WINDOW_MS):
+    """
+    Agrupa las perforaciones que salen juntas (barrido sobre tiempos ordenados).
+
+    Un grupo empieza en la perforación más temprana aún sin grupo y toma
+    todas las que salen antes de t0 + window_ms. Los tiempos nan se omiten.
+
+    Retorna:
+        tuple: (order, starts) — order: índices ordenados por tiempo;
+               el grupo g es order[starts[g]:starts[g+1]].
+    """
+    times = np.asarray(times, dtype=np.float64)
+    order = np.nonzero(~np.isnan(times))[0]
+    order = order[np.argsort(times[order], kind="stable")]
+    ts = times[order]
+    starts = []
+    i = 0
+    while i < len(ts):
+        starts.append(i)
+        i = int(np.searchsorted(ts, ts[i] + window_ms, side="left"))
+    starts.append(len(ts))
+    return order, np.asarray(starts, dtype=np.int64)
+
+
+def _tributary_owner(xs, ys, tunnels, res, radius):
+    """
+    Raster del frente: dueño (perforación más cercana a ≤ radius) de cada celda.
+
+    Retorna:
+        tuple: (owner (k,) índice de perforación o -1, área de celda, celdas en el frente)
+    """
+    xmin, xmax = xs.min() - radius, xs.max() + radius
+    ymin, ymax = ys.min() - radius, ys.max() + radius
+    nx = int(np.ceil((xmax - xmin)/res))
+    ny = int(np.ceil((ymax - ymin)/res))
+    if nx*ny > AREA_MAX_CELLS:
+        raise ValueError(f"raster de área de {nx}×{ny} celdas: use una resolución mayor que {res} m")
+    gx = xmin + (np.arange(nx) + 0.5)*res
+    gy = ymin + (np.arange(ny) + 0.5)*res
+    inside = np.ones((ny, nx), dtype=bool)
+    if tunnels:
+        inside = np.zeros((ny, nx), dtype=bool)
+        for poly in tunnels:
+            if len(poly) >= 3:
+                inside |= raster_in_polygon(poly, gx, gy)
+    dist = np.full((ny, nx), np.inf)
+    owner = np.full((ny, nx), -1, dtype=np.int64)
+    w = int(np.ceil(radius/res))
+    for i, (x, y) in enumerate(zip(xs.tolist(), ys.tolist())):
+        ci, cj = floor((x - xmin)/res), floor((y - ymin)/res)
+        i0, i1 = max(ci - w, 0), min(ci + w + 1, nx)
+        j0, j1 = max(cj - w, 0), min(cj + w + 1, ny)
+        d = np.hypot(gx[i0:i1][None, :] - x, gy[j0:j1][:, None] - y)
+        sub_d = dist[j0:j1, i0:i1]
+        closer = (d < sub_d) & (d <= radius)
+        sub_d[closer] = d[closer]
+        owner[j0:j1, i0:i1][closer] = i
+    owner[~inside] = -1
+    return owner[inside], res*res, int(inside.sum())
+
+
+class FiringTimeline:
+    """
+    Línea de tiempo de la tronadura de un frente.
+
+    Atributos:
+        times_ms (np.ndarray): tiempo de salida de cada perforación (nan = vacío).
+        numbers (np.ndarray): número de retardo de cada perforación (-1 = vacío).
+        order (np.ndarray): perforaciones cargadas ordenadas por tiempo.
+        groups (list[dict]): {"t0", "t1", "holes", "opened_m2"} por grupo,
+            con el área abierta acumulada al terminar el grupo.
+        no_free_face (list[int]): perforaciones sin cara libre al salir.
+        face_m2 (float): área del frente (dentro del contorno, o cubierta por
+            las áreas tributarias si no hay contorno).
+    """
+
+    def __init__(self, times_ms, numbers, order, starts, no_free_face, opened, face_m2):
+        self.times_ms = times_ms
+        self.numbers = numbers
+        self.order = order
+        self.groups = []
+        for g in range(len(starts) - 1):
+            idx = order[starts[g]:starts[g + 1]]
+            self.groups.append({"t0": float(times_ms[idx[0]]), "t1": float(times_ms[idx[-1]]),
+                                "holes": idx.tolist(), "opened_m2": float(opened[g])})
+        self.no_free_face = no_free_face
+        self.face_m2 = face_m2
+
+    def to_dict(self):
+        """Resumen serializable (JSON)."""
+        return {"groups": self.groups, "no_free_face": self.no_free_face,
+                "face_m2": self.face_m2,
+                "duration_ms": float(np.nanmax(self.times_ms)) if len(self.order) else 0.0}
+
+    def report(self):
+        """Texto legible con un renglón por grupo."""
+        lines = [f"{len(self.order)} perforaciones en {len(self.groups)} grupos; "
+                 f"frente {self.face_m2:.2f} m²"]
+        for g in self.groups:
+            pct = 100*g["opened_m2"]/self.face_m2 if self.face_m2 else 0.0
+            lines.append(f"{g['t0']:8.1f}–{g['t1']:8.1f} ms  {len(g['holes']):4d} perf.  "
+                         f"abierto {g['opened_m2']:7.2f} m² ({pct:5.1f} %)")
+        if self.no_free_face:
+            lines.append(f"sin cara libre: {self.no_free_face}")
+        return "\n".join(lines)
+
+
+def simulate(source, tunnels=None, series="LP", catalogue=CATALOGUE, scatter=True, seed=None,
+             window_ms=WINDOW_MS, relief_ms=RELIEF_MS, free_face_m=FREE_FACE_M,
+             area_res=AREA_RES_M, order=FAMILY_ORDER, times_ms=None):
+    """
+    Simula la secuencia de salida de un frente.
+
+    Parámetros:
+        source (Scene|iterable[dict]): perforaciones del frente.
+        tunnels (list|None): contornos para recortar el área (por defecto los
+            de la Scene).
+        series (str): serie del catálogo.
+        scatter, seed: dispersión de los tiempos (ver firing_times).
+        window_ms (float): ventana de simultaneidad de los grupos.
+        relief_ms (float): antelación mínima para que una perforación salida
+            sea cara libre de otra.
+        free_face_m (float): distancia máxima a la cara libre (y radio del
+            área tributaria de cada perforación).
+        area_res (float): resolución del raster de área (m).
+        order (tuple): orden de salida de las familias.
+        times_ms (array|None): tiempos ya calculados (omite catálogo y dispersión).
+
+    Retorna:
+        FiringTimeline
+    """
+    if tunnels is None:
+        tunnels = getattr(source, "tunnels", [])
+    a = face_arrays(source)
+    xs, ys, void = a["x"], a["y"], a["is_void"]
+    numbers = firing_numbers(a["kind"], a["delay"], void, order)
+    if times_ms is None:
+        times_ms = firing_times(numbers, series, catalogue, scatter, seed)
+    times_ms = np.where(void, np.nan, np.asarray(times_ms, dtype=np.float64))
+    order_idx, starts = fire_groups(times_ms, window_ms)
+    if not len(xs):
+        return FiringTimeline(times_ms, numbers, order_idx, starts, [], np.zeros(0), 0.0)
+
+    # cara libre: barrido en orden de tiempo; el índice solo tiene las
+    # perforaciones salidas al menos relief_ms antes (y los vacíos)
+    opened = GridIndex(max(free_face_m, 1e-3))
+    voids = np.nonzero(void)[0].tolist()
+    opened.insert_many(voids, xs[voids].tolist(), ys[voids].tolist())
+    ts = times_ms[order_idx]
+    xo, yo = xs.tolist(), ys.tolist()
+    no_free, k = [], 0
+    for pos, i in enumerate(order_idx.tolist()):
+        while k < pos and ts[k] <= ts[pos] - relief_ms:
+            j = int(order_idx[k])
+            opened.insert(j, xo[j], yo[j])
+            k += 1
+        if not opened.query_radius(xo[i], yo[i], free_face_m):
+            no_free.append(i)
+
+    # área abierta acumulada por grupo
+    owner, cell_m2, n_face = _tributary_owner(xs, ys, tunnels, area_res, free_face_m)
+    group_of = np.full(len(xs), -1, dtype=np.int64)
+    for g in range(len(starts) - 1):
+        group_of[order_idx[starts[g]:starts[g + 1]]] = g
+    cg = group_of[owner[owner >= 0]]
+    per_group = np.bincount(cg[cg >= 0], minlength=len(starts) - 1)
+    opened_m2 = np.cumsum(per_group)*cell_m2
+    face_m2 = (n_face if tunnels else int((owner >= 0).sum()))*cell_m2
+    return FiringTimeline(times_ms, numbers, order_idx, starts, no_free, opened_m2, face_m2)
+
+
+# CONFLICTOS DE SIMULTANEIDAD
+def simultaneous_pairs(xs, ys, times, dist_m=CONFLICT_M, window_ms=WINDOW_MS):
+    """
+    Pares a distancia ≤ dist_m cuyos tiempos difieren en menos de window_ms.
+
+    Barrido en orden de tiempo: el índice de grilla solo tiene las
+    perforaciones de la ventana activa, así que cada consulta ve a sus
+    vecinas en espacio y tiempo, no al frente completo. Los tiempos nan
+    (vacíos) se omiten.
+
+    Retorna:
+        tuple: (pairs (k, 2) int64 con i < j, dist (k,), dt_ms (k,)), en orden
+               lexicográfico de pares.
+    """
+    xs = np.asarray(xs, dtype=np.float64)
+    ys = np.asarray(ys, dtype=np.float64)
+    times = np.asarray(times, dtype=np.float64)
+    order = np.nonzero(~np.isnan(times))[0]
+    order = order[np.argsort(times[order], kind="stable")].tolist()
+    ts, xo, yo = times.tolist(), xs.tolist(), ys.tolist()
+    active = GridIndex(max(dist_m, 1e-3))
+    out, k = [], 0
+    for pos, i in enumerate(order):
+        while k < pos and ts[order[k]] <= ts[i] - window_ms:
+            active.remove(order[k])
+            k += 1
+        for d, j in active.query_radius(xo[i], yo[i], dist_m):
+            out.append((min(i, j), max(i, j), d))
+        active.insert(i, xo[i], yo[i])
+    if not out:
+        return np.zeros((0, 2), dtype=np.int64), np.zeros(0), np.zeros(0)
+    out.sort()
+    pairs = np.array([(a, b) for a, b, _ in out], dtype=np.int64)
+    dist = np.array([d for _, _, d in out], dtype=np.float64)
+    return pairs, dist, np.abs(times[pairs[:, 0]] - times[pairs[:, 1]])
+
+
+def _allowed_pairs(kinds, pairs, allow_kinds):
+    """Máscara de los pares entre perforaciones de una misma familia permitida."""
+    if not len(pairs) or not allow_kinds:
+        return np.zeros(len(pairs), dtype=bool)
+    kinds = np.asarray(kinds, dtype=object)
+    ka, kb = kinds[pairs[:, 0]], kinds[pairs[:, 1]]
+    return (ka == kb) & np.isin(ka, list(allow_kinds))
+
+
+def find_conflicts(source, series="LP", catalogue=CATALOGUE, dist_m=CONFLICT_M,
+                   window_ms=WINDOW_MS, allow_kinds=CONTOUR_KINDS, order=FAMILY_ORDER,
+                   scatter=False, seed=None, times_ms=None):
+    """
+    Conflictos de simultaneidad de un frente.
+
+    Parámetros:
+        source (Scene|iterable[dict]): perforaciones del frente.
+        dist_m (float): distancia máxima entre las perforaciones del par.
+        window_ms (float): diferencia de tiempo bajo la cual salen juntas.
+        allow_kinds (tuple): familias cuyos pares internos se ignoran.
+        scatter, seed: por defecto se revisan los tiempos nominales.
+        times_ms (array|None): tiempos ya calculados (p.ej. de simulate).
+
+    Retorna:
+        list[dict]: {"i", "j", "dist_m", "dt_ms"} con índices de fila de source.
+    """
+    a = face_arrays(source)
+    if times_ms is None:
+        numbers = firing_numbers(a["kind"], a["delay"], a["is_void"], order)
+        times_ms = firing_times(numbers, series, catalogue, scatter, seed)
+    times_ms = np.where(a["is_void"], np.nan, np.asarray(times_ms, dtype=np.float64))
+    pairs, dist, dt = simultaneous_pairs(a["x"], a["y"], times_ms, dist_m, window_ms)
+    keep = ~_allowed_pairs(a["kind"], pairs, allow_kinds)
+    return [{"i": i, "j": j, "dist_m": d, "dt_ms": t}
+            for (i, j), d, t in zip(pairs[keep].tolist(), dist[keep].tolist(), dt[keep].tolist())]
+
+
+class ConflictMonitor:
+    """
+    Conflictos de simultaneidad de una Scene, mantenidos al mover perforaciones.
+
+    refresh() recalcula todo (tiempos nominales y pares). moved(rids) solo
+    rehace los pares de las perforaciones movidas consultando el índice de
+    la escena: los tiempos no cambian al mover, así que basta con sus
+    vecinas. Tras agregar o borrar perforaciones, stale() es True.
+
+    Atributos:
+        pairs (set[tuple]): pares (rid_a, rid_b) con rid_a < rid_b.
+    """
+
+    def __init__(self, scene, series="LP", catalogue=CATALOGUE, dist_m=CONFLICT_M,
+                 window_ms=WINDOW_MS, allow_kinds=CONTOUR_KINDS, order=FAMILY_ORDER):
+        self.scene = scene
+        self.series = series
+        self.catalogue = catalogue
+        self.dist_m = dist_m
+        self.window_ms = window_ms
+        self.allow_kinds = tuple(allow_kinds)
+        self.order = order
+        self.pairs = set()
+        self._times = {}   # rid -> tiempo nominal (ms); sin entrada = vacío
+        self._kinds = {}
+        self._key = None
+
+    def _scene_key(self):
+        rids = self.scene.table.rids()
+        return (len(rids), int(rids.max()) if len(rids) else -1)
+
+    def stale(self):
+        """True si la escena ganó o perdió perforaciones desde el último refresh."""
+        return self._key != self._scene_key()
+
+    def refresh(self):
+        """
+        Recalcula tiempos y pares de toda la escena.
+
+        Si los tiempos no se pueden calcular (p.ej. el diseño usa más números
+        de retardo que la serie), levanta ValueError y queda sin pares hasta
+        que la escena cambie (stale() vuelve a False, no se reintenta).
+        """
+        table = self.scene.table
+        rids = table.rids()
+        self.pairs, self._times, self._kinds = set(), {}, {}
+        self._key = self._scene_key()
+        a = face_arrays(self.scene)
+        numbers = firing_numbers(a["kind"], a["delay"], a["is_void"], self.order)
+        times = nominal_times(numbers, self.series, self.catalogue)
+        pairs, _, _ = simultaneous_pairs(a["x"], a["y"], times, self.dist_m, self.window_ms)
+        pairs = pairs[~_allowed_pairs(a["kind"], pairs, self.allow_kinds)]
+        rl = rids.tolist()
+        self._times = {r: t for r, t in zip(rl, times.tolist()) if t == t}
+        self._kinds = dict(zip(rl, a["kind"]))
+        self.pairs = {(rl[i], rl[j]) for i, j in pairs.tolist()}
+        return self.pairs
+
+    def _allowed(self, ra, rb):
+        k = self._kinds[ra]
+        return k == self._kinds[rb] and k in self.allow_kinds
+
+    def moved(self, rids):
+        """Rehace los pares de las perforaciones 'rids' (ya movidas en la escena)."""
+        rids = set(rids)
+        self.pairs = {p for p in self.pairs if p[0] not in rids and p[1] not in rids}
+        times, index = self._times, self.scene.index
+        for r in rids:
+            t = times.get(r)
+            if t is None:
+                continue
+            x, y = index.position(r)
+            for _, o in index.query_radius(x, y, self.dist_m):
+                to = times.get(o)
+                if o == r or to is None or abs(to - t) >= self.window_ms or self._allowed(r, o):
+                    continue
+                self.pairs.add((min(r, o), max(r, o)))
+        return self.pairs
+
+
+def main(argv=None):
+    from layout_io import iter_layout
+
+    ap = argparse.ArgumentParser(description="Línea de tiempo de la tronadura de un frente.")
+    ap.add_argument("layout", help="diseño exportado (.json, .ndjson o .npz)")
+    ap.add_argument("--series", default="LP", help="serie de detonadores del catálogo")
+    ap.add_argument("--catalogue", default=None, help="catálogo JSON (ver load_catalogue)")
+    ap.add_argument("--window", type=float, default=WINDOW_MS, help="ventana de simultaneidad (ms)")
+    ap.add_argument("--relief", type=float, default=RELIEF_MS, help="antelación para cara libre (ms)")
+    ap.add_argument("--free-face", type=float, default=FREE_FACE_M, help="distancia a cara libre (m)")
+    ap.add_argument("--no-scatter", action="store_true", help="usar tiempos nominales")
+    ap.add_argument("--seed", type=int, default=None)
+    ap.add_argument("--conflicts", type=float, default=None, metavar="DIST",
+                    help="informar pares a menos de DIST m que salen dentro de la ventana")
+    ap.add_argument("--json", action="store_true", help="salida JSON")
+    args = ap.parse_args(argv)
+
+    catalogue = load_catalogue(args.catalogue) if args.catalogue else CATALOGUE
+    tunnels, holes = iter_layout(args.layout)
+    holes = list(holes)
+    tl = simulate(holes, tunnels, args.series, catalogue, not args.no_scatter, args.seed,
+                  args.window, args.relief, args.free_face)
+    out = tl.to_dict()
+    if args.conflicts is not None:
+        out["conflicts"] = find_conflicts(holes, dist_m=args.conflicts, window_ms=args.window,
+                                          times_ms=tl.times_ms)
+    if args.json:
+        json.dump(out, sys.stdout)
+        print()
+        return 0
+    print(tl.report())
+    for c in out.get("conflicts", []):
+        print(f"conflicto: {c['i']}–{c['j']}  {c['dist_m']:.2f} m  Δt {c['dt_ms']:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
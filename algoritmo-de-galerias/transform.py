@@ -0,0 +1,145 @@
+# transform.py
+#
+# TRANSFORMACIONES AFINES PLANAS
+# ------------------------------
+# Matrices homogéneas 3×3 (escala, rotación, traslación, espejo) que se
+# componen y se aplican de una vez a arreglos de coordenadas, listas de
+# perforaciones o polilíneas. Para una Scene completa (perforaciones +
+# galerías + índice espacial) ver Scene.transform; para el diseño activo,
+# DesignEngine.transform.
+#
+#   m = compose(rotation(35.0, about=(0, 1.2)), translation(10.0, 0.0))
+#   holes = transform_holes(holes, m)     # copia rotada y desplazada
+#
+# compose(a, b, c) aplica primero a, luego b y luego c.
+
+from math import cos, sin, radians
+
+import numpy as np
+
+
+def identity():
+    """Matriz identidad 3×3."""
+    return np.eye(3)
+
+
+def translation(dx, dy):
+    """Traslación (dx, dy)."""
+    m = np.eye(3)
+    m[0, 2] = dx
+    m[1, 2] = dy
+    return m
+
+
+def _about(m, about):
+    """m aplicada respecto del punto 'about' en vez del origen."""
+    if about[0] == 0 and about[1] == 0:
+        return m
+    return translation(about[0], about[1]) @ m @ translation(-about[0], -about[1])
+
+
+def scaling(sx, sy=None, about=(0.0, 0.0)):
+    """Escala sx, sy (sy = sx si no se da) respecto de 'about'."""
+    sy = sx if sy is None else sy
+    return _about(np.diag([float(sx), float(sy), 1.0]), about)
+
+
+def rotation(deg, about=(0.0, 0.0)):
+    """Rotación antihoraria de 'deg' grados respecto de 'about'."""
+    a = radians(deg)
+    ca, sa = cos(a), sin(a)
+    m = np.array([[ca, -sa, 0.0], [sa, ca, 0.0], [0.0, 0.0, 1.0]])
+    return _about(m, about)
+
+
+def mirror(axis_deg=90.0, about=(0.0, 0.0)):
+    """
+    Espejo respecto de la recta que pasa por 'about' con ángulo axis_deg.
+
+    axis_deg=90 refleja izquierda ↔ derecha (x -> -x); axis_deg=0, arriba ↔ abajo.
+    """
+    a = 2*radians(axis_deg)
+    ca, sa = cos(a), sin(a)
+    m = np.array([[ca, sa, 0.0], [sa, -ca, 0.0], [0.0, 0.0, 1.0]])
+    return _about(m, about)
+
+
+def compose(*ms):
+    """Composición de matrices, aplicadas en el orden dado."""
+    out = np.eye(3)
+    for m in ms:
+        out = np.asarray(m, dtype=np.float64) @ out
+    return out
+
+
+def place(center=(0.0, 0.0), scale_x=1.0, scale_y=1.0, rot_deg=0.0):
+    """Escala, luego rotación (ambas en el origen), luego traslación a 'center'."""
+    a = radians(rot_deg)
+    ca, sa = cos(a), sin(a)
+    return np.array([[scale_x*ca, -scale_y*sa, center[0]],
+                     [scale_x*sa,  scale_y*ca, center[1]],
+                     [0.0,         0.0,        1.0]])
+
+
+def from_spec(spec):
+    """
+    Matriz desde un dict declarativo (p.ej. la sección "transform" de un spec).
+
+    Llaves (todas opcionales; se aplican en este orden, respecto de "about"):
+        "scale": s o [sx, sy]; "mirror": ángulo del eje; "rotate": grados;
+        "translate": [dx, dy].
+    """
+    about = tuple(spec.get("about", (0.0, 0.0)))
+    ms = []
+    if "scale" in spec:
+        s = spec["scale"]
+        sx, sy = (s, s) if np.isscalar(s) else s
+        ms.append(scaling(sx, sy, about))
+    if "mirror" in spec:
+        ms.append(mirror(spec["mirror"], about))
+    if "rotate" in spec:
+        ms.append(rotation(spec["rotate"], about))
+    if "translate" in spec:
+        ms.append(translation(*spec["translate"]))
+    return compose(*ms)
+
+
+def apply(m, xy):
+    """Aplica m (3×3 o 2×3) a un arreglo (n, 2). Retorna un arreglo nuevo (n, 2)."""
+    m = np.asarray(m, dtype=np.float64)
+    xy = np.asarray(xy, dtype=np.float64).reshape(-1, 2)
+    return xy @ m[:2, :2].T + m[:2, 2]
+
+
+def apply_xy(m, xs, ys):
+    """Aplica m a coordenadas separadas. Retorna (xs, ys) como arreglos float64."""
+    m = np.asarray(m, dtype=np.float64)
+    xs = np.asarray(xs, dtype=np.float64)
+    ys = np.asarray(ys, dtype=np.float64)
+    return (m[0, 0]*xs + m[0, 1]*ys + m[0, 2],
+            m[1, 0]*xs + m[1, 1]*ys + m[1, 2])
+
+
+def transform_holes(holes, m):
+    """
+    Copia de las perforaciones (dicts) con x, y transformadas por m.
+
+    Las coordenadas se transforman en una sola operación; el resto de las
+    llaves se copia tal cual.
+    """
+    holes = list(holes)
+    xs, ys = apply_xy(m, [h["x"] for h in holes], [h["y"] for h in holes])
+    out = []
+    for h, x, y in zip(holes, xs.tolist(), ys.tolist()):
+        h2 = dict(h)
+        h2["x"] = x
+        h2["y"] = y
+        out.append(h2)
+    return out
+
+
+def transform_polyline(poly, m):
+    """Polilínea [(x, y), ...] transformada por m."""
+    if not len(poly):
+        return []
+    return [tuple(p) for p in apply(m, poly).tolist()]
@@ -0,0 +1,312 @@
+# vibration.py
+#
+# CARGA MÁXIMA INSTANTÁNEA Y VELOCIDAD DE PARTÍCULA (PPV)
+# -------------------------------------------------------
+# Para un frente diseñado (Scene o perforaciones exportadas) calcula:
+#   - la carga que sale en cada ventana de retardo (por defecto 8 ms): una
+#     ventana empieza en cada tiempo de salida distinto y toma las
+#     perforaciones que salen antes de t0 + window_ms;
+#   - la carga máxima instantánea (la mayor de esas ventanas);
+#   - la PPV prevista en cada receptor para cada ventana, por distancia
+#     escalada:  PPV = K·(R/√Q)^-β, con Q la carga de la ventana y R la
+#     distancia del receptor a la perforación más cercana de la ventana.
+#
+# Los tiempos salen de timing (números de retardo por familia y catálogo de
+# detonadores). La carga por perforación es la del plan de carga
+# (charge_plan, la misma que va en las exportaciones); una tabla por _kind
+# solo reemplaza las familias que nombra, o se da un arreglo por perforación.
+# Todo es matricial (receptores × perforaciones × ventanas), así que se
+# puede recalcular tras cada edición o sobre una campaña completa.
+#
+# Uso por línea de comandos:
+#   python vibration.py frente1.npz frente2.npz --receivers monitores.csv --limit 50
+
+import argparse
+import csv
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from charge_plan import HOLE_LENGTH_M, charge_of, kind_charges
+from timing import CATALOGUE, FAMILY_ORDER, WINDOW_MS, face_arrays, firing_numbers, firing_times
+
+# Ley de atenuación PPV = K·SD^-β (mm/s, m, kg). Valores genéricos: ajustar
+# con los registros del sitio.
+PPV_K    = 1140.0
+PPV_BETA = 1.6
+R_MIN_M  = 1.0     # distancia mínima (evita SD → 0 en receptores sobre el frente)
+
+
+def hole_charges(kinds, charges=None, is_void=None, hole_length=HOLE_LENGTH_M):
+    """
+    Carga (kg) de cada perforación.
+
+    Parámetros:
+        kinds (list[str]): familia de cada perforación.
+        charges (dict|array|None): None = plan de carga (igual a
+            charge_plan.plan(source, hole_length=hole_length).kg); dict = kg
+            por familia, las demás según el plan; arreglo = kg de cada
+            perforación.
+        is_void (array|None): los vacíos quedan con carga 0.
+        hole_length (float): largo de perforación del plan de carga (m).
+
+    Retorna:
+        np.ndarray[float64]
+    """
+    if charges is None or isinstance(charges, dict):
+        table = kind_charges(hole_length=hole_length)
+        own = charges or {}
+        q = np.array([own[k] if k in own else charge_of(table, k)[2] for k in kinds],
+                     dtype=np.float64)
+    else:
+        q = np.asarray(charges, dtype=np.float64).copy()
+        if len(q) != len(kinds):
+            raise ValueError(f"se esperaban {len(kinds)} cargas y hay {len(q)}")
+    if is_void is not None:
+        q[np.asarray(is_void, dtype=bool)] = 0.0
+    return q
+
+
+def delay_windows(times, charges, window_ms=WINDOW_MS):
+    """
+    Ventanas de retardo y su carga.
+
+    Una ventana empieza en cada tiempo de salida distinto y toma las
+    perforaciones con t0 ≤ t < t0 + window_ms (las ventanas pueden
+    solaparse). Los tiempos nan y las cargas nulas se omiten.
+
+    Retorna:
+        tuple: (order, lo, hi, t0, kg) — order: perforaciones ordenadas por
+               tiempo; la ventana w es order[lo[w]:hi[w]], sale en t0[w] y
+               suma kg[w].
+    """
+    times = np.asarray(times, dtype=np.float64)
+    charges = np.asarray(charges, dtype=np.float64)
+    order = np.nonzero(~np.isnan(times) & (charges > 0))[0]
+    order = order[np.argsort(times[order], kind="stable")]
+    ts = times[order]
+    t0, lo = np.unique(ts, return_index=True)
+    hi = np.searchsorted(ts, t0 + window_ms, side="left")
+    csum = np.concatenate(([0.0], np.cumsum(charges[order])))
+    return order, lo, hi, t0, csum[hi] - csum[lo]
+
+
+def ppv(distance, charge, k=PPV_K, beta=PPV_BETA, r_min=R_MIN_M):
+    """PPV (mm/s) por distancia escalada R/√Q; acepta arreglos compatibles."""
+    sd = np.maximum(distance, r_min)/np.sqrt(charge)
+    return k*sd**(-beta)
+
+
+class VibrationResult:
+    """
+    Carga por ventana y PPV prevista en los receptores.
+
+    Atributos:
+        t0_ms (np.ndarray): inicio de cada ventana (w,).
+        kg (np.ndarray): carga de cada ventana (w,).
+        max_kg (float): carga máxima instantánea.
+        max_window (int): ventana con la carga máxima (-1 si no hay carga).
+        distance (np.ndarray): (m, w) distancia de cada receptor a la
+            perforación más cercana de cada ventana.
+        ppv (np.ndarray): (m, w) PPV prevista (mm/s).
+        peak_ppv (np.ndarray): (m,) máximo por receptor.
+        peak_window (np.ndarray): (m,) ventana que lo produce.
+    """
+
+    def __init__(self, t0_ms, kg, distance, ppv_mm_s):
+        self.t0_ms = t0_ms
+        self.kg = kg
+        self.max_window = int(np.argmax(kg)) if len(kg) else -1
+        self.max_kg = float(kg[self.max_window]) if len(kg) else 0.0
+        self.distance = distance
+        self.ppv = ppv_mm_s
+        if ppv_mm_s.shape[1]:
+            self.peak_window = np.argmax(ppv_mm_s, axis=1)
+            self.peak_ppv = ppv_mm_s[np.arange(len(ppv_mm_s)), self.peak_window]
+        else:
+            self.peak_window = np.full(len(ppv_mm_s), -1, dtype=np.int64)
+            self.peak_ppv = np.zeros(len(ppv_mm_s))
+
+    def exceeding(self, limit):
+        """Receptores cuya PPV máxima supera 'limit' (mm/s)."""
+        return np.nonzero(self.peak_ppv > limit)[0]
+
+    def to_dict(self, limit=None):
+        """Resumen serializable (JSON)."""
+        out = {"max_kg": self.max_kg,
+               "max_t0_ms": float(self.t0_ms[self.max_window]) if self.max_window >= 0 else None,
+               "windows": len(self.kg),
+               "receivers": [{"peak_ppv": float(p), "t0_ms": float(self.t0_ms[w]) if w >= 0 else None,
+                              "kg": float(self.kg[w]) if w >= 0 else 0.0,
+                              "distance_m": float(self.distance[i, w]) if w >= 0 else None}
+                             for i, (p, w) in enumerate(zip(self.peak_ppv, self.peak_window.tolist()))]}
+        if limit is not None:
+            out["limit"] = limit
+            out["exceeding"] = self.exceeding(limit).tolist()
+        return out
+
+    def report(self, limit=None):
+        """Texto legible con un renglón por receptor."""
+        if self.max_window < 0:
+            return "sin perforaciones cargadas"
+        lines = [f"{len(self.kg)} ventanas; carga máxima instantánea {self.max_kg:.2f} kg "
+                 f"(t0 = {self.t0_ms[self.max_window]:.1f} ms)"]
+        for i, (p, w) in enumerate(zip(self.peak_ppv.tolist(), self.peak_window.tolist())):
+            flag = "  SUPERA" if limit is not None and p > limit else ""
+            lines.append(f"receptor {i:3d}: PPV {p:8.2f} mm/s  (t0 {self.t0_ms[w]:8.1f} ms, "
+                         f"{self.kg[w]:6.2f} kg, R {self.distance[i, w]:7.2f} m){flag}")
+        return "\n".join(lines)
+
+
+def evaluate(source, receivers, charges=None, face_z=0.0, series="LP", catalogue=CATALOGUE,
+             window_ms=WINDOW_MS, k=PPV_K, beta=PPV_BETA, r_min=R_MIN_M,
+             order=FAMILY_ORDER, scatter=False, seed=None, times_ms=None,
+             hole_length=HOLE_LENGTH_M):
+    """
+    Carga por ventana de retardo y PPV en los receptores para un frente.
+
+    Parámetros:
+        source (Scene|iterable[dict]): perforaciones del frente.
+        receivers (array): (m, 2) o (m, 3) puntos de monitoreo; las
+            perforaciones están en el plano z = face_z.
+        charges (dict|array|None): carga por familia o por perforación (ver
+            hole_charges).
+        hole_length (float): largo de perforación del plan de carga (m).
+        series, catalogue, order: tiempos de salida (ver timing).
+        window_ms (float): ventana de retardo.
+        k, beta, r_min: ley de atenuación (ver ppv).
+        scatter, seed: por defecto se usan los tiempos nominales.
+        times_ms (array|None): tiempos ya calculados (omite el catálogo).
+
+    Retorna:
+        VibrationResult
+    """
+    a = face_arrays(source)
+    if times_ms is None:
+        numbers = firing_numbers(a["kind"], a["delay"], a["is_void"], order)
+        times_ms = firing_times(numbers, series, catalogue, scatter, seed)
+    times_ms = np.where(a["is_void"], np.nan, np.asarray(times_ms, dtype=np.float64))
+    q = hole_charges(a["kind"], charges, a["is_void"], hole_length)
+    idx, lo, hi, t0, kg = delay_windows(times_ms, q, window_ms)
+
+    rec = np.atleast_2d(np.asarray(receivers, dtype=np.float64))
+    if rec.shape[1] == 2:
+        rec = np.column_stack([rec, np.full(len(rec), face_z)])
+    dx = rec[:, 0:1] - a["x"][idx][None, :]
+    dy = rec[:, 1:2] - a["y"][idx][None, :]
+    d = np.sqrt(dx*dx + dy*dy + (rec[:, 2:3] - face_z)**2)
+    if len(t0):
+        # mínimo por ventana (solapadas): reduceat sobre pares (lo, hi) y se
+        # descartan los tramos intermedios; la columna inf permite hi = n
+        d = np.concatenate([d, np.full((len(d), 1), np.inf)], axis=1)
+        bounds = np.column_stack([lo, hi]).ravel()
+        dist = np.minimum.reduceat(d, bounds, axis=1)[:, ::2]
+    else:
+        dist = np.zeros((len(rec), 0))
+    return VibrationResult(t0, kg, dist, ppv(dist, kg[None, :], k, beta, r_min))
+
+
+def load_receivers(path):
+    """Receptores desde CSV (x, y[, z] por fila; se omiten filas no numéricas)."""
+    pts = []
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.reader(f):
+            try:
+                pts.append([float(v) for v in row[:3]])
+            except ValueError:
+                continue
+    if not pts:
+        raise ValueError(f"{path}: sin receptores")
+    width = min(len(p) for p in pts)
+    return np.array([p[:width] for p in pts], dtype=np.float64)
+
+
+def _evaluate_layout(args):
+    """Trabajo de campaign(): evalúa un archivo de diseño (corre en el pool)."""
+    from layout_io import iter_layout
+
+    path, receivers, kwargs, limit = args
+    _, holes = iter_layout(path)
+    try:
+        res = evaluate(list(holes), receivers, **kwargs)
+    except ValueError as e:
+        return {"layout": path, "error": str(e)}
+    out = res.to_dict(limit)
+    out["layout"] = path
+    return out
+
+
+def campaign(layouts, receivers, limit=None, jobs=None, **kwargs):
+    """
+    Evalúa muchos frentes exportados contra los mismos receptores.
+
+    Parámetros:
+        layouts (list[str]): archivos de diseño (.json, .ndjson, .npz).
+        receivers (array): puntos de monitoreo (ver evaluate).
+        limit (float|None): PPV admisible (mm/s) para marcar excesos.
+        jobs (int|None): procesos (None = nº de CPUs; 1 = sin pool).
+        **kwargs: resto de los parámetros de evaluate.
+
+    Retorna:
+        list[dict]: un resumen por frente (to_dict), en el orden de 'layouts';
+                    los que fallan traen "error".
+    """
+    work = [(p, receivers, kwargs, limit) for p in layouts]
+    jobs = jobs or os.cpu_count() or 1
+    if jobs <= 1 or len(work) <= 1:
+        return [_evaluate_layout(w) for w in work]
+    with ProcessPoolExecutor(max_workers=min(jobs, len(work))) as pool:
+        return list(pool.map(_evaluate_layout, work, chunksize=max(1, len(work)//(4*jobs))))
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Carga máxima instantánea y PPV en receptores.")
+    ap.add_argument("layouts", nargs="+", help="diseños exportados (.json, .ndjson o .npz)")
+    ap.add_argument("--receivers", default=None, help="CSV de receptores (x, y[, z])")
+    ap.add_argument("--receiver", action="append", default=[], metavar="X,Y[,Z]",
+                    help="receptor adicional (repetible)")
+    ap.add_argument("--charges", default=None,
+                    help="JSON con la carga por familia (kg); por defecto, la del plan de carga")
+    ap.add_argument("--length", type=float, default=HOLE_LENGTH_M,
+                    help="largo de perforación para el plan de carga (m)")
+    ap.add_argument("--face-z", type=float, default=0.0, help="z del plano del frente")
+    ap.add_argument("--series", default="LP", help="serie de detonadores del catálogo")
+    ap.add_argument("--window", type=float, default=WINDOW_MS, help="ventana de retardo (ms)")
+    ap.add_argument("--k", type=float, default=PPV_K, help="constante K de la ley de atenuación")
+    ap.add_argument("--beta", type=float, default=PPV_BETA, help="exponente β de la ley de atenuación")
+    ap.add_argument("--limit", type=float, default=None, help="PPV admisible (mm/s)")
+    ap.add_argument("-j", "--jobs", type=int, default=None)
+    ap.add_argument("--json", action="store_true", help="salida JSON (una línea por frente)")
+    args = ap.parse_args(argv)
+
+    pts = [] if args.receivers is None else load_receivers(args.receivers).tolist()
+    pts += [[float(v) for v in r.split(",")] for r in args.receiver]
+    if not pts:
+        ap.error("indique --receivers o --receiver")
+    width = min(len(p) for p in pts)
+    receivers = np.array([p[:width] for p in pts], dtype=np.float64)
+    charges = None
+    if args.charges:
+        with open(args.charges, encoding="utf-8") as f:
+            charges = json.load(f)
+
+    results = campaign(args.layouts, receivers, args.limit, args.jobs, charges=charges,
+                       hole_length=args.length, face_z=args.face_z, series=args.series,
+                       window_ms=args.window, k=args.k, beta=args.beta)
+    for res in results:
+        if args.json:
+            print(json.dumps(res))
+        elif "error" in res:
+            print(f"{res['layout']}: error: {res['error']}")
+        else:
+            peak = max((r["peak_ppv"] for r in res["receivers"]), default=0.0)
+            over = f"  supera en {res['exceeding']}" if res.get("exceeding") else ""
+            print(f"{res['layout']}: carga máx. {res['max_kg']:.2f} kg, PPV máx. {peak:.2f} mm/s{over}")
+    return 1 if any(res.get("exceeding") for res in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())